@@ -1,7 +1,10 @@
+import heapq
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import IsolationForest, RandomForestClassifier
 from typing import List, Dict, Tuple
+# One tokenizer and stop-word list for both summarizers
+from app.services.nlp_service import STOP_WORDS, SENTENCE_SPLIT, WORD
 
 
 class AIEngine:
@@ -102,36 +105,45 @@ class AIEngine:
         Returns:
             List of reassignment suggestions
         """
+        # Receivers are built once and kept in a max-heap by spare hours, so each
+        # overloaded developer is matched in O(log n) instead of re-sorting the team
+        receivers = [
+            (m["hours_worked"] - 40.0, m["developer"])
+            for m in metrics_data
+            if (m["hours_worked"] / 40.0) * 100 < 100
+        ]
+        heapq.heapify(receivers)
+        
         suggestions = []
+        overloaded = [m for m in metrics_data if (m["hours_worked"] / 40.0) * 100 >= 120]
+        overloaded.sort(key=lambda m: m["hours_worked"], reverse=True)
         
-        for metric in metrics_data:
+        for metric in overloaded:
+            if not receivers:
+                break
             load_pct = (metric["hours_worked"] / 40.0) * 100
+            neg_spare, suggested_assignee = receivers[0]
+            
+            # Hand over the excess hours, or as many as the receiver can absorb
+            moved = min(metric["hours_worked"] - 40.0, -neg_spare)
+            if -neg_spare - moved > 0:
+                heapq.heapreplace(receivers, (neg_spare + moved, suggested_assignee))
+            else:
+                heapq.heappop(receivers)
             
-            if load_pct >= 120:
-                # Find developers with lower load
-                available_devs = [
-                    m for m in metrics_data 
-                    if m["developer"] != metric["developer"] 
-                    and (m["hours_worked"] / 40.0) * 100 < 100
-                ]
-                
-                if available_devs:
-                    # Sort by load (ascending)
-                    available_devs.sort(key=lambda x: x["hours_worked"])
-                    suggested_assignee = available_devs[0]
-                    
-                    suggestions.append({
-                        "developer": metric["developer"],
-                        "current_load": round(load_pct, 2),
-                        "suggested_reassignments": [
-                            {
-                                "from": metric["developer"],
-                                "to": suggested_assignee["developer"],
-                                "reason": f"Developer is {load_pct:.1f}% loaded. {suggested_assignee['developer']} has capacity."
-                            }
-                        ],
-                        "reason": f"Overloaded at {load_pct:.1f}% capacity"
-                    })
+            suggestions.append({
+                "developer": metric["developer"],
+                "current_load": round(load_pct, 2),
+                "suggested_reassignments": [
+                    {
+                        "from": metric["developer"],
+                        "to": suggested_assignee,
+                        "hours": round(moved, 2),
+                        "reason": f"Developer is {load_pct:.1f}% loaded. {suggested_assignee} has capacity."
+                    }
+                ],
+                "reason": f"Overloaded at {load_pct:.1f}% capacity"
+            })
         
         return suggestions
     
@@ -146,46 +158,32 @@ class AIEngine:
         Returns:
             Summarized text
         """
-        import re
-        
         if not text or not text.strip():
             return ""
         
         # Split into sentences
-        sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+        sentences = [s.strip() for s in SENTENCE_SPLIT.split(text) if s.strip()]
         
         if len(sentences) <= max_sentences:
             return text
         
-        # Score sentences (simple TF-based scoring)
-        words = re.findall(r'\b\w+\b', text.lower())
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
-            'could', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those',
-            'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'
-        }
-        
-        words = [w for w in words if w not in stop_words and len(w) > 2]
-        
-        # Calculate frequency
+        # Tokenize each sentence once and reuse the tokens for frequency and scoring
+        tokens = [WORD.findall(sentence.lower()) for sentence in sentences]
         freq = {}
-        for word in words:
-            freq[word] = freq.get(word, 0) + 1
-        
-        # Score sentences
-        sentence_scores = {}
-        for i, sentence in enumerate(sentences):
-            score = sum(freq.get(word.lower(), 0) for word in sentence.split())
-            sentence_scores[i] = score
-        
-        # Select top sentences
-        sorted_sentences = sorted(sentence_scores.items(), key=lambda x: x[1], reverse=True)
-        top_indices = sorted([idx for idx, _ in sorted_sentences[:max_sentences]])
+        for sentence_tokens in tokens:
+            for word in sentence_tokens:
+                if len(word) > 2 and word not in STOP_WORDS:
+                    freq[word] = freq.get(word, 0) + 1
+        
+        # Select top sentences without sorting every score
+        top_indices = heapq.nlargest(
+            max_sentences,
+            range(len(sentences)),
+            key=lambda i: sum(freq.get(word, 0) for word in tokens[i])
+        )
         
         # Reconstruct summary maintaining order
-        summary_sentences = [sentences[idx] for idx in top_indices]
+        summary_sentences = [sentences[idx] for idx in sorted(top_indices)]
         return " ".join(summary_sentences)
 
 
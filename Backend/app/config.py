@@ -17,6 +17,64 @@ class Settings(BaseSettings):
     api_title: str = "Zenycon Insight - Project Intelligence Platform"
     api_version: str = "1.0.0"
     
+    # Streaming workload anomaly detection
+    anomaly_ewma_alpha: float = 0.3
+    anomaly_z_threshold: float = 3.0
+    anomaly_min_observations: int = 3
+    
+    # Process pool for CPU-bound ML/NLP work (0 disables the pool)
+    worker_pool_size: int = 2
+    worker_pool_max_queue: int = 32
+    worker_pool_timeout: float = 30.0
+    worker_pool_start_method: str = "spawn"
+    
+    # Health model retraining
+    health_model_path: str = "models/health_model.pkl"
+    retrain_chunk_size: int = 5000
+    retrain_min_samples: int = 20
+    retrain_holdout_fraction: float = 0.2
+    retrain_timeout: float = 600.0
+    
+    # Summary cache (empty path keeps it in memory only)
+    summary_cache_max_bytes: int = 64 * 1024 * 1024
+    summary_cache_min_chars: int = 512
+    summary_cache_path: str = ""
+    
+    # Near-duplicate task detection (estimated Jaccard similarity of title words)
+    duplicate_similarity_threshold: float = 0.6
+    
+    # Assignee recommendations: weight of availability vs. title similarity
+    assignee_load_weight: float = 0.3
+    
+    # Write-invalidated cache for analytics endpoints
+    response_cache_ttl: float = 30.0
+    response_cache_max_entries: int = 1024
+    
+    # Change feed push (SSE / WebSocket)
+    change_feed_max_queue: int = 1000
+    change_feed_heartbeat: float = 15.0
+    # Multi-worker: how often each worker replays other workers' changes
+    change_feed_poll_interval: float = 0.5
+    # change_log rows older than this are pruned; older cursors get 410 / resync
+    change_log_retention_hours: float = 168.0
+    change_log_prune_interval: float = 3600.0  # seconds between prune_change_log jobs
+    
+    # Background jobs (durable queue in the jobs table)
+    job_worker_threads: int = 2         # per API process; 0 only enqueues
+    job_poll_interval: float = 1.0      # seconds between checks for due jobs
+    job_max_attempts: int = 3
+    job_retry_backoff: float = 5.0      # seconds before the first retry, doubled each time
+    job_lease_seconds: float = 300.0    # a running job is requeued if its process stops refreshing this
+    
+    # Flag tasks overdue as their deadlines pass (min-heap scheduler thread per process)
+    deadline_scheduler_enabled: bool = True
+    
+    # Stored project health: seconds to collect task writes before rescoring them in one batch
+    health_recompute_delay: float = 1.0
+    
+    # Load NumPy/pandas/scikit-learn and the models at startup instead of on first use
+    warm_up_on_startup: bool = False
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
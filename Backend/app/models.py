@@ -1,11 +1,39 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+import json
+from collections import Counter
+from sqlalchemy import Boolean, CheckConstraint, Column, Integer, String, Text, DateTime, ForeignKey, Float, Index, UniqueConstraint, Enum as SQLEnum, case, event, inspect, select, text
+from sqlalchemy.orm import Session, relationship
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql import func
-from datetime import datetime
+from sqlalchemy.types import TypeDecorator
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 import enum
 from app.database import Base
 
 
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC for any datetime (aware values are converted, naive ones are taken as UTC)"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    DateTime stored and compared as naive UTC.
+    
+    SQLite keeps no UTC offset, so an aware value was stored as its local wall
+    time and later compared with utcnow() as if it were UTC. Values are
+    converted to UTC on the way in, including comparison parameters.
+    """
+    impl = DateTime
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return as_utc(value)
+
+
 class UserRole(str, enum.Enum):
     ADMIN = "admin"
     MANAGER = "manager"
@@ -20,6 +48,22 @@ class TaskStatus(str, enum.Enum):
     BLOCKED = "blocked"
 
 
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+# Rows edited through the API carry a version counter. The API bumps it on each
+# PUT, and every ORM UPDATE/DELETE of the row checks it (StaleDataError when a
+# concurrent write got there first). updated_at is set client-side, so an UPDATE
+# needs nothing read back, and an INSERT gets id and created_at from RETURNING.
+def versioned(version_column) -> dict:
+    return {"version_id_col": version_column, "version_id_generator": False}
+
+
 class User(Base):
     __tablename__ = "users"
     
@@ -27,12 +71,19 @@ class User(Base):
     name = Column(String, nullable=False, index=True)
     role = Column(SQLEnum(UserRole), nullable=False, default=UserRole.DEVELOPER)
     email = Column(String, unique=True, index=True, nullable=True)
+    # Login hash, set by /auth/register; users created through /api/users have none
+    password = Column(String, nullable=False, default="", server_default=text("''"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=datetime.utcnow)
+    # Bumped by every API PUT; see versioned()
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
+    __mapper_args__ = versioned(version)
     
-    # Relationships
-    tasks = relationship("Task", back_populates="assigned_user")
-    metrics = relationship("DeveloperMetrics", back_populates="developer")
+    # Relationships. The database unassigns tasks and deletes metrics of a
+    # deleted user (ON DELETE), so neither collection is loaded to delete one.
+    tasks = relationship("Task", back_populates="assigned_user", passive_deletes=True)
+    metrics = relationship("DeveloperMetrics", back_populates="developer",
+                           cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Project(Base):
@@ -43,42 +94,561 @@ class Project(Base):
     client_name = Column(String, nullable=False)
     start_date = Column(DateTime(timezone=True), nullable=False)
     end_date = Column(DateTime(timezone=True), nullable=True)
-    health_score = Column(Float, default=0.0)  # 0-100 score
+    health_score = Column(Float, default=100.0)  # 0-100 score; a project without tasks scores 100
+    overdue_tasks = Column(Integer, nullable=False, default=0, server_default=text("0"))  # open tasks past their deadline
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=datetime.utcnow)
+    # Bumped by every API PUT; see versioned()
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
+    __mapper_args__ = versioned(version)
     
     # Relationships
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    # ON DELETE CASCADE removes the tasks; they are never loaded just to be deleted
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Task listings (see app.services.task_filters): project board, status
+        # columns, "my tasks", overdue lists; each also serves the deadline order
+        Index("ix_tasks_project_status_deadline", "project_id", "status", "deadline"),
+        Index("ix_tasks_status_deadline", "status", "deadline"),
+        Index("ix_tasks_assignee_status_deadline", "assigned_to", "status", "deadline"),
+        Index("ix_tasks_overdue", "overdue", "project_id", "deadline", sqlite_where=text("overdue = 1")),
+        Index("ix_tasks_import_job", "import_job_id", sqlite_where=text("import_job_id IS NOT NULL")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     status = Column(SQLEnum(TaskStatus), default=TaskStatus.TODO)
-    deadline = Column(DateTime(timezone=True), nullable=True)
-    assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    deadline = Column(UTCDateTime, nullable=True, index=True)
+    # Working days the task takes; unestimated tasks count as one day when scheduling
+    estimated_days = Column(Float, nullable=True)
+    # Counted in projects.overdue_tasks (kept in sync by the flush listeners below)
+    overdue = Column(Boolean, nullable=False, default=False, server_default=text("0"))
+    assigned_to = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=datetime.utcnow)
+    # Bumped by every API PUT; see versioned()
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
+    __mapper_args__ = versioned(version)
+    # The import_tasks job that created the task, so a retried import can tell it already ran
+    import_job_id = Column(Integer, nullable=True)
     
     # Relationships
     assigned_user = relationship("User", back_populates="tasks")
     project = relationship("Project", back_populates="tasks")
 
 
+# When a task last changed; updated_at stays NULL until the first update
+task_changed_at = func.coalesce(Task.__table__.c.updated_at, Task.__table__.c.created_at)
+Index("ix_tasks_changed_at", task_changed_at)
+
+
 class DeveloperMetrics(Base):
     __tablename__ = "developer_metrics"
     
     id = Column(Integer, primary_key=True, index=True)
-    developer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    developer_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     developer_name = Column(String, nullable=False, index=True)
     tasks_completed = Column(Integer, default=0)
     hours_worked = Column(Float, default=0.0)
     bugs_reported = Column(Integer, default=0)
     recorded_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by every API PUT; see versioned()
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
+    __mapper_args__ = versioned(version)
     
     # Relationships
     developer = relationship("User", back_populates="metrics")
 
+
+class TaskDependency(Base):
+    """Edge of a project's task graph: `task_id` can't start until `depends_on_id` is done"""
+    __tablename__ = "task_dependencies"
+    __table_args__ = (
+        # Also the index for walking a task's prerequisites
+        UniqueConstraint("task_id", "depends_on_id", name="uq_task_dependencies_edge"),
+        Index("ix_task_dependencies_depends_on", "depends_on_id"),
+        Index("ix_task_dependencies_project", "project_id"),
+        CheckConstraint("task_id != depends_on_id", name="ck_task_dependencies_not_self"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    depends_on_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    # Both tasks' project; graphs never span projects
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ChangeLog(Base):
+    """Append-only outbox of row changes, written in the same transaction as the change"""
+    __tablename__ = "change_log"
+    # AUTOINCREMENT: sequence numbers are never reused, so `since` cursors stay valid
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    seq = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # "insert", "update" or "delete"
+    payload = Column(Text, nullable=True)  # JSON of the row after the change
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class Job(Base):
+    """Durable background job, claimed and run by the job queue's worker threads"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim order: highest priority first, then oldest
+        Index("ix_jobs_claim", "status", "priority", "id"),
+        # At most one queued or running job per dedup key (the enum is stored by member name)
+        Index(
+            "ix_jobs_active_dedup_key", "dedup_key", unique=True,
+            sqlite_where=text("dedup_key IS NOT NULL AND status IN ('QUEUED', 'RUNNING')")
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(Text, nullable=True)  # JSON arguments for the handler
+    priority = Column(Integer, nullable=False, default=0)
+    status = Column(SQLEnum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    dedup_key = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False)  # not claimed before this (retry backoff)
+    locked_by = Column(String, nullable=True)  # "<host>:<pid>" of the process running it
+    locked_at = Column(DateTime(timezone=True), nullable=True)  # lease, refreshed while running
+    result = Column(Text, nullable=True)  # JSON returned by the handler
+    error = Column(Text, nullable=True)  # last failure
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+# Full-text search (SQLite FTS5). External-content tables index task titles and
+# project names/client names; triggers keep them in sync with every write.
+SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, content='tasks', content_rowid='id', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO tasks_fts(rowid, title) VALUES (new.id, new.title);
+    END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+        name, client_name, content='projects', content_rowid='id', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, name, client_name) VALUES (new.id, new.name, new.client_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, client_name)
+        VALUES ('delete', old.id, old.name, old.client_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE OF name, client_name ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, client_name)
+        VALUES ('delete', old.id, old.name, old.client_name);
+        INSERT INTO projects_fts(rowid, name, client_name) VALUES (new.id, new.name, new.client_name);
+    END""",
+]
+
+
+def create_search_index(connection) -> bool:
+    """
+    Create the FTS5 index on SQLite if it is missing, back-filling it from the
+    existing rows. Safe to run on every startup; returns True if it was created.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    existed = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'")
+    ).first() is not None
+    for statement in SEARCH_INDEX_DDL:
+        connection.execute(text(statement))
+    if not existed:
+        connection.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+        connection.execute(text("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')"))
+    return not existed
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index_with_tables(target, connection, **kw):
+    create_search_index(connection)
+
+
+# Change feed outbox. Every flush that inserts, updates or deletes a tracked row
+# also appends to change_log on the same connection, so the log commits or rolls
+# back together with the change. This listens on all sessions and matches rows by
+# table name, so writes from either API stack are captured.
+CHANGE_TRACKED_TABLES = frozenset({"tasks", "projects", "users", "developer_metrics", "task_dependencies"})
+CHANGE_EXCLUDED_COLUMNS = frozenset({"password", "overdue"})
+
+
+def _json_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def change_payload(obj) -> dict:
+    """Loaded column values of a row (never triggers a refresh mid-flush)"""
+    state = inspect(obj)
+    return {
+        attr.key: _json_value(state.dict[attr.key])
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict and attr.key not in CHANGE_EXCLUDED_COLUMNS
+    }
+
+
+def row_payload(row) -> dict:
+    """change_payload() for a result row, e.g. from UPDATE ... RETURNING"""
+    return {
+        key: _json_value(value)
+        for key, value in row._mapping.items()
+        if key not in CHANGE_EXCLUDED_COLUMNS
+    }
+
+
+def log_change(session: Session, table_name: str, row_id: int, op: str, payload: dict = None) -> dict:
+    """Append one change_log row in the session's transaction (also used by bulk writes)"""
+    created_at = datetime.utcnow()
+    result = session.connection().execute(
+        ChangeLog.__table__.insert().values(
+            table_name=table_name,
+            row_id=row_id,
+            op=op,
+            payload=json.dumps(payload) if payload is not None else None,
+            created_at=created_at,
+        )
+    )
+    change = {
+        "seq": result.inserted_primary_key[0],
+        "table": table_name,
+        "row_id": row_id,
+        "op": op,
+        "payload": payload,
+        "created_at": created_at,
+    }
+    session.info.setdefault("pending_changes", []).append(change)
+    return change
+
+
+# Rows per multi-row INSERT in log_changes (5 bound parameters each)
+_LOG_CHUNK = 1000
+
+
+def log_changes(session: Session, table_name: str, op: str, rows: List[tuple]) -> List[dict]:
+    """
+    Append change_log rows for many rows of one table, up to _LOG_CHUNK per INSERT.
+
+    Args:
+        rows: (row_id, payload) pairs with distinct row ids, payload None for deletes
+    """
+    table = ChangeLog.__table__
+    created_at = datetime.utcnow()
+    payloads = dict(rows)
+    changes = []
+    for start in range(0, len(rows), _LOG_CHUNK):
+        values = [
+            {
+                "table_name": table_name,
+                "row_id": row_id,
+                "op": op,
+                "payload": json.dumps(payload) if payload is not None else None,
+                "created_at": created_at,
+            }
+            for row_id, payload in rows[start:start + _LOG_CHUNK]
+        ]
+        inserted = session.connection().execute(
+            table.insert().values(values).returning(table.c.seq, table.c.row_id)
+        ).all()
+        changes.extend(
+            {"seq": seq, "table": table_name, "row_id": row_id, "op": op,
+             "payload": payloads[row_id], "created_at": created_at}
+            for seq, row_id in sorted(inserted)
+        )
+    session.info.setdefault("pending_changes", []).extend(changes)
+    return changes
+
+
+@event.listens_for(Session, "after_flush")
+def record_changes(session, flush_context):
+    """Write change_log rows for every tracked insert, update and delete in the flush"""
+    for op, objects in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            table_name = getattr(obj, "__tablename__", None)
+            if table_name not in CHANGE_TRACKED_TABLES:
+                continue
+            if op == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            payload = None if op == "delete" else change_payload(obj)
+            row_id = inspect(obj).mapper.primary_key_from_instance(obj)[0]
+            log_change(session, table_name, row_id, op, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_changes(session):
+    session.info.pop("pending_changes", None)
+    session.info.pop("overdue_before", None)
+    session.info.pop("upcoming_deadlines", None)
+    session.info.pop("health_dirty", None)
+
+
+# Overdue bookkeeping. A task counts towards its project's overdue_tasks while it
+# is open and past its deadline, and tasks.overdue records that it is counted.
+# The deadline scheduler flags tasks as their deadlines pass; these listeners
+# apply every ORM write (create, reschedule, complete, reopen, move, delete) from
+# either API stack in the same transaction, so no read ever compares deadlines.
+# Counter changes are logged to change_log like any other write, so they bump
+# the projects table version and reach other workers; the flag and counter
+# updates leave updated_at alone. The same listener collects the projects whose
+# health score a flush changes.
+OVERDUE_FIELDS = ("deadline", "status", "project_id")
+
+
+def is_overdue(status, deadline: Optional[datetime], now: datetime) -> bool:
+    return deadline is not None and status != TaskStatus.COMPLETED and as_utc(deadline) <= now
+
+
+def _tasks_in(objects) -> list:
+    return [obj for obj in objects if getattr(obj, "__tablename__", None) == "tasks"]
+
+
+@event.listens_for(Session, "before_flush")
+def capture_overdue_state(session, flush_context, instances):
+    """Read the counted state of tasks this flush reschedules, completes, moves or deletes"""
+    ids = [inspect(obj).identity[0] for obj in _tasks_in(session.deleted)]
+    for obj in _tasks_in(session.dirty):
+        state = inspect(obj)
+        if state.identity and any(state.attrs[field].history.has_changes() for field in OVERDUE_FIELDS):
+            ids.append(state.identity[0])
+    if not ids:
+        return
+    tasks = Task.__table__
+    before = session.info.setdefault("overdue_before", {})
+    for start in range(0, len(ids), 500):
+        rows = session.connection().execute(
+            tasks.select().with_only_columns(tasks.c.id, tasks.c.project_id, tasks.c.overdue)
+            .where(tasks.c.id.in_(ids[start:start + 500]))
+        )
+        before.update({row.id: (row.project_id, bool(row.overdue)) for row in rows})
+
+
+def adjust_overdue_counts(session: Session, deltas: Dict[int, int]) -> None:
+    """Add `deltas` to projects.overdue_tasks and log the updated projects to change_log"""
+    projects = Project.__table__
+    connection = session.connection()
+    updated = []
+    for project_id, delta in sorted(deltas.items()):
+        if not delta or project_id is None:
+            continue
+        row = connection.execute(
+            projects.update().where(projects.c.id == project_id)
+            .values(overdue_tasks=projects.c.overdue_tasks + delta, updated_at=projects.c.updated_at)
+            .returning(*projects.columns)
+        ).first()
+        if row is not None:
+            updated.append((row.id, row_payload(row)))
+    if updated:
+        log_changes(session, "projects", "update", updated)
+
+
+@event.listens_for(Session, "after_flush")
+def track_task_changes(session, flush_context):
+    """
+    Adjust tasks.overdue and projects.overdue_tasks for the tasks in this flush,
+    and note the projects whose health score it changes.
+    """
+    before = session.info.pop("overdue_before", {})
+    now = datetime.utcnow()
+    deltas = Counter()
+    flags = {True: [], False: []}
+    upcoming = []
+    # New projects get a score too; the default 100.0 only holds until they have tasks
+    touched = {
+        inspect(obj).dict.get("id") for obj in session.new
+        if getattr(obj, "__tablename__", None) == "projects"
+    }
+
+    for obj in _tasks_in(session.deleted):
+        project_id, counted = before.get(inspect(obj).identity[0], (None, False))
+        touched.add(project_id)
+        if counted:
+            deltas[project_id] -= 1
+
+    changed = _tasks_in(session.new) + [
+        obj for obj in _tasks_in(session.dirty) if inspect(obj).identity[0] in before
+    ]
+    for obj in changed:
+        state = inspect(obj)
+        # New rows get their identity key only after the flush completes
+        task_id = state.identity[0] if state.identity else state.dict["id"]
+        old_project_id, counted = before.get(task_id, (None, False))
+        touched.update((old_project_id, state.dict.get("project_id")))
+        status = state.dict.get("status")
+        deadline = as_utc(state.dict.get("deadline"))
+        overdue = is_overdue(status, deadline, now)
+        if counted:
+            deltas[old_project_id] -= 1
+        if overdue:
+            deltas[state.dict.get("project_id")] += 1
+        if overdue != counted:
+            flags[overdue].append(task_id)
+            if "overdue" in state.mapper.column_attrs:
+                set_committed_value(obj, "overdue", overdue)
+        if not overdue and deadline is not None and status != TaskStatus.COMPLETED:
+            upcoming.append((deadline, task_id))
+
+    # Every flagged task is written by this flush, so record_changes logs it
+    connection = session.connection()
+    tasks = Task.__table__
+    for value, ids in flags.items():
+        for start in range(0, len(ids), 500):
+            connection.execute(
+                tasks.update().where(tasks.c.id.in_(ids[start:start + 500]))
+                .values(overdue=value, updated_at=tasks.c.updated_at)
+            )
+    adjust_overdue_counts(session, deltas)
+    # Handed to the deadline scheduler and the health recomputer once the transaction commits
+    if upcoming:
+        session.info.setdefault("upcoming_deadlines", []).extend(upcoming)
+    touched.discard(None)
+    if touched:
+        session.info.setdefault("health_dirty", set()).update(touched)
+
+
+def recount_overdue(connection, now: datetime = None) -> None:
+    """Flag every open task past its deadline and recount projects.overdue_tasks (full scan)"""
+    now = now or datetime.utcnow()
+    tasks, projects = Task.__table__, Project.__table__
+    past_due = (
+        (tasks.c.status != TaskStatus.COMPLETED)
+        & tasks.c.deadline.isnot(None)
+        & (tasks.c.deadline <= now)
+    )
+    connection.execute(tasks.update().values(overdue=case((past_due, True), else_=False)))
+    counted = (
+        select(func.count())
+        .where(tasks.c.project_id == projects.c.id, tasks.c.overdue.is_(True))
+        .scalar_subquery()
+    )
+    connection.execute(projects.update().values(overdue_tasks=counted))
+
+
+# Columns added after a database was first created. create_all never alters an
+# existing table, so upgrade_schema adds them (ADD COLUMN is cheap on SQLite).
+ADDED_COLUMNS = (
+    ("users", "password", "VARCHAR NOT NULL DEFAULT ''"),
+    ("tasks", "overdue", "BOOLEAN NOT NULL DEFAULT 0"),
+    ("projects", "overdue_tasks", "INTEGER NOT NULL DEFAULT 0"),
+    ("users", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("projects", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("tasks", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("developer_metrics", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("tasks", "estimated_days", "FLOAT"),
+    ("tasks", "import_job_id", "INTEGER"),
+)
+
+
+def upgrade_schema(connection) -> List[str]:
+    """Add missing columns, indexes and the search index to existing tables; returns "table.column" added"""
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    added = []
+    for table, column, ddl in ADDED_COLUMNS:
+        if table in tables and column not in {c["name"] for c in inspector.get_columns(table)}:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+            added.append(f"{table}.{column}")
+    # IF NOT EXISTS rather than checkfirst: reflection skips expression indexes
+    for index in Task.__table__.indexes:
+        connection.execute(CreateIndex(index, if_not_exists=True))
+    if {"tasks.overdue", "projects.overdue_tasks"} & set(added):
+        recount_overdue(connection)
+    # Databases created by the root metadata (init_db) never ran the after_create hook
+    if {"tasks", "projects"} <= tables:
+        create_search_index(connection)
+    return added
+
+
+def _foreign_keys_differ(cursor, table) -> bool:
+    """Whether the stored ON DELETE actions of `table` differ from the model's"""
+    stored = {row[3]: row[6] for row in cursor.execute(f"PRAGMA foreign_key_list({table.name})")}
+    return any(
+        stored.get(fk.parent.name, "NO ACTION") != (fk.ondelete or "NO ACTION").upper()
+        for fk in table.foreign_keys
+    )
+
+
+def upgrade_foreign_keys(engine) -> List[str]:
+    """
+    Rebuild tables whose foreign keys lack the ON DELETE actions declared above.
+
+    SQLite can't alter a constraint, so each such table is copied into a new
+    one created from the model, and its indexes and triggers are recreated.
+    Rows left dangling by earlier deletes get what the action would have done
+    (unassigned or deleted) first. Returns the names of the tables rebuilt.
+    """
+    if engine.dialect.name != "sqlite":
+        return []
+    tables = [Task.__table__, DeveloperMetrics.__table__]
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        stale = [table for table in tables if table.name in existing and _foreign_keys_differ(cursor, table)]
+        if not stale:
+            return []
+
+        # Only takes effect outside a transaction
+        cursor.execute("PRAGMA foreign_keys=OFF")
+        cursor.execute("BEGIN")
+        for table in stale:
+            name, new = table.name, f"{table.name}__rebuild"
+            for fk in table.foreign_keys:
+                dangling = (
+                    f"{fk.parent.name} IS NOT NULL AND {fk.parent.name} NOT IN "
+                    f"(SELECT {fk.column.name} FROM {fk.column.table.name})"
+                )
+                if fk.ondelete == "SET NULL":
+                    cursor.execute(f"UPDATE {name} SET {fk.parent.name} = NULL WHERE {dangling}")
+                elif fk.ondelete == "CASCADE":
+                    cursor.execute(f"DELETE FROM {name} WHERE {dangling}")
+
+            triggers = [row[0] for row in cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (name,)
+            )]
+            stored_columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({name})")}
+            columns = ", ".join(column.name for column in table.columns if column.name in stored_columns)
+            ddl = str(CreateTable(table).compile(dialect=engine.dialect))
+            cursor.execute(ddl.replace(f"CREATE TABLE {name} ", f"CREATE TABLE {new} ", 1))
+            cursor.execute(f"INSERT INTO {new} ({columns}) SELECT {columns} FROM {name}")
+            cursor.execute(f"DROP TABLE {name}")
+            cursor.execute(f"ALTER TABLE {new} RENAME TO {name}")
+            for index in table.indexes:
+                cursor.execute(str(CreateIndex(index).compile(dialect=engine.dialect)))
+            for trigger in triggers:
+                cursor.execute(trigger)
+
+        violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+        if violations:
+            raise RuntimeError(f"Foreign key violations after rebuilding {[t.name for t in stale]}: {violations[:5]}")
+        connection.commit()
+        return [table.name for table in stale]
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.cursor().execute("PRAGMA foreign_keys=ON")
+        connection.close()
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db
+from app.schemas import AggregateResponse
+from app.services.aggregate_service import aggregate_service, parse_names, DIMENSIONS, MEASURES, MAX_GROUP_BY
+from app.services.table_versions import conditional_get
+from app.services.task_filters import TaskFilters
+
+router = APIRouter(prefix="/api/aggregate", tags=["aggregate"])
+
+
+@router.get("/", response_model=AggregateResponse)
+def aggregate(
+    group_by: List[str] = Query([]),
+    measures: List[str] = Query(["count"]),
+    filters: TaskFilters = Depends(),
+    _etag: str = Depends(conditional_get("tasks", "projects", "developer_metrics")),
+    db: Session = Depends(get_db)
+):
+    """
+    Aggregate tasks for dashboard widgets in one GROUP BY query.
+    
+    Returns one value per group in each column instead of the raw rows, e.g.
+    tasks per status per project, or per assignee per deadline week. Answers
+    304 on If-None-Match while tasks, projects and metrics are unchanged.
+    
+    Query Parameters:
+    - group_by (list): Up to 3 of project, assignee, status, deadline_week
+      (Monday of the deadline's week), client_name; repeat or comma-separate.
+      None gives a single row of totals
+    - measures (list): count (default), overdue_count, avg_hours (average
+      hours_worked in the assignees' developer metrics, weighted by task)
+    - Task filters as on GET /api/tasks: project_id, status, assigned_to,
+      deadline_from, deadline_to, overdue, updated_since
+    
+    Example Request:
+    ```
+    GET /api/aggregate?group_by=project,status&measures=count,overdue_count
+    ```
+    
+    Example Response:
+    ```json
+    {
+      "group_by": ["project", "status"],
+      "measures": ["count", "overdue_count"],
+      "rows": 3,
+      "columns": {
+        "project": [1, 1, 2],
+        "status": ["todo", "in_progress", "todo"],
+        "count": [4, 2, 7],
+        "overdue_count": [1, 0, 3]
+      }
+    }
+    ```
+    
+    Errors:
+    - 400: Unknown or repeated dimension or measure, or more than 3 dimensions
+    """
+    group_by = parse_names(group_by, DIMENSIONS, "dimension")
+    measures = parse_names(measures, MEASURES, "measure")
+    if len(group_by) > MAX_GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_GROUP_BY} group_by dimensions")
+    if not measures:
+        raise HTTPException(status_code=400, detail="At least one measure is required")
+    
+    return aggregate_service.aggregate(db, group_by, measures, filters)
@@ -1,23 +1,54 @@
-from fastapi import APIRouter, Depends
+import os
+import shutil
+import tempfile
+from fastapi import APIRouter, Depends, File, Response, UploadFile
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
-from app.services.ml_service import ml_service
-from app.services.nlp_service import nlp_service
+from app.services.anomaly_service import workload_detector
+from app.services.job_queue import job_queue, accepted
+from app.services.lazy import lazy_service
+from app.services.summary_cache import summary_cache
+from app.services.table_versions import conditional_get
+from app.services.response_cache import response_cache
+from app.services.worker_pool import (
+    run_in_pool,
+    workload_task,
+    reassignments_task,
+    health_task,
+    summary_task,
+    summary_file_task,
+    summary_batch_task
+)
 from app.schemas import (
     HealthPredictionRequest,
     HealthPredictionResponse,
+    JobAccepted,
+    RetrainReport,
     WorkloadAnalysisResponse,
+    WorkloadAlertResponse,
     SummaryRequest,
     SummaryResponse,
-    TaskReassignmentSuggestion
+    SummaryCacheStats,
+    BatchSummaryRequest,
+    BatchSummaryResponse,
+    BatchSummaryItem,
+    TaskReassignmentSuggestion,
+    WhatIfRequest,
+    WhatIfResponse
 )
 
 router = APIRouter(prefix="/api", tags=["ai"])
 
+# Imports NumPy; loaded when a retrain is first requested
+health_model_trainer = lazy_service("app.services.training_service", "health_model_trainer")
+# Imports NumPy; loaded on the first what-if request
+whatif_simulator = lazy_service("app.services.whatif_service", "whatif_simulator")
+
 
 @router.get("/workload", response_model=List[WorkloadAnalysisResponse])
-def get_workload_analysis(db: Session = Depends(get_db)):
+async def get_workload_analysis(_etag: str = Depends(conditional_get("developer_metrics"))):
     """
     Get AI-powered workload analysis for all developers.
     
@@ -28,6 +59,9 @@ def get_workload_analysis(db: Session = Depends(get_db)):
         List of developer workload analyses with status ("Normal" or "Overloaded")
         and load percentage.
     
+    Sends a weak ETag; polls with a matching If-None-Match get 304 without
+    running the model until developer metrics change.
+    
     Example Response:
     ```json
     [
@@ -50,12 +84,50 @@ def get_workload_analysis(db: Session = Depends(get_db)):
     ]
     ```
     """
-    results = ml_service.analyze_workload(db)
-    return results
+    return await response_cache.aget_or_compute(
+        "api_workload", lambda: run_in_pool(workload_task), tags=("developer_metrics",)
+    )
+
+
+@router.get("/workload/alerts", response_model=List[WorkloadAlertResponse])
+def get_workload_alerts(overloaded_only: bool = True, db: Session = Depends(get_db)):
+    """
+    Get live overload flags from the streaming workload detector.
+    
+    Every metrics insert (`POST /api/metrics`) updates an exponentially weighted
+    baseline per developer in O(1). A developer is flagged when their latest
+    hours or bug count is more than the configured z-score above their own
+    baseline, or when they are at 120%+ capacity. Flags are served from memory,
+    so this endpoint never scans the metrics table (stored metrics are replayed
+    once, on the first call after a restart).
+    
+    Query Parameters:
+    - overloaded_only (bool): Only return flagged developers (default: true)
+    
+    Example Response:
+    ```json
+    [
+      {
+        "developer_id": 5,
+        "developer": "Diana Prince",
+        "hours_worked": 55.0,
+        "tasks_completed": 30,
+        "bugs_reported": 9,
+        "load_percentage": 137.5,
+        "baseline_hours": 47.1,
+        "z_score": 3.42,
+        "observations": 6,
+        "status": "Overloaded"
+      }
+    ]
+    ```
+    """
+    workload_detector.bootstrap(db)
+    return workload_detector.snapshot(overloaded_only=overloaded_only)
 
 
 @router.post("/health", response_model=HealthPredictionResponse)
-def predict_health(request: HealthPredictionRequest):
+async def predict_health(request: HealthPredictionRequest):
     """
     Predict project health based on workload metrics using Machine Learning.
     
@@ -94,7 +166,8 @@ def predict_health(request: HealthPredictionRequest):
     - "Fair": Average performance metrics
     - "Poor": Low task completion, high hours, many bugs
     """
-    predicted_health, confidence = ml_service.predict_health(
+    predicted_health, confidence = await run_in_pool(
+        health_task,
         request.tasks,
         request.hours,
         request.bugs
@@ -106,8 +179,65 @@ def predict_health(request: HealthPredictionRequest):
     )
 
 
+@router.post("/health/retrain", response_model=JobAccepted, status_code=202)
+def retrain_health_model(response: Response):
+    """
+    Retrain the health predictor on this installation's own history.
+    
+    Runs in the background: developer metrics are joined with the health score
+    of every project the developer has tasks on, the candidate model is fitted
+    in the analysis process pool and validated on a holdout split, and it only
+    replaces the live model if its accuracy is at least as good.
+    
+    Runs as a background job (retried if it fails); a retrain requested while
+    one is queued or running returns that job. The job result is the run
+    report, and `GET /api/health/retrain` returns this process's last report.
+    
+    Example Response (202):
+    ```json
+    {
+      "job_id": 14,
+      "kind": "retrain_health_model",
+      "status": "queued",
+      "deduplicated": false,
+      "status_url": "/api/jobs/14"
+    }
+    ```
+    """
+    job, created = job_queue.enqueue(
+        "retrain_health_model", priority=-5, dedup_key="retrain_health_model"
+    )
+    return accepted(job, created, response)
+
+
+@router.get("/health/retrain", response_model=RetrainReport)
+def get_retrain_report():
+    """
+    Get the report of the last health model retraining run.
+    
+    Example Response:
+    ```json
+    {
+      "status": "published",
+      "dataset_size": 1840,
+      "train_size": 1472,
+      "test_size": 368,
+      "candidate_accuracy": 0.83,
+      "baseline_accuracy": 0.41,
+      "load_seconds": 0.052,
+      "fit_seconds": 0.611,
+      "total_seconds": 0.702,
+      "finished_at": "2024-01-15T10:30:00"
+    }
+    ```
+    """
+    if not health_model_trainer.loaded or health_model_trainer.last_report is None:
+        return RetrainReport(status="never_run")
+    return health_model_trainer.last_report
+
+
 @router.post("/summary", response_model=SummaryResponse)
-def summarize_text(request: SummaryRequest):
+async def summarize_text(request: SummaryRequest):
     """
     Summarize text using extractive summarization (no external API required).
     
@@ -140,8 +270,18 @@ def summarize_text(request: SummaryRequest):
     
     Note: This uses a simple extractive algorithm based on word frequency.
     For production use, consider integrating with more advanced NLP services.
+    
+    Runs in the analysis process pool; returns 503 when the pool queue is full
+    and 504 when the call exceeds the configured timeout. Repeated requests for
+    the same text and `max_sentences` are answered from the summary cache.
     """
-    summary = nlp_service.summarize_text(request.text, request.max_sentences or 5)
+    max_sentences = request.max_sentences or 5
+    cache_key = summary_cache.key_for(request.text, max_sentences)
+    # The cache may read or write its SQLite table; keep that off the event loop
+    summary = await run_in_threadpool(summary_cache.get, cache_key)
+    if summary is None:
+        summary = await run_in_pool(summary_task, request.text, max_sentences)
+        await run_in_threadpool(summary_cache.put, cache_key, summary)
     
     return SummaryResponse(
         summary=summary,
@@ -150,14 +290,140 @@ def summarize_text(request: SummaryRequest):
     )
 
 
+@router.post("/summary/batch", response_model=BatchSummaryResponse)
+async def summarize_batch(request: BatchSummaryRequest):
+    """
+    Summarize many documents in one request.
+    
+    All documents share one sparse term-frequency matrix: words are weighted by
+    TF-IDF across the batch, so terms that appear in every document (boilerplate
+    like "status" or "update") count less than terms specific to a document.
+    Every sentence of every document is scored in a single vectorized pass.
+    
+    Request Body:
+    - documents (list): Objects with an optional `id` and the `text`
+    - max_sentences (int, optional): Maximum sentences per summary (default: 5)
+    - digest_sentences (int, optional): If > 0, also return a combined digest
+      of that many sentences drawn from the whole batch (default: 0)
+    
+    Example Request:
+    ```json
+    {
+      "documents": [
+        {"id": "e-commerce", "text": "Checkout is done. Payment tests fail on refunds. Demo is Friday."},
+        {"id": "mobile", "text": "Release build is green. Store review pending. Icons updated."}
+      ],
+      "max_sentences": 1,
+      "digest_sentences": 2
+    }
+    ```
+    
+    Example Response:
+    ```json
+    {
+      "summaries": [
+        {"id": "e-commerce", "summary": "Payment tests fail on refunds.", "original_length": 65, "summary_length": 30},
+        {"id": "mobile", "summary": "Release build is green.", "original_length": 61, "summary_length": 23}
+      ],
+      "digest": "Payment tests fail on refunds. Release build is green."
+    }
+    ```
+    """
+    texts = [document.text for document in request.documents]
+    summaries, digest = await run_in_pool(
+        summary_batch_task,
+        texts,
+        request.max_sentences or 5,
+        request.digest_sentences or 0
+    )
+    
+    return BatchSummaryResponse(
+        summaries=[
+            BatchSummaryItem(
+                id=document.id,
+                summary=summary,
+                original_length=len(document.text),
+                summary_length=len(summary)
+            )
+            for document, summary in zip(request.documents, summaries)
+        ],
+        digest=digest
+    )
+
+
+@router.get("/summary/cache", response_model=SummaryCacheStats)
+def get_summary_cache_stats():
+    """
+    Get summary cache statistics.
+    
+    Example Response:
+    ```json
+    {
+      "entries": 412,
+      "bytes": 1048576,
+      "max_bytes": 67108864,
+      "hits": 9120,
+      "misses": 412,
+      "bypassed": 37,
+      "evictions": 0,
+      "hit_rate": 0.9568,
+      "persistent": true
+    }
+    ```
+    """
+    return summary_cache.stats()
+
+
+@router.post("/summary/file", response_model=SummaryResponse)
+async def summarize_file(file: UploadFile = File(...), max_sentences: int = 5):
+    """
+    Summarize an uploaded text document (e.g. a meeting-notes export).
+    
+    Large files are processed as a stream: the upload is spooled to disk and
+    summarized in two chunked passes that keep only the word frequencies and
+    the best `max_sentences` sentences in memory.
+    
+    Form Data:
+    - file: UTF-8 text file
+    
+    Query Parameters:
+    - max_sentences (int): Maximum number of sentences in summary (default: 5)
+    
+    Example Request:
+    ```
+    curl -X POST "http://localhost:8000/api/summary/file?max_sentences=3" \
+      -F "file=@meeting-notes.txt"
+    ```
+    
+    Returns:
+        Summarized text along with the document length in characters
+    """
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    try:
+        # Disk writes run on a worker thread, not the event loop
+        with os.fdopen(fd, "wb") as spool:
+            await run_in_threadpool(shutil.copyfileobj, file.file, spool, 1024 * 1024)
+        summary, original_length = await run_in_pool(summary_file_task, path, max_sentences)
+    finally:
+        os.unlink(path)
+    
+    return SummaryResponse(
+        summary=summary,
+        original_length=original_length,
+        summary_length=len(summary)
+    )
+
+
 @router.get("/reassignments", response_model=List[TaskReassignmentSuggestion])
-def get_reassignment_suggestions(db: Session = Depends(get_db)):
+async def get_reassignment_suggestions():
     """
     Get AI-powered task reassignment suggestions for overloaded developers.
     
     Automatically identifies developers working at 120%+ capacity and suggests
-    reassigning their tasks to developers with available capacity. This helps
-    prevent burnout and optimize team workload distribution.
+    moving specific open tasks to developers with available capacity. Receivers
+    are picked from a capacity heap so the load is spread across the team instead
+    of piling onto a single developer. This helps prevent burnout and optimize
+    team workload distribution.
     
     Returns:
         List of reassignment suggestions with details about:
@@ -172,10 +438,16 @@ def get_reassignment_suggestions(db: Session = Depends(get_db)):
       {
         "developer": "Diana Prince",
         "current_load": 137.5,
+        "projected_load": 96.25,
         "suggested_reassignments": [
           {
+            "task_id": 7,
+            "task_title": "Implement Mobile App Development Feature 2",
             "from": "Diana Prince",
+            "from_developer_id": 5,
             "to": "Alice Smith",
+            "to_developer_id": 2,
+            "estimated_hours": 5.5,
             "reason": "Developer is 137.5% loaded. Alice Smith has capacity."
           }
         ],
@@ -186,6 +458,85 @@ def get_reassignment_suggestions(db: Session = Depends(get_db)):
     
     Note: Returns empty list if no developers are overloaded (120%+ capacity).
     """
-    suggestions = ml_service.suggest_task_reassignments(db)
-    return suggestions
+    return await response_cache.aget_or_compute(
+        "api_reassignments", lambda: run_in_pool(reassignments_task),
+        tags=("developer_metrics", "tasks", "users")
+    )
+
+
+@router.post("/workload/what-if", response_model=WhatIfResponse)
+def simulate_what_if(request: WhatIfRequest, db: Session = Depends(get_db)):
+    """
+    Preview the effect of reassigning tasks and shifting project deadlines.
+    
+    Nothing is written. The scenario is applied to an in-memory snapshot of
+    open tasks and developer capacity (latest `hours_worked` from the metrics,
+    open task counts), and the load and overload flag of every developer and
+    the health of every project are recomputed in one vectorized pass. The
+    snapshot is rebuilt only after tasks, projects, users or metrics change,
+    so repeated scenarios cost milliseconds even with thousands of developers.
+    
+    Moves are applied in order. Each one names either `task_ids` or
+    `from_developer_id` (all of that developer's open tasks), and
+    `to_developer_id` (null unassigns). A moved task takes its assignee's hours
+    per open task with it. A deadline shift moves the deadlines of a project's
+    open tasks by `days` and re-checks them against the current time.
+    
+    Only developers and projects the scenario changes are listed; the totals
+    cover everyone.
+    
+    Example Request:
+    ```json
+    {
+      "moves": [{"task_ids": [7, 8, 9], "to_developer_id": 3}],
+      "deadline_shifts": [{"project_id": 2, "days": 7}]
+    }
+    ```
+    
+    Example Response:
+    ```json
+    {
+      "tasks_moved": 3,
+      "tasks_shifted": 4,
+      "developers": 4,
+      "overloaded_before": 1,
+      "overloaded_after": 0,
+      "projects": 3,
+      "changed_developers": [
+        {
+          "developer_id": 3,
+          "developer": "Bob Johnson",
+          "open_tasks_before": 2,
+          "open_tasks_after": 5,
+          "hours_before": 20.0,
+          "hours_after": 47.5,
+          "load_before": 50.0,
+          "load_after": 118.75,
+          "overloaded_before": false,
+          "overloaded_after": false
+        },
+        {
+          "developer_id": 5,
+          "developer": "Diana Prince",
+          "open_tasks_before": 6,
+          "open_tasks_after": 3,
+          "hours_before": 55.0,
+          "hours_after": 27.5,
+          "load_before": 137.5,
+          "load_after": 68.75,
+          "overloaded_before": true,
+          "overloaded_after": false
+        }
+      ],
+      "changed_projects": [
+        {"project_id": 2, "overdue_before": 2, "overdue_after": 0, "health_before": 20.0, "health_after": 30.0}
+      ]
+    }
+    ```
+    
+    Errors: 400 for a task that is not open, a move with neither (or both) of
+    `task_ids` and `from_developer_id`, or a target developer without metrics;
+    404 for an unknown project.
+    """
+    return whatif_simulator.simulate(db, request.moves, request.deadline_shifts)
 
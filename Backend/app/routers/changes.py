@@ -0,0 +1,132 @@
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas import ChangeFeedResponse
+from app.services.change_feed import CursorExpired, check_cursor, load_changes, stream_changes
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+
+@router.get("/", response_model=ChangeFeedResponse)
+def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Incremental sync: every task, project, user and metrics change after `since`.
+
+    Changes are read from the append-only change_log, written in the same
+    transaction as the change itself. Store `last_seq` and pass it as `since`
+    on the next call; keep calling while `has_more` is true.
+
+    Changes older than `CHANGE_LOG_RETENTION_HOURS` are pruned. A `since`
+    from before the oldest kept change gets 410 Gone: reload the data, then
+    resume from the current `last_seq`.
+
+    Example Request:
+    ```
+    GET /api/changes?since=41
+    ```
+
+    Example Response:
+    ```json
+    {
+      "changes": [
+        {
+          "seq": 42,
+          "table": "tasks",
+          "row_id": 7,
+          "op": "update",
+          "payload": {"id": 7, "title": "Fix login redirect bug", "status": "completed", "project_id": 1},
+          "created_at": "2024-01-15T10:30:00"
+        }
+      ],
+      "last_seq": 42,
+      "has_more": false
+    }
+    ```
+    """
+    try:
+        check_cursor(since, db)
+    except CursorExpired as exc:
+        raise HTTPException(status_code=410, detail=str(exc))
+    changes = load_changes(since, limit, db)
+    return {
+        "changes": changes,
+        "last_seq": changes[-1]["seq"] if changes else since,
+        "has_more": len(changes) == limit
+    }
+
+
+@router.get("/stream")
+async def stream_changes_sse(
+    since: int = Query(0, ge=0),
+    last_event_id: str = Header(None)
+):
+    """
+    Server-Sent Events stream of changes: the backlog after `since`, then live pushes.
+
+    Each event has `id: <seq>`, so a reconnecting EventSource resumes from the
+    `Last-Event-ID` header. A comment line is sent as a heartbeat when idle.
+    If the client falls too far behind, the stream ends with a `resync` event;
+    reconnect with the last seen seq. If `since` is older than the retained
+    change log, the stream ends with an `expired` event instead: reload the
+    data and reconnect from the current seq.
+
+    Example:
+    ```
+    const source = new EventSource("/api/changes/stream?since=42");
+    source.addEventListener("change", e => apply(JSON.parse(e.data)));
+    ```
+    """
+    if last_event_id and last_event_id.isdigit():
+        since = max(since, int(last_event_id))
+
+    async def events():
+        try:
+            async for change in stream_changes(since):
+                if change is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                data = json.dumps(jsonable_encoder(change))
+                yield f"id: {change['seq']}\nevent: change\ndata: {data}\n\n"
+        except OverflowError:
+            yield "event: resync\ndata: {}\n\n"
+        except CursorExpired:
+            yield "event: expired\ndata: {}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def stream_changes_ws(websocket: WebSocket, since: int = 0):
+    """
+    WebSocket stream of changes: the backlog after `since`, then live pushes.
+
+    Every message is one change as JSON. Idle connections get
+    `{"type": "heartbeat"}`. If the client falls too far behind, the socket is
+    closed with code 4000; reconnect with the last seen seq. If `since` is
+    older than the retained change log, it is closed with code 4001: reload
+    the data and reconnect from the current seq.
+    """
+    await websocket.accept()
+    try:
+        async for change in stream_changes(since):
+            if change is None:
+                await websocket.send_json({"type": "heartbeat"})
+            else:
+                await websocket.send_json(jsonable_encoder({"type": "change", **change}))
+    except OverflowError:
+        await websocket.close(code=4000, reason="resync")
+    except CursorExpired:
+        await websocket.close(code=4001, reason="expired")
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db
+from app.models import Job, JobStatus
+from app.schemas import JobResponse
+from app.services.job_queue import job_queue, describe
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("/", response_model=List[JobResponse])
+def get_jobs(
+    status: JobStatus = None,
+    kind: str = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    List background jobs, newest first.
+
+    Query Parameters:
+    - status (str, optional): "queued", "running", "succeeded", "failed" or "cancelled"
+    - kind (str, optional): e.g. "recompute_health", "retrain_health_model", "import_tasks"
+    - limit (int, optional): At most this many jobs (default 50)
+    """
+    query = db.query(Job)
+    if status:
+        query = query.filter(Job.status == status)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return [describe(job) for job in query.order_by(Job.id.desc()).limit(limit)]
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Get the status of a background job.
+
+    Endpoints that queue work answer 202 with a `status_url` pointing here.
+    Poll until `status` is "succeeded" (see `result`) or "failed" (see `error`).
+    Failed attempts are retried with exponential backoff up to `max_attempts`.
+
+    Example Response:
+    ```json
+    {
+      "id": 12,
+      "kind": "recompute_health",
+      "status": "succeeded",
+      "priority": 0,
+      "dedup_key": "recompute_health:all",
+      "attempts": 1,
+      "max_attempts": 3,
+      "payload": {"project_ids": null},
+      "result": {"projects": 3, "updated": 2},
+      "error": null,
+      "run_after": "2024-01-15T10:30:00",
+      "created_at": "2024-01-15T10:30:00",
+      "started_at": "2024-01-15T10:30:00.250000",
+      "finished_at": "2024-01-15T10:30:00.310000"
+    }
+    ```
+
+    Errors:
+    - 404: Job not found
+    """
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return describe(job)
+
+
+@router.delete("/{job_id}", response_model=JobResponse)
+def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Cancel a job that has not started yet.
+
+    Errors:
+    - 404: Job not found
+    - 409: Job is already running or finished
+    """
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_queue.cancel(job_id, db):
+        db.refresh(job)
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value} and can no longer be cancelled")
+    db.refresh(job)
+    return describe(job)
@@ -4,6 +4,8 @@ from typing import List
 from app.database import get_db
 from app.models import DeveloperMetrics, User
 from app.schemas import DeveloperMetricsCreate, DeveloperMetricsUpdate, DeveloperMetricsResponse
+from app.services.response_cache import response_cache
+from app.services.writes import apply_update, commit_write
 
 router = APIRouter(prefix="/api/metrics", tags=["metrics"])
 
@@ -33,7 +35,9 @@ def create_metric(metric: DeveloperMetricsCreate, db: Session = Depends(get_db))
     Create a new developer metric entry.
     
     Tracks developer performance metrics including tasks completed, hours worked,
-    and bugs reported. These metrics are used by the AI workload analyzer.
+    and bugs reported. These metrics are used by the AI workload analyzer, and
+    each insert updates the streaming overload detector behind
+    `GET /api/workload/alerts`.
     
     Example Request:
     ```json
@@ -55,38 +59,31 @@ def create_metric(metric: DeveloperMetricsCreate, db: Session = Depends(get_db))
       "tasks_completed": 60,
       "hours_worked": 38.0,
       "bugs_reported": 2,
-      "recorded_at": "2024-01-15T10:30:00"
+      "recorded_at": "2024-01-15T10:30:00",
+      "version": 1
     }
     ```
     
     Errors:
     - 404: Developer not found (if developer_id doesn't exist)
     """
-    # Verify developer exists
-    user = db.query(User).filter(User.id == metric.developer_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Developer not found")
-    
     db_metric = DeveloperMetrics(**metric.model_dump())
     db.add(db_metric)
-    db.commit()
-    db.refresh(db_metric)
+    commit_write(db, [("Developer not found", User, metric.developer_id)])
+    response_cache.invalidate("developer_metrics")
     return db_metric
 
 
 @router.put("/{metric_id}", response_model=DeveloperMetricsResponse)
 def update_metric(metric_id: int, metric_update: DeveloperMetricsUpdate, db: Session = Depends(get_db)):
-    """Update a metric"""
+    """Update a metric (409 if a `version` is sent and the metric changed since)"""
     db_metric = db.query(DeveloperMetrics).filter(DeveloperMetrics.id == metric_id).first()
     if not db_metric:
         raise HTTPException(status_code=404, detail="Metric not found")
     
-    update_data = metric_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_metric, key, value)
-    
-    db.commit()
-    db.refresh(db_metric)
+    apply_update(db_metric, metric_update.model_dump(exclude_unset=True))
+    commit_write(db)
+    response_cache.invalidate("developer_metrics")
     return db_metric
 
 
@@ -99,5 +96,6 @@ def delete_metric(metric_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_metric)
     db.commit()
+    response_cache.invalidate("developer_metrics")
     return None
 
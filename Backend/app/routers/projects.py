@@ -1,20 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
 from app.models import Project
-from app.schemas import ProjectCreate, ProjectUpdate, ProjectResponse
+from app.schemas import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, JobAccepted, HealthConsistencyReport, CriticalPathResponse
+)
+from app.services.dependency_service import dependency_graphs
+from app.services.health_service import project_health
+from app.services.job_queue import job_queue, accepted
+from app.services.table_versions import conditional_get
+from app.services.response_cache import response_cache, project_tag
+from app.services.writes import apply_update, commit_write, delete_project as delete_project_rows
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
 
 @router.get("/", response_model=List[ProjectResponse])
-def get_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all projects"""
+def get_projects(
+    skip: int = 0,
+    limit: int = 100,
+    _etag: str = Depends(conditional_get("projects")),
+    db: Session = Depends(get_db)
+):
+    """Get all projects (answers If-None-Match with 304 while projects are unchanged)"""
     projects = db.query(Project).offset(skip).limit(limit).all()
     return projects
 
 
+@router.post("/health/recompute", response_model=JobAccepted, status_code=202)
+def recompute_health_scores(response: Response, project_id: int = None):
+    """
+    Recompute and store `health_score` from each project's tasks, in the background.
+    
+    The score is task progress minus 5 points per overdue open task (at most
+    30 points off). Only projects whose score changed are written. While a
+    recompute for the same scope is queued or running, the existing job is
+    returned instead of queueing another.
+    
+    Query Parameters:
+    - project_id (int, optional): Only this project (default: all projects)
+    
+    Example Response (202):
+    ```json
+    {
+      "job_id": 12,
+      "kind": "recompute_health",
+      "status": "queued",
+      "deduplicated": false,
+      "status_url": "/api/jobs/12"
+    }
+    ```
+    """
+    scope = "all" if project_id is None else str(project_id)
+    job, created = job_queue.enqueue(
+        "recompute_health",
+        {"project_ids": None if project_id is None else [project_id]},
+        dedup_key=f"recompute_health:{scope}"
+    )
+    return accepted(job, created, response)
+
+
+@router.get("/health/consistency", response_model=HealthConsistencyReport)
+def check_health_scores(
+    sample: int = Query(100, ge=1, le=10000),
+    repair: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Compare stored `health_score` values with freshly computed ones.
+    
+    Stored scores are updated shortly after every task write; this checks a
+    random sample of projects for drift (e.g. rows edited outside the API).
+    
+    Query Parameters:
+    - sample (int, optional): Number of random projects to check (default 100)
+    - repair (bool, optional): Store the fresh score for mismatched projects
+    
+    Example Response:
+    ```json
+    {
+      "checked": 3,
+      "mismatched": [{"project_id": 2, "stored": 75.0, "expected": 50.0}],
+      "repaired": 1
+    }
+    ```
+    """
+    return project_health.check(db, sample=sample, repair=repair)
+
+
 @router.get("/{project_id}", response_model=ProjectResponse)
 def get_project(project_id: int, db: Session = Depends(get_db)):
     """Get a specific project by ID"""
@@ -24,19 +98,69 @@ def get_project(project_id: int, db: Session = Depends(get_db)):
     return project
 
 
+@router.get("/{project_id}/critical-path", response_model=CriticalPathResponse)
+def get_critical_path(project_id: int, db: Session = Depends(get_db)):
+    """
+    Critical-path schedule of a project's open tasks.
+    
+    Tasks start today at the earliest and after everything they depend on
+    (POST /api/tasks/{id}/dependencies); each takes its `estimated_days`
+    (one day when unestimated). Completed tasks take no time but still pass
+    on the wait for their own open prerequisites, and are left out of
+    `tasks` and `critical_path`. The schedule comes from an in-memory graph
+    of the project that is updated incrementally on every task or
+    dependency change. `critical_path` is the chain of tasks that decides
+    the finish date; `late_tasks` have negative slack, so they can't make
+    their own deadline or a dependent task's.
+    
+    Example Response:
+    ```json
+    {
+      "project_id": 1,
+      "start": "2024-02-01T00:00:00",
+      "finish": "2024-02-06T00:00:00",
+      "duration_days": 5.0,
+      "critical_path": [4, 7],
+      "late_tasks": [],
+      "tasks": [
+        {
+          "id": 4,
+          "depends_on": [],
+          "duration_days": 2.0,
+          "earliest_start": "2024-02-01T00:00:00",
+          "earliest_finish": "2024-02-03T00:00:00",
+          "latest_start": "2024-02-01T00:00:00",
+          "latest_finish": "2024-02-03T00:00:00",
+          "slack_days": 0.0,
+          "critical": true
+        }
+      ]
+    }
+    ```
+    
+    Errors:
+    - 404: Project not found
+    """
+    if db.get(Project, project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return dependency_graphs.critical_path(db, project_id)
+
+
 @router.post("/", response_model=ProjectResponse, status_code=201)
 def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
     """
     Create a new project.
     
+    `health_score` is computed from the project's tasks and stored shortly
+    after each task write; it cannot be set here or on update.
+    
     Example Request:
     ```json
     {
       "name": "E-Commerce Platform",
       "client_name": "Client Corp",
       "start_date": "2024-01-01T00:00:00",
-      "end_date": "2024-06-30T00:00:00",
-      "health_score": 85.0
+      "end_date": "2024-06-30T00:00:00"
     }
     ```
     
@@ -48,43 +172,41 @@ def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
       "client_name": "Client Corp",
       "start_date": "2024-01-01T00:00:00",
       "end_date": "2024-06-30T00:00:00",
-      "health_score": 85.0,
+      "health_score": 100.0,
+      "overdue_tasks": 0,
       "created_at": "2024-01-15T10:30:00",
-      "updated_at": null
+      "updated_at": null,
+      "version": 1
     }
     ```
     """
     db_project = Project(**project.model_dump())
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    commit_write(db)
     return db_project
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 def update_project(project_id: int, project_update: ProjectUpdate, db: Session = Depends(get_db)):
-    """Update a project"""
+    """Update a project (409 if a `version` is sent and the project changed since)"""
     db_project = db.query(Project).filter(Project.id == project_id).first()
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    update_data = project_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_project, key, value)
-    
-    db.commit()
-    db.refresh(db_project)
+    apply_update(db_project, project_update.model_dump(exclude_unset=True))
+    commit_write(db)
+    response_cache.invalidate(project_tag(project_id))
     return db_project
 
 
 @router.delete("/{project_id}", status_code=204)
 def delete_project(project_id: int, db: Session = Depends(get_db)):
-    """Delete a project"""
+    """Delete a project and all of its tasks (a fixed number of statements, however many tasks)"""
     db_project = db.query(Project).filter(Project.id == project_id).first()
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    db.delete(db_project)
-    db.commit()
+    delete_project_rows(db, db_project)
+    response_cache.invalidate("tasks", project_tag(project_id))
     return None
 
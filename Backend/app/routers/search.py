@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db
+from app.models import TaskStatus
+from app.schemas import SearchResponse
+from app.services.search_service import search_service, build_match_query, SEARCH_KINDS
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("/", response_model=SearchResponse)
+def search(
+    q: str,
+    project_id: int = None,
+    status: List[TaskStatus] = Query(None),
+    kind: str = "all",
+    prefix: bool = True,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search over task titles, project names and client names.
+    
+    Backed by a SQLite FTS5 index kept in sync by triggers, ranked with bm25.
+    Every word of `q` is matched as a prefix by default, so "auth imp" finds
+    "Implement user authentication".
+    
+    Query Parameters:
+    - q (str): Search text
+    - project_id (int, optional): Only tasks of this project (or this project itself)
+    - status (list, optional): Only tasks with these statuses; repeat to pass several
+    - kind (str): "all" (default), "tasks" or "projects"
+    - prefix (bool): Match words as prefixes (default: true)
+    - limit (int): Maximum results per kind (default: 20, max: 100)
+    
+    Example Request:
+    ```
+    GET /api/search?q=feat&project_id=1&status=todo&status=in_progress
+    ```
+    
+    Example Response:
+    ```json
+    {
+      "query": "feat",
+      "tasks": [
+        {
+          "id": 2,
+          "title": "Implement E-Commerce Platform Feature 2",
+          "status": "todo",
+          "project_id": 1,
+          "assigned_to": 3,
+          "deadline": "2024-02-15T00:00:00",
+          "score": 0.8421
+        }
+      ],
+      "projects": []
+    }
+    ```
+    
+    Errors:
+    - 400: Query has no searchable words, or `kind` is invalid
+    """
+    if kind not in SEARCH_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(SEARCH_KINDS)}")
+    if build_match_query(q) is None:
+        raise HTTPException(status_code=400, detail="Query must contain at least one word")
+    
+    return search_service.search(
+        db, q,
+        project_id=project_id,
+        statuses=status,
+        kind=kind,
+        prefix=prefix,
+        limit=limit
+    )
@@ -1,21 +1,200 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List
 from app.database import get_db
-from app.models import Task, Project, User
-from app.schemas import TaskCreate, TaskUpdate, TaskResponse
+from app.models import Task, TaskDependency, Project, User
+from app.schemas import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskImportRequest, JobAccepted,
+    DuplicateCluster, DuplicateTask, AssigneeRecommendation,
+    TaskDependencyCreate, TaskDependencyResponse
+)
+from app.services.dependency_service import drop_dependencies, would_create_cycle
+from app.services.job_queue import job_queue, accepted
+from app.services.lazy import lazy_service
+from app.services.table_versions import conditional_get
+from app.services.task_filters import TaskFilters, task_order
+from app.services.response_cache import response_cache, project_tag
+from app.services.writes import apply_update, commit_write
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+# NumPy/SciPy-backed indexes load on first use; until then the write hooks below
+# have nothing to update (both indexes bootstrap from the database when loaded)
+task_dedup_index = lazy_service("app.services.dedup_service", "task_dedup_index")
+assignee_recommender = lazy_service("app.services.recommendation_service", "assignee_recommender")
+
 
 @router.get("/", response_model=List[TaskResponse])
-def get_tasks(skip: int = 0, limit: int = 100, project_id: int = None, db: Session = Depends(get_db)):
-    """Get all tasks, optionally filtered by project"""
-    query = db.query(Task)
-    if project_id:
-        query = query.filter(Task.project_id == project_id)
-    tasks = query.offset(skip).limit(limit).all()
-    return tasks
+def get_tasks(
+    skip: int = 0,
+    limit: int = 100,
+    filters: TaskFilters = Depends(),
+    order: tuple = Depends(task_order),
+    _etag: str = Depends(conditional_get("tasks")),
+    db: Session = Depends(get_db)
+):
+    """
+    List tasks, filtered and sorted in the database.
+    
+    Filters combine with AND; each one is answered from an index on tasks.
+    Answers 304 on If-None-Match while tasks are unchanged.
+    
+    Query Parameters:
+    - project_id (int, optional): Only tasks of this project
+    - status (list, optional): Only tasks with these statuses; repeat to pass several
+    - assigned_to (int, optional): Only tasks assigned to this user
+    - deadline_from / deadline_to (datetime, optional): Deadline within this range (inclusive)
+    - overdue (bool, optional): Only open tasks past their deadline (or, when false, the others)
+    - updated_since (datetime, optional): Created or updated at or after this time
+    - sort (str): id (default), deadline, created_at or updated_at; prefix "-" for descending.
+      Tasks without a deadline sort last either way
+    - skip, limit (int): Page (default: first 100)
+    
+    Example Request:
+    ```
+    GET /api/tasks?project_id=1&status=todo&status=in_progress&deadline_to=2024-03-01T00:00:00Z&sort=deadline
+    ```
+    
+    Example Response:
+    ```json
+    [
+      {
+        "title": "Implement E-Commerce Platform Feature 2",
+        "status": "todo",
+        "deadline": "2024-02-15T00:00:00",
+        "assigned_to": 3,
+        "project_id": 1,
+        "id": 2,
+        "created_at": "2024-01-10T09:30:00",
+        "updated_at": null,
+        "version": 1
+      }
+    ]
+    ```
+    
+    Errors:
+    - 400: Unknown sort, or deadline_from after deadline_to
+    """
+    return filters.apply(db.query(Task)).order_by(*order).offset(skip).limit(limit).all()
+
+
+def _load_titles(db: Session, task_ids: List[int]) -> Dict[int, Task]:
+    """Fetch id, title and status for many tasks, 500 ids per query"""
+    rows = {}
+    for start in range(0, len(task_ids), 500):
+        chunk = task_ids[start:start + 500]
+        for row in db.query(Task.id, Task.title, Task.status).filter(Task.id.in_(chunk)):
+            rows[row.id] = row
+    return rows
+
+
+@router.get("/duplicates", response_model=List[DuplicateCluster])
+def get_duplicate_tasks(project_id: int = None, db: Session = Depends(get_db)):
+    """
+    List clusters of near-duplicate tasks, per project.
+    
+    Titles are compared with MinHash signatures over their words and word
+    pairs; an LSH index only compares tasks that share a bucket, so this
+    stays fast on large projects. Tasks with an estimated similarity of
+    DUPLICATE_SIMILARITY_THRESHOLD (default 0.6) or more are grouped together.
+    
+    Query Parameters:
+    - project_id (int, optional): Only this project
+    
+    Example Response:
+    ```json
+    [
+      {
+        "project_id": 1,
+        "tasks": [
+          {"id": 4, "title": "Fix login redirect bug", "status": "todo", "similarity": null},
+          {"id": 9, "title": "Fix the login redirect bug", "status": "in_progress", "similarity": null}
+        ]
+      }
+    ]
+    ```
+    """
+    task_dedup_index.bootstrap(db)
+    clusters = task_dedup_index.clusters(project_id)
+    rows = _load_titles(db, [task_id for groups in clusters.values() for group in groups for task_id in group])
+    return [
+        DuplicateCluster(
+            project_id=cluster_project,
+            tasks=[
+                DuplicateTask(id=task_id, title=rows[task_id].title, status=rows[task_id].status)
+                for task_id in group if task_id in rows
+            ]
+        )
+        for cluster_project, groups in sorted(clusters.items())
+        for group in groups
+    ]
+
+
+@router.get("/duplicates/check", response_model=List[DuplicateTask])
+def check_duplicate_task(
+    title: str,
+    project_id: int,
+    exclude_task_id: int = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Find existing tasks in a project that look like duplicates of a title.
+    
+    Meant to be called before creating a task (e.g. while a client import is
+    being reviewed). Pass `exclude_task_id` when checking an existing task.
+    
+    Example Request:
+    ```
+    GET /api/tasks/duplicates/check?title=Fix%20login%20redirect&project_id=1
+    ```
+    
+    Example Response:
+    ```json
+    [
+      {"id": 4, "title": "Fix login redirect bug", "status": "todo", "similarity": 0.781}
+    ]
+    ```
+    """
+    task_dedup_index.bootstrap(db)
+    matches = task_dedup_index.find_similar(title, project_id, exclude_task_id=exclude_task_id, limit=limit)
+    rows = _load_titles(db, [task_id for task_id, _ in matches])
+    return [
+        DuplicateTask(id=task_id, title=rows[task_id].title, status=rows[task_id].status, similarity=similarity)
+        for task_id, similarity in matches if task_id in rows
+    ]
+
+
+@router.get("/recommend-assignee", response_model=List[AssigneeRecommendation])
+def recommend_assignee(title: str, k: int = Query(5, ge=1, le=50), db: Session = Depends(get_db)):
+    """
+    Suggest developers for a new task before creating it.
+    
+    Each developer has a TF-IDF profile of the titles of tasks they completed;
+    the title is matched against every profile at once and blended with how
+    much capacity the developer has left (ASSIGNEE_LOAD_WEIGHT, default 0.3).
+    
+    Example Request:
+    ```
+    GET /api/tasks/recommend-assignee?title=Fix%20checkout%20payment%20bug&k=3
+    ```
+    
+    Example Response:
+    ```json
+    [
+      {
+        "developer_id": 3,
+        "developer": "Bob Johnson",
+        "score": 0.7412,
+        "similarity": 0.8126,
+        "load_percentage": 45.0,
+        "open_tasks": 2
+      }
+    ]
+    ```
+    """
+    return assignee_recommender.recommend(db, title, k)
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
@@ -55,7 +234,8 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db)):
       "assigned_to": 2,
       "project_id": 1,
       "created_at": "2024-01-15T10:30:00",
-      "updated_at": null
+      "updated_at": null,
+      "version": 1
     }
     ```
     
@@ -63,50 +243,87 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db)):
     - 404: Project not found (if project_id doesn't exist)
     - 404: Assigned user not found (if assigned_to doesn't exist)
     """
-    # Verify project exists
-    project = db.query(Project).filter(Project.id == task.project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Verify assigned user exists (if provided)
-    if task.assigned_to:
-        user = db.query(User).filter(User.id == task.assigned_to).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="Assigned user not found")
-    
+    # One INSERT ... RETURNING; the foreign keys reject a missing project or user
     db_task = Task(**task.model_dump())
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    commit_write(db, [
+        ("Project not found", Project, task.project_id),
+        ("Assigned user not found", User, task.assigned_to),
+    ])
+    response_cache.invalidate("tasks", project_tag(db_task.project_id))
     return db_task
 
 
+@router.post("/import", response_model=JobAccepted, status_code=202)
+def import_tasks(request: TaskImportRequest, response: Response):
+    """
+    Bulk-create up to 10,000 tasks in the background.
+    
+    The tasks are inserted in one transaction by a background job; rows
+    referencing a missing project or user are skipped and listed in the job
+    result. Poll `status_url` for the outcome.
+    
+    Example Request:
+    ```json
+    {
+      "tasks": [
+        {"title": "Set up CI", "project_id": 1},
+        {"title": "Write onboarding docs", "project_id": 1, "assigned_to": 3}
+      ]
+    }
+    ```
+    
+    Example Response (202):
+    ```json
+    {
+      "job_id": 13,
+      "kind": "import_tasks",
+      "status": "queued",
+      "deduplicated": false,
+      "status_url": "/api/jobs/13"
+    }
+    ```
+    
+    Job result:
+    ```json
+    {"created": 2, "task_ids": [41, 42], "skipped": []}
+    ```
+    """
+    job, created = job_queue.enqueue(
+        "import_tasks",
+        {"tasks": [task.model_dump(mode="json") for task in request.tasks]},
+        priority=5
+    )
+    return accepted(job, created, response)
+
+
 @router.put("/{task_id}", response_model=TaskResponse)
 def update_task(task_id: int, task_update: TaskUpdate, db: Session = Depends(get_db)):
-    """Update a task"""
+    """
+    Update a task.
+    
+    Send the `version` from your last read to make the update conditional:
+    if the task changed since, nothing is written and the answer is 409.
+    
+    Errors:
+    - 404: Task, project or assigned user not found
+    - 409: Task was changed by someone else (stale `version`)
+    """
     db_task = db.query(Task).filter(Task.id == task_id).first()
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
     
     update_data = task_update.model_dump(exclude_unset=True)
-    
-    # Verify project exists (if updating)
-    if "project_id" in update_data:
-        project = db.query(Project).filter(Project.id == update_data["project_id"]).first()
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Verify assigned user exists (if updating)
-    if "assigned_to" in update_data and update_data["assigned_to"]:
-        user = db.query(User).filter(User.id == update_data["assigned_to"]).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="Assigned user not found")
-    
-    for key, value in update_data.items():
-        setattr(db_task, key, value)
-    
-    db.commit()
-    db.refresh(db_task)
+    old_project_id = db_task.project_id
+    apply_update(db_task, update_data)
+    if db_task.project_id != old_project_id:
+        # Dependencies never cross projects
+        drop_dependencies(db, task_id)
+    commit_write(db, [
+        ("Project not found", Project, update_data.get("project_id")),
+        ("Assigned user not found", User, update_data.get("assigned_to")),
+    ])
+    response_cache.invalidate("tasks", project_tag(old_project_id), project_tag(db_task.project_id))
     return db_task
 
 
@@ -117,7 +334,81 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    project_id = db_task.project_id
     db.delete(db_task)
     db.commit()
+    response_cache.invalidate("tasks", project_tag(project_id))
+    return None
+
+
+@router.post("/{task_id}/dependencies", response_model=TaskDependencyResponse, status_code=201)
+def add_dependency(task_id: int, dependency: TaskDependencyCreate, db: Session = Depends(get_db)):
+    """
+    Record that a task can't start until another task of its project is done.
+    
+    Example Request:
+    ```json
+    {"depends_on_id": 4}
+    ```
+    
+    Example Response:
+    ```json
+    {
+      "id": 12,
+      "task_id": 7,
+      "depends_on_id": 4,
+      "project_id": 1,
+      "created_at": "2024-01-15T10:30:00"
+    }
+    ```
+    
+    Errors:
+    - 400: A task can't depend on itself or on a task of another project,
+      or the dependency already exists
+    - 404: Task not found
+    - 409: The other task already depends on this one, directly or through
+      other tasks (the dependency would create a cycle)
+    """
+    task = db.get(Task, task_id)
+    prerequisite = db.get(Task, dependency.depends_on_id)
+    if task is None or prerequisite is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task_id == dependency.depends_on_id:
+        raise HTTPException(status_code=400, detail="A task can't depend on itself")
+    if task.project_id != prerequisite.project_id:
+        raise HTTPException(status_code=400, detail="Tasks can only depend on tasks of the same project")
+    
+    edge = TaskDependency(task_id=task_id, depends_on_id=dependency.depends_on_id, project_id=task.project_id)
+    db.add(edge)
+    try:
+        # Takes the write lock, so the cycle check below sees every committed edge
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Dependency already exists") from None
+    if would_create_cycle(db, task_id, dependency.depends_on_id):
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"Task {dependency.depends_on_id} already depends on task {task_id}; this would create a cycle"
+        )
+    commit_write(db, [("Task not found", Task, task_id), ("Task not found", Task, dependency.depends_on_id)])
+    response_cache.invalidate(project_tag(edge.project_id))
+    return edge
+
+
+@router.delete("/{task_id}/dependencies/{depends_on_id}", status_code=204)
+def remove_dependency(task_id: int, depends_on_id: int, db: Session = Depends(get_db)):
+    """Remove the dependency of a task on another task"""
+    edge = db.query(TaskDependency).filter(
+        TaskDependency.task_id == task_id, TaskDependency.depends_on_id == depends_on_id
+    ).first()
+    if edge is None:
+        raise HTTPException(status_code=404, detail="Dependency not found")
+    
+    project_id = edge.project_id
+    db.delete(edge)
+    db.commit()
+    response_cache.invalidate(project_tag(project_id))
     return None
 
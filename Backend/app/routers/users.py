@@ -4,6 +4,8 @@ from typing import List
 from app.database import get_db
 from app.models import User
 from app.schemas import UserCreate, UserUpdate, UserResponse
+from app.services.response_cache import response_cache
+from app.services.writes import apply_update, commit_write, delete_user as delete_user_rows
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -81,50 +83,50 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
       "role": "developer",
       "email": "alice@zenycon.com",
       "created_at": "2024-01-15T10:31:00",
-      "updated_at": null
+      "updated_at": null,
+      "version": 1
     }
     ```
     
     Errors:
     - 400: Email already registered (if email is provided and exists)
     """
-    # Check if email already exists
-    if user.email:
-        existing_user = db.query(User).filter(User.email == user.email).first()
-        if existing_user:
-            raise HTTPException(status_code=400, detail="Email already registered")
-    
+    # The unique index on email rejects duplicates in the INSERT itself
     db_user = User(**user.model_dump())
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    commit_write(db, duplicates={"users.email": "Email already registered"})
+    response_cache.invalidate("users")
     return db_user
 
 
 @router.put("/{user_id}", response_model=UserResponse)
 def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db)):
-    """Update a user"""
+    """
+    Update a user (409 if a `version` is sent and the user changed since)
+    
+    Errors:
+    - 400: Email already registered
+    - 404: User not found
+    - 409: User was changed by someone else (stale `version`)
+    """
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    update_data = user_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_user, key, value)
-    
-    db.commit()
-    db.refresh(db_user)
+    apply_update(db_user, user_update.model_dump(exclude_unset=True))
+    commit_write(db, duplicates={"users.email": "Email already registered"})
+    response_cache.invalidate("users")
     return db_user
 
 
 @router.delete("/{user_id}", status_code=204)
 def delete_user(user_id: int, db: Session = Depends(get_db)):
-    """Delete a user"""
+    """Delete a user, unassigning their tasks and deleting their metrics"""
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    db.delete(db_user)
-    db.commit()
+    delete_user_rows(db, db_user)
+    response_cache.invalidate("users", "tasks", "developer_metrics")
     return None
 
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional, List
-from app.models import UserRole, TaskStatus
+from typing import Any, Dict, Optional, List
+from app.models import UserRole, TaskStatus, JobStatus
 
 
 # User Schemas
@@ -19,12 +19,14 @@ class UserUpdate(BaseModel):
     name: Optional[str] = None
     role: Optional[UserRole] = None
     email: Optional[EmailStr] = None
+    version: Optional[int] = None  # last version read; stale -> 409
 
 
 class UserResponse(UserBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int = 1
     
     class Config:
         from_attributes = True
@@ -36,7 +38,6 @@ class ProjectBase(BaseModel):
     client_name: str
     start_date: datetime
     end_date: Optional[datetime] = None
-    health_score: Optional[float] = 0.0
 
 
 class ProjectCreate(ProjectBase):
@@ -48,13 +49,16 @@ class ProjectUpdate(BaseModel):
     client_name: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
-    health_score: Optional[float] = None
+    version: Optional[int] = None  # last version read; stale -> 409
 
 
 class ProjectResponse(ProjectBase):
     id: int
+    health_score: Optional[float] = 100.0  # computed from the tasks, never written by clients
+    overdue_tasks: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int = 1
     
     class Config:
         from_attributes = True
@@ -65,6 +69,7 @@ class TaskBase(BaseModel):
     title: str
     status: TaskStatus = TaskStatus.TODO
     deadline: Optional[datetime] = None
+    estimated_days: Optional[float] = Field(None, gt=0)
     assigned_to: Optional[int] = None
     project_id: int
 
@@ -77,19 +82,128 @@ class TaskUpdate(BaseModel):
     title: Optional[str] = None
     status: Optional[TaskStatus] = None
     deadline: Optional[datetime] = None
+    estimated_days: Optional[float] = Field(None, gt=0)
     assigned_to: Optional[int] = None
     project_id: Optional[int] = None
+    version: Optional[int] = None  # last version read; stale -> 409
 
 
 class TaskResponse(TaskBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int = 1
     
     class Config:
         from_attributes = True
 
 
+class TaskImportRequest(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=10000)
+
+
+# Search Schemas
+class SearchTaskHit(BaseModel):
+    id: int
+    title: str
+    status: Optional[TaskStatus] = None
+    project_id: int
+    assigned_to: Optional[int] = None
+    deadline: Optional[datetime] = None
+    score: float
+
+
+class SearchProjectHit(BaseModel):
+    id: int
+    name: str
+    client_name: str
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    tasks: List[SearchTaskHit]
+    projects: List[SearchProjectHit]
+
+
+# Duplicate Detection Schemas
+class DuplicateTask(BaseModel):
+    id: int
+    title: str
+    status: Optional[TaskStatus] = None
+    similarity: Optional[float] = None
+
+
+class DuplicateCluster(BaseModel):
+    project_id: int
+    tasks: List[DuplicateTask]
+
+
+# Assignee Recommendation Schemas
+class AssigneeRecommendation(BaseModel):
+    developer_id: int
+    developer: str
+    score: float
+    similarity: float
+    load_percentage: float
+    open_tasks: int
+
+
+# Change Feed Schemas
+class ChangeEntry(BaseModel):
+    seq: int
+    table: str
+    row_id: int
+    op: str  # "insert", "update" or "delete"
+    payload: Optional[dict] = None
+    created_at: datetime
+
+
+class ChangeFeedResponse(BaseModel):
+    changes: List[ChangeEntry]
+    last_seq: int
+    has_more: bool
+
+
+# Job Schemas
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    priority: int
+    dedup_key: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    payload: Optional[dict] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    run_after: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobAccepted(BaseModel):
+    job_id: int
+    kind: str
+    status: JobStatus
+    deduplicated: bool  # true when an identical job was already queued or running
+    status_url: str
+
+
+# Health Consistency Schemas
+class HealthMismatch(BaseModel):
+    project_id: int
+    stored: Optional[float] = None
+    expected: float
+
+
+class HealthConsistencyReport(BaseModel):
+    checked: int
+    mismatched: List[HealthMismatch]
+    repaired: int
+
+
 # Developer Metrics Schemas
 class DeveloperMetricsBase(BaseModel):
     developer_id: int
@@ -107,11 +221,13 @@ class DeveloperMetricsUpdate(BaseModel):
     tasks_completed: Optional[int] = None
     hours_worked: Optional[float] = None
     bugs_reported: Optional[int] = None
+    version: Optional[int] = None  # last version read; stale -> 409
 
 
 class DeveloperMetricsResponse(DeveloperMetricsBase):
     id: int
     recorded_at: datetime
+    version: int = 1
     
     class Config:
         from_attributes = True
@@ -138,6 +254,32 @@ class WorkloadAnalysisResponse(BaseModel):
     load_percentage: Optional[float] = None
 
 
+class RetrainReport(BaseModel):
+    status: str  # "published", "rejected", "skipped", "failed", "already_running" or "never_run"
+    dataset_size: Optional[int] = None
+    train_size: Optional[int] = None
+    test_size: Optional[int] = None
+    candidate_accuracy: Optional[float] = None
+    baseline_accuracy: Optional[float] = None
+    load_seconds: Optional[float] = None
+    fit_seconds: Optional[float] = None
+    total_seconds: Optional[float] = None
+    finished_at: Optional[datetime] = None
+
+
+class WorkloadAlertResponse(BaseModel):
+    developer_id: int
+    developer: str
+    hours_worked: float
+    tasks_completed: int
+    bugs_reported: int
+    load_percentage: float
+    baseline_hours: float
+    z_score: float
+    observations: int
+    status: str  # "Overloaded" or "Normal"
+
+
 class SummaryRequest(BaseModel):
     text: str
     max_sentences: Optional[int] = 5
@@ -149,9 +291,154 @@ class SummaryResponse(BaseModel):
     summary_length: int
 
 
+class BatchSummaryDocument(BaseModel):
+    id: Optional[str] = None
+    text: str
+
+
+class BatchSummaryRequest(BaseModel):
+    documents: List[BatchSummaryDocument]
+    max_sentences: Optional[int] = 5
+    digest_sentences: Optional[int] = 0
+
+
+class BatchSummaryItem(BaseModel):
+    id: Optional[str] = None
+    summary: str
+    original_length: int
+    summary_length: int
+
+
+class BatchSummaryResponse(BaseModel):
+    summaries: List[BatchSummaryItem]
+    digest: Optional[str] = None
+
+
+class SummaryCacheStats(BaseModel):
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    bypassed: int
+    evictions: int
+    hit_rate: float
+    persistent: bool
+
+
+class TaskMove(BaseModel):
+    task_id: int
+    task_title: str
+    from_developer: str = Field(..., alias="from")
+    from_developer_id: int
+    to: str
+    to_developer_id: int
+    estimated_hours: float
+    reason: str
+    
+    class Config:
+        populate_by_name = True
+
+
 class TaskReassignmentSuggestion(BaseModel):
     developer: str
     current_load: float
-    suggested_reassignments: List[dict]
+    projected_load: float
+    suggested_reassignments: List[TaskMove]
     reason: str
 
+
+# What-if Schemas
+class WhatIfMove(BaseModel):
+    task_ids: List[int] = []                 # these open tasks...
+    from_developer_id: Optional[int] = None  # ...or every open task of this developer
+    to_developer_id: Optional[int] = None    # None unassigns
+
+
+class WhatIfDeadlineShift(BaseModel):
+    project_id: int
+    days: float  # negative pulls deadlines in
+
+
+class WhatIfRequest(BaseModel):
+    moves: List[WhatIfMove] = []
+    deadline_shifts: List[WhatIfDeadlineShift] = []
+
+
+class WhatIfDeveloper(BaseModel):
+    developer_id: int
+    developer: str
+    open_tasks_before: int
+    open_tasks_after: int
+    hours_before: float
+    hours_after: float
+    load_before: float
+    load_after: float
+    overloaded_before: bool
+    overloaded_after: bool
+
+
+class WhatIfProject(BaseModel):
+    project_id: int
+    overdue_before: int
+    overdue_after: int
+    health_before: float
+    health_after: float
+
+
+class WhatIfResponse(BaseModel):
+    tasks_moved: int
+    tasks_shifted: int
+    developers: int
+    overloaded_before: int
+    overloaded_after: int
+    projects: int
+    changed_developers: List[WhatIfDeveloper]
+    changed_projects: List[WhatIfProject]
+
+
+
+# Aggregation Schemas
+class AggregateResponse(BaseModel):
+    group_by: List[str]
+    measures: List[str]
+    rows: int
+    columns: Dict[str, List[Any]]
+
+
+# Dependency Schemas
+class TaskDependencyCreate(BaseModel):
+    depends_on_id: int
+
+
+class TaskDependencyResponse(BaseModel):
+    id: int
+    task_id: int
+    depends_on_id: int
+    project_id: int
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class ScheduledTask(BaseModel):
+    id: int
+    depends_on: List[int]
+    duration_days: float
+    earliest_start: datetime
+    earliest_finish: datetime
+    latest_start: datetime
+    latest_finish: datetime
+    slack_days: float
+    critical: bool
+
+
+class CriticalPathResponse(BaseModel):
+    project_id: int
+    start: datetime
+    finish: datetime
+    duration_days: float
+    critical_path: List[int]
+    late_tasks: List[int]
+    tasks: List[ScheduledTask]
@@ -0,0 +1,91 @@
+from typing import Dict, List
+from fastapi import HTTPException
+from sqlalchemy import func, literal_column, select, true
+from sqlalchemy.orm import Session
+from app.models import DeveloperMetrics, Project, Task
+from app.services.task_filters import TaskFilters
+
+# Average hours_worked per developer over their metric records
+_developer_hours = (
+    select(DeveloperMetrics.developer_id, func.avg(DeveloperMetrics.hours_worked).label("hours"))
+    .group_by(DeveloperMetrics.developer_id)
+    .subquery("developer_hours")
+)
+
+# Monday of the deadline's week, e.g. "2024-02-12" (literal modifiers, so the
+# GROUP BY expression is identical to the selected one)
+_deadline_week = func.date(Task.deadline, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+
+DIMENSIONS = {
+    "project": Task.project_id,
+    "assignee": Task.assigned_to,
+    "status": Task.status,
+    "deadline_week": _deadline_week,
+    "client_name": Project.client_name,
+}
+
+MEASURES = {
+    "count": func.count(Task.id),
+    "overdue_count": func.count(Task.id).filter(Task.overdue == true()),
+    # Assignees' average hours, weighted by their tasks in the group
+    "avg_hours": func.round(func.avg(_developer_hours.c.hours), 2),
+}
+
+MAX_GROUP_BY = 3
+
+
+def parse_names(values: List[str], allowed: Dict, kind: str) -> List[str]:
+    """Names from repeated and/or comma-separated parameters, checked against `allowed`"""
+    names = [name.strip() for value in values or [] for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {kind} '{unknown[0]}'; use: {', '.join(allowed)}"
+        )
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail=f"Repeated {kind}")
+    return names
+
+
+class AggregateService:
+    """
+    Counts and averages over tasks, grouped in the database.
+
+    Dimensions and measures come from fixed whitelists of SQL expressions, so
+    a request compiles to one SELECT ... GROUP BY over tasks (joined to its
+    project and to per-developer metric averages only when needed) and only
+    one row per group leaves the database.
+    """
+
+    def aggregate(self, db: Session, group_by: List[str], measures: List[str],
+                  filters: TaskFilters = None) -> Dict:
+        """
+        Returns:
+            Columnar result: {"group_by", "measures", "rows", "columns": {name: [values]}},
+            one entry per group in each column, groups sorted by their dimensions
+        """
+        dimensions = [DIMENSIONS[name] for name in group_by]
+        source = Task.__table__
+        if "client_name" in group_by:
+            source = source.join(Project.__table__, Project.id == Task.project_id)
+        if "avg_hours" in measures:
+            source = source.outerjoin(_developer_hours, _developer_hours.c.developer_id == Task.assigned_to)
+
+        statement = (
+            select(*dimensions, *(MEASURES[name] for name in measures))
+            .select_from(source)
+            .group_by(*dimensions)
+            .order_by(*dimensions)
+        )
+        if filters is not None:
+            sqlite = db.get_bind().dialect.name == "sqlite"
+            statement = statement.where(*filters.conditions(sqlite))
+
+        rows = db.execute(statement).all()
+        names = group_by + measures
+        columns = {name: [row[i] for row in rows] for i, name in enumerate(names)}
+        return {"group_by": group_by, "measures": measures, "rows": len(rows), "columns": columns}
+
+
+aggregate_service = AggregateService()
@@ -0,0 +1,202 @@
+import math
+import threading
+from array import array
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import DeveloperMetrics
+from app.services.change_feed import consume_changes
+from app.services.reassignment_service import OVERLOAD_THRESHOLD, load_percentage
+
+
+# Feature order inside each developer's stride of the state arrays
+FEATURES = ("hours_worked", "tasks_completed", "bugs_reported")
+_STRIDE = len(FEATURES)
+_HOURS, _TASKS, _BUGS = range(_STRIDE)
+
+
+class StreamingWorkloadDetector:
+    """
+    Incremental overload detector fed by metrics inserts.
+
+    Every developer owns one slot in a set of flat `array.array` buffers
+    holding an exponentially weighted mean and variance per feature, so an
+    observation is an O(1) update and the current flags are read without
+    touching the database. A developer is flagged when their latest hours or
+    bug count deviates from their own baseline by more than the configured
+    z-score, or when their load crosses the overload threshold.
+
+    Inserts arrive through the change feed, from this process and (via the
+    follower) from other workers, so every process keeps the same flags.
+    """
+
+    def __init__(self, alpha: float = None, z_threshold: float = None, min_observations: int = None):
+        self.alpha = alpha if alpha is not None else settings.anomaly_ewma_alpha
+        self.z_threshold = z_threshold if z_threshold is not None else settings.anomaly_z_threshold
+        self.min_observations = (
+            min_observations if min_observations is not None else settings.anomaly_min_observations
+        )
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every developer; the next bootstrap() replays the metrics again"""
+        with self._lock:
+            self._slots: Dict[int, int] = {}
+            self._names: List[str] = []
+            self._count = array("I")
+            self._mean = array("d")
+            self._var = array("d")
+            self._last = array("d")
+            self._z = array("d")
+            self._flag = array("b")
+            self._bootstrapped = False
+            # Highest metrics id the replay covered; the feed skips rows up to it
+            self._replayed_through = 0
+
+    def _slot(self, developer_id: int, developer_name: str) -> int:
+        slot = self._slots.get(developer_id)
+        if slot is None:
+            slot = len(self._names)
+            self._slots[developer_id] = slot
+            self._names.append(developer_name)
+            self._count.append(0)
+            self._z.append(0.0)
+            self._flag.append(0)
+            for buf in (self._mean, self._var, self._last):
+                buf.extend((0.0,) * _STRIDE)
+        else:
+            self._names[slot] = developer_name
+        return slot
+
+    def observe(self, developer_id: int, developer_name: str, hours_worked: float,
+                tasks_completed: int, bugs_reported: int) -> bool:
+        """
+        Fold one metrics row into the developer's running statistics.
+
+        Returns:
+            Whether the developer is flagged as overloaded after this update
+        """
+        with self._lock:
+            return self._observe(developer_id, developer_name, hours_worked, tasks_completed, bugs_reported)
+
+    def _observe(self, developer_id: int, developer_name: str, hours_worked: float,
+                 tasks_completed: int, bugs_reported: int) -> bool:
+        values = (float(hours_worked or 0.0), float(tasks_completed or 0), float(bugs_reported or 0))
+        alpha = self.alpha
+        slot = self._slot(developer_id, developer_name)
+        base = slot * _STRIDE
+        seen = self._count[slot]
+
+        # Score against the baseline *before* this observation is absorbed
+        z = 0.0
+        if seen >= self.min_observations:
+            for k in (_HOURS, _BUGS):
+                std = math.sqrt(self._var[base + k]) + 1e-6
+                z = max(z, (values[k] - self._mean[base + k]) / std)
+
+        for k, x in enumerate(values):
+            i = base + k
+            if seen == 0:
+                self._mean[i] = x
+                self._var[i] = 0.0
+            else:
+                diff = x - self._mean[i]
+                incr = alpha * diff
+                self._mean[i] += incr
+                self._var[i] = (1 - alpha) * (self._var[i] + diff * incr)
+            self._last[i] = x
+
+        overloaded = z > self.z_threshold or load_percentage(values[_HOURS]) >= OVERLOAD_THRESHOLD
+        self._count[slot] = seen + 1
+        self._z[slot] = z
+        self._flag[slot] = 1 if overloaded else 0
+        return overloaded
+
+    def apply(self, changes: List[Dict]) -> None:
+        """Observe committed metrics inserts and forget deleted users (no-op until bootstrapped)"""
+        with self._lock:
+            if not self._bootstrapped:
+                return
+            for change in changes:
+                table, op, payload = change["table"], change["op"], change["payload"]
+                if table == "developer_metrics" and op == "insert" and change["row_id"] > self._replayed_through:
+                    self._observe(
+                        payload["developer_id"],
+                        payload.get("developer_name"),
+                        payload.get("hours_worked"),
+                        payload.get("tasks_completed"),
+                        payload.get("bugs_reported"),
+                    )
+                elif table == "users" and op == "delete":
+                    self._forget(change["row_id"])
+
+    def _forget(self, developer_id: int) -> None:
+        """Clear a developer's flag after their user record is removed"""
+        slot = self._slots.get(developer_id)
+        if slot is not None:
+            self._flag[slot] = 0
+            self._count[slot] = 0
+
+    def bootstrap(self, db: Session) -> None:
+        """
+        Replay stored metrics once so flags survive a restart.
+
+        The replay holds the lock, so readers never see half-replayed state and
+        inserts committed meanwhile are observed after it, unless it read them.
+        Later reads are served purely from memory.
+        """
+        if self._bootstrapped:
+            return
+        with self._lock:
+            if self._bootstrapped:
+                return
+            rows = (
+                db.query(
+                    DeveloperMetrics.id,
+                    DeveloperMetrics.developer_id,
+                    DeveloperMetrics.developer_name,
+                    DeveloperMetrics.hours_worked,
+                    DeveloperMetrics.tasks_completed,
+                    DeveloperMetrics.bugs_reported,
+                )
+                .order_by(DeveloperMetrics.id)
+                .yield_per(1000)
+            )
+            for metric_id, *row in rows:
+                self._observe(*row)
+                self._replayed_through = metric_id
+            self._bootstrapped = True
+
+    def snapshot(self, overloaded_only: bool = False, developer_id: Optional[int] = None) -> List[Dict]:
+        """Current per-developer state, read straight from the state arrays"""
+        with self._lock:
+            if developer_id is not None:
+                slot = self._slots.get(developer_id)
+                items = [(developer_id, slot)] if slot is not None else []
+            else:
+                items = list(self._slots.items())
+
+            results = []
+            for dev_id, slot in items:
+                if not self._count[slot] or (overloaded_only and not self._flag[slot]):
+                    continue
+                base = slot * _STRIDE
+                hours = self._last[base + _HOURS]
+                results.append({
+                    "developer_id": dev_id,
+                    "developer": self._names[slot],
+                    "hours_worked": hours,
+                    "tasks_completed": int(self._last[base + _TASKS]),
+                    "bugs_reported": int(self._last[base + _BUGS]),
+                    "load_percentage": round(load_percentage(hours), 2),
+                    "baseline_hours": round(self._mean[base + _HOURS], 2),
+                    "z_score": round(self._z[slot], 3),
+                    "observations": self._count[slot],
+                    "status": "Overloaded" if self._flag[slot] else "Normal"
+                })
+            return results
+
+
+workload_detector = StreamingWorkloadDetector()
+consume_changes(workload_detector.apply)
@@ -0,0 +1,369 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import ChangeLog
+from app.services.response_cache import response_cache, project_tag
+from app.services.table_versions import table_versions
+
+logger = logging.getLogger(__name__)
+
+# In-process caches kept current from the change feed; see consume_changes()
+_consumers: List[Callable[[List[Dict]], None]] = []
+
+
+def consume_changes(func: Callable[[List[Dict]], None]):
+    """
+    Register `func(changes)` to be called with every batch of committed changes,
+    made by this process (right after the commit) or by another one (when the
+    follower replays them). Failures are logged, never raised into the commit.
+    """
+    _consumers.append(func)
+    return func
+
+
+def _notify_consumers(changes: List[Dict]) -> None:
+    for consumer in _consumers:
+        try:
+            consumer(changes)
+        except Exception:
+            logger.exception("Change consumer %s failed", consumer.__qualname__)
+
+
+def latest_seq(db: Session = None) -> int:
+    """Highest committed change_log seq (0 when empty)"""
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        return db.query(func.max(ChangeLog.seq)).scalar() or 0
+    finally:
+        if own_session:
+            db.close()
+
+
+class CursorExpired(Exception):
+    """Changes after the client's cursor were pruned from change_log"""
+
+
+def check_cursor(since: int, db: Session = None) -> None:
+    """
+    Raise CursorExpired if changes after `since` were pruned. Pruning always
+    keeps the newest row, so the oldest retained seq shows where the gap is.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        oldest = db.query(func.min(ChangeLog.seq)).scalar()
+    finally:
+        if own_session:
+            db.close()
+    if oldest is not None and since < oldest - 1:
+        raise CursorExpired(
+            f"Changes before seq {oldest} were pruned; reload the data and resume from the latest seq"
+        )
+
+
+def prune_change_log(db: Session, now: datetime = None, batch: int = 5000) -> int:
+    """
+    Delete change_log rows older than `change_log_retention_hours`; returns how many.
+
+    Rows are deleted in seq ranges of `batch`, each in its own transaction, so
+    writers never wait long for SQLite's lock. Seqs grow with created_at, so
+    the first range with a row inside the horizon ends the pass. The newest
+    row is always kept (see check_cursor). Followers in other workers lag by
+    a poll interval, far inside the horizon.
+    """
+    horizon = (now or datetime.utcnow()) - timedelta(hours=settings.change_log_retention_hours)
+    table = ChangeLog.__table__
+    oldest, newest = db.query(func.min(ChangeLog.seq), func.max(ChangeLog.seq)).one()
+    deleted = 0
+    low = oldest
+    while low is not None and low < newest:
+        high = min(low + batch, newest)
+        count = db.execute(
+            table.delete().where(table.c.seq >= low, table.c.seq < high, table.c.created_at < horizon)
+        ).rowcount
+        db.commit()
+        deleted += count
+        if count < high - low:
+            break
+        low = high
+    if deleted:
+        logger.info("Pruned %d change_log rows older than %s", deleted, horizon.isoformat())
+    return deleted
+
+
+def load_changes(since: int, limit: int, db: Session = None) -> List[Dict]:
+    """Committed changes with seq > since, oldest first"""
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        rows = (
+            db.query(ChangeLog)
+            .filter(ChangeLog.seq > since)
+            .order_by(ChangeLog.seq)
+            .limit(limit)
+            .all()
+        )
+        return [
+            {
+                "seq": row.seq,
+                "table": row.table_name,
+                "row_id": row.row_id,
+                "op": row.op,
+                "payload": json.loads(row.payload) if row.payload else None,
+                "created_at": row.created_at,
+            }
+            for row in rows
+        ]
+    finally:
+        if own_session:
+            db.close()
+
+
+class Subscription:
+    """One subscriber's bounded queue, owned by the event loop it was created on"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict]" = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def offer(self, changes: List[Dict]) -> None:
+        """Runs on the subscriber's loop; a full queue marks it for resync"""
+        for change in changes:
+            try:
+                self.queue.put_nowait(change)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                return
+
+    async def next(self, timeout: float) -> Optional[Dict]:
+        """Next change, or None after `timeout` seconds without one"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ChangeBroadcaster:
+    """
+    Fans committed changes out to every live subscriber.
+
+    Sessions publish their change_log rows once after commit; each subscriber
+    gets them pushed onto its own queue, so N connected clients cost N queue
+    puts instead of N database polls. A subscriber that falls more than
+    `max_queue` changes behind is cut off and resyncs with `?since=`.
+    """
+
+    def __init__(self, max_queue: int = None):
+        self.max_queue = max_queue or settings.change_feed_max_queue
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, changes: List[Dict]) -> None:
+        """Push committed changes to all subscribers (safe from any thread)"""
+        if not changes:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, changes)
+            except RuntimeError:
+                # The subscriber's loop is gone
+                self.unsubscribe(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+change_broadcaster = ChangeBroadcaster()
+
+
+class ChangeLogFollower:
+    """
+    Replays changes committed by other worker processes into this one.
+
+    Table versions, the response cache and live subscribers live in process
+    memory, so with several workers a write only reaches the worker that made
+    it. Each worker tails the change_log instead and, for every change it did
+    not commit itself, bumps the table version, invalidates cached responses
+    and pushes the change to its subscribers. Other workers' writes show up
+    within `change_feed_poll_interval` seconds.
+
+    It also queues the prune_change_log job every `change_log_prune_interval`
+    seconds; the job's dedup key makes all workers share one run.
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or settings.change_feed_poll_interval
+        self.last_seq = 0
+        # Where start() resumes (None: the latest seq), e.g. set by serve.py to
+        # the seq its indexes were built at, before forking the workers
+        self.start_seq: Optional[int] = None
+        self._local: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.last_seq = self.start_seq if self.start_seq is not None else latest_seq()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="change-log-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def mark_local(self, changes: List[Dict]) -> None:
+        """Remember changes this process committed (and already applied)"""
+        with self._lock:
+            self._local.update(c["seq"] for c in changes if c["seq"] > self.last_seq)
+
+    def poll(self) -> int:
+        """Apply every change committed elsewhere since the last poll; returns how many"""
+        applied = 0
+        while True:
+            changes = load_changes(self.last_seq, 500)
+            if not changes:
+                return applied
+            with self._lock:
+                self.last_seq = changes[-1]["seq"]
+                remote = [c for c in changes if c["seq"] not in self._local]
+                self._local.difference_update(c["seq"] for c in changes)
+            if remote:
+                apply_changes(remote)
+                applied += len(remote)
+            if len(changes) < 500:
+                return applied
+
+    def _run(self) -> None:
+        next_prune = time.monotonic()
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Change log follower failed; retrying")
+            if time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + settings.change_log_prune_interval
+                try:
+                    from app.services.job_queue import job_queue
+                    job_queue.enqueue("prune_change_log", dedup_key="prune_change_log", priority=-1)
+                except Exception:
+                    logger.exception("Could not queue the change_log prune")
+
+
+def apply_changes(changes: List[Dict]) -> None:
+    """Do what the routers do after a commit, for changes committed by another process"""
+    tables: Set[str] = set()
+    tags: Set[str] = set()
+    clear_cache = False
+    for change in changes:
+        table = change["table"]
+        tables.add(table)
+        if table == "tasks":
+            tags.add("tasks")
+            project_id = (change["payload"] or {}).get("project_id")
+            if project_id is None:
+                # Deletes carry no payload, so the task's project is unknown
+                clear_cache = True
+            else:
+                tags.add(project_tag(project_id))
+        elif table == "projects":
+            tags.add(project_tag(change["row_id"]))
+        else:
+            tags.add(table)
+
+    table_versions.bump(*tables)
+    if clear_cache:
+        response_cache.clear()
+    else:
+        response_cache.invalidate(*tags)
+    _notify_consumers(changes)
+    change_broadcaster.publish(changes)
+
+
+change_follower = ChangeLogFollower()
+
+
+@event.listens_for(Session, "after_commit")
+def publish_committed_changes(session):
+    """
+    Bump the version of every table the transaction wrote, then hand its
+    changes to consumers and subscribers. Every tracked write logs to
+    change_log, so no ETag can outlive a write whatever code path made it.
+    """
+    changes = session.info.pop("pending_changes", None)
+    if not changes:
+        return
+    if change_follower.running:
+        change_follower.mark_local(changes)
+    table_versions.bump(*{change["table"] for change in changes})
+    _notify_consumers(changes)
+    change_broadcaster.publish(changes)
+
+
+async def stream_changes(since: int, heartbeat: float = None):
+    """
+    Backlog since `since` followed by live changes, in seq order without gaps.
+
+    Subscribes before reading the backlog, then skips live changes the backlog
+    already covered. Yields None on every heartbeat interval without changes.
+    Raises OverflowError if the subscriber fell too far behind, and
+    CursorExpired if changes after `since` were already pruned.
+    """
+    from starlette.concurrency import run_in_threadpool
+
+    await run_in_threadpool(check_cursor, since)
+    heartbeat = heartbeat or settings.change_feed_heartbeat
+    subscription = change_broadcaster.subscribe()
+    try:
+        last_seq = since
+        while True:
+            backlog = await run_in_threadpool(load_changes, last_seq, 500)
+            for change in backlog:
+                last_seq = change["seq"]
+                yield change
+            if len(backlog) < 500:
+                break
+
+        while True:
+            if subscription.overflowed:
+                raise OverflowError("change feed subscriber fell behind")
+            change = await subscription.next(heartbeat)
+            if change is None:
+                yield None
+            elif change["seq"] > last_seq:
+                last_seq = change["seq"]
+                yield change
+    finally:
+        change_broadcaster.unsubscribe(subscription)
@@ -0,0 +1,186 @@
+"""
+Flags tasks as overdue the moment their deadline passes.
+
+Open tasks with a future deadline sit in a min-heap keyed by deadline. One
+thread sleeps until the earliest deadline, then marks the due tasks overdue,
+bumps their projects' overdue_tasks counters and recomputes health for just
+those projects. Reads never compare deadlines against the clock, and nothing
+rescans the tasks table after startup.
+
+Writes keep the counters exact through the flush listeners in app.models;
+this module only handles the passage of time. Tasks created, rescheduled or
+reopened with a future deadline are pushed onto the heap when their
+transaction commits. Heap entries are never removed: when a popped task was
+completed or rescheduled in the meantime, the conditional UPDATE in expire()
+simply matches nothing.
+"""
+import heapq
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models import Task, TaskStatus, adjust_overdue_counts, as_utc, log_changes, row_payload
+from app.services.response_cache import response_cache, project_tag
+
+logger = logging.getLogger(__name__)
+
+# Wake up at least this often, so a clock change never delays expiry for long
+MAX_SLEEP = 60.0
+
+# SQLite caps the number of bound parameters per statement
+_IN_CHUNK = 500
+
+
+class DeadlineScheduler:
+    """Min-heap of upcoming deadlines plus the thread that expires them"""
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stop = False
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push_many(self, entries: Iterable[Tuple[datetime, int]]) -> None:
+        """Schedule (deadline, task_id) pairs; wakes the thread if one is now first"""
+        with self._condition:
+            earliest = self._heap[0][0] if self._heap else None
+            for deadline, task_id in entries:
+                heapq.heappush(self._heap, (as_utc(deadline), task_id))
+            if self._heap and (earliest is None or self._heap[0][0] < earliest):
+                self._condition.notify()
+
+    def bootstrap(self) -> int:
+        """Expire what passed while the app was down, then load the upcoming deadlines"""
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            due = [
+                task_id for (task_id,) in db.query(Task.id).filter(
+                    Task.overdue.is_(False),
+                    Task.status != TaskStatus.COMPLETED,
+                    Task.deadline <= now,
+                )
+            ]
+            upcoming = db.query(Task.deadline, Task.id).filter(
+                Task.overdue.is_(False),
+                Task.status != TaskStatus.COMPLETED,
+                Task.deadline > now,
+            ).all()
+        if due:
+            self.expire(due)
+        with self._condition:
+            self._heap = [(as_utc(deadline), task_id) for deadline, task_id in upcoming]
+            heapq.heapify(self._heap)
+            self._condition.notify()
+        return len(self._heap)
+
+    def pop_due(self, now: datetime = None) -> List[int]:
+        """Remove and return the ids of every task whose deadline has passed"""
+        now = now or datetime.utcnow()
+        due = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def expire(self, task_ids: List[int]) -> Dict:
+        """
+        Flag the given tasks overdue if they are still open and past due, and
+        update the counters and health scores of their projects.
+
+        Returns:
+            Counts of tasks flagged and projects affected
+        """
+        from app.services.health_service import project_health
+
+        now = datetime.utcnow()
+        affected: Dict[int, int] = {}
+        with SessionLocal() as db:
+            for start in range(0, len(task_ids), _IN_CHUNK):
+                rows = db.execute(
+                    update(Task)
+                    .where(
+                        Task.id.in_(task_ids[start:start + _IN_CHUNK]),
+                        Task.overdue.is_(False),
+                        Task.status != TaskStatus.COMPLETED,
+                        Task.deadline <= now,
+                    )
+                    .values(overdue=True, updated_at=Task.updated_at)
+                    .returning(*Task.__table__.columns)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                # Logged like any other write, so the commit bumps the table versions
+                log_changes(db, "tasks", "update", [(row.id, row_payload(row)) for row in rows])
+                for row in rows:
+                    affected[row.project_id] = affected.get(row.project_id, 0) + 1
+            if not affected:
+                db.rollback()
+                return {"tasks": 0, "projects": 0}
+
+            adjust_overdue_counts(db, affected)
+            db.commit()
+            response_cache.invalidate("tasks", *(project_tag(project_id) for project_id in affected))
+            project_health.recompute(db, affected)
+
+        flagged = sum(affected.values())
+        logger.info("Flagged %d task(s) overdue in %d project(s)", flagged, len(affected))
+        return {"tasks": flagged, "projects": len(affected)}
+
+    # Thread
+
+    def start(self) -> None:
+        """Load the heap and start the expiry thread (once per process)"""
+        if self._thread is not None:
+            return
+        self._stop = False
+        self.bootstrap()
+        self._thread = threading.Thread(target=self._run, name="deadline-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Deadline scheduler started with %d upcoming deadline(s)", len(self._heap))
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._condition:
+            self._stop = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._stop:
+                    return
+                timeout = MAX_SLEEP
+                if self._heap:
+                    wait = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                    timeout = min(max(wait, 0.0), MAX_SLEEP)
+                if timeout > 0:
+                    self._condition.wait(timeout)
+                if self._stop:
+                    return
+            due = self.pop_due()
+            if due:
+                try:
+                    self.expire(due)
+                except Exception:
+                    logger.exception("Deadline expiry failed; retrying shortly")
+                    self.push_many((datetime.utcnow(), task_id) for task_id in due)
+                    with self._condition:
+                        self._condition.wait(1.0)
+
+
+deadline_scheduler = DeadlineScheduler()
+
+
+@event.listens_for(Session, "after_commit")
+def schedule_upcoming_deadlines(session):
+    """Hand deadlines committed by this session to the scheduler"""
+    upcoming = session.info.pop("upcoming_deadlines", None)
+    if upcoming and deadline_scheduler._thread is not None:
+        deadline_scheduler.push_many(upcoming)
@@ -0,0 +1,336 @@
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Task
+from app.services.change_feed import consume_changes
+
+
+# MinHash signature layout: BANDS x ROWS hash functions. With 8 bands of 4
+# rows, titles with Jaccard similarity ~0.6 collide in some band ~90% of the
+# time and titles below ~0.3 almost never do.
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240101)
+_A = _rng.integers(1, int(_PRIME), NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, int(_PRIME), NUM_PERM, dtype=np.uint64)[:, None]
+# Odd 64-bit multipliers used to fold a band (plus project and band number) into one key
+_BAND_MIX = _rng.integers(1, 2 ** 63, ROWS + 2, dtype=np.uint64) | np.uint64(1)
+
+_WORD = re.compile(r'\w+')
+
+# Pending bucket entries are merged into the sorted arrays in batches
+_MERGE_AT = 50_000
+_BOOTSTRAP_BATCH = 20_000
+
+
+def _title_crc(title: str) -> int:
+    return zlib.crc32((title or "").encode())
+
+
+def title_shingles(title: str) -> List[int]:
+    """CRC32 hashes of the title's words and word bigrams (masked to 31 bits later)"""
+    words = _WORD.findall((title or "").lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return list(set(map(zlib.crc32, map(str.encode, grams)))) or [0]
+
+
+def minhash_many(shingle_lists: Sequence[List[int]]) -> np.ndarray:
+    """
+    MinHash signatures for many titles in one vectorized pass.
+
+    Returns:
+        Array of shape (titles, NUM_PERM)
+    """
+    lengths = np.fromiter((len(s) for s in shingle_lists), dtype=np.int64, count=len(shingle_lists))
+    if not len(lengths):
+        return np.empty((0, NUM_PERM), dtype=np.uint64)
+    flat = np.fromiter(
+        (h for shingles in shingle_lists for h in shingles), dtype=np.uint64, count=int(lengths.sum())
+    )
+    flat &= np.uint64(0x7FFFFFFF)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    # (a * x + b) mod p for every hash function and shingle, then min per title
+    hashed = (_A * flat[None, :] + _B) % _PRIME
+    return np.minimum.reduceat(hashed, offsets, axis=1).T
+
+
+def band_keys(signatures: np.ndarray, project_ids: np.ndarray) -> np.ndarray:
+    """
+    One 64-bit bucket key per (title, band).
+
+    The project id and band number are mixed in, so buckets never collide
+    across projects. Arithmetic wraps modulo 2**64.
+    """
+    bands = signatures.reshape(len(signatures), BANDS, ROWS)
+    with np.errstate(over="ignore"):
+        keys = (bands * _BAND_MIX[:ROWS]).sum(axis=2, dtype=np.uint64)
+        keys += np.arange(BANDS, dtype=np.uint64) * _BAND_MIX[ROWS]
+        keys += project_ids.astype(np.uint64)[:, None] * _BAND_MIX[ROWS + 1]
+    return keys
+
+
+class DuplicateTaskIndex:
+    """
+    MinHash/LSH index over task titles.
+
+    Signatures live in one growable NumPy array (a slot per task version).
+    Bucket membership is a sorted array of band keys with the matching slots,
+    plus a small dict of recent inserts merged in batches, so a lookup is
+    BANDS binary searches. Updates retire the old slot and add a new one;
+    retired slots are dropped on the next merge.
+
+    Every committed task write reaches apply() through the change feed, from
+    either API stack and from other processes.
+    """
+
+    def __init__(self, threshold: float = None):
+        self.threshold = threshold if threshold is not None else settings.duplicate_similarity_threshold
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every task; the next bootstrap() reads them again"""
+        with self._lock:
+            self._bootstrapped = False
+            self._slot_of: Dict[int, int] = {}
+            self._size = 0
+            self._task_ids = np.zeros(1024, dtype=np.int64)
+            self._projects = np.zeros(1024, dtype=np.int64)
+            self._title_crcs = np.zeros(1024, dtype=np.uint32)
+            self._alive = np.zeros(1024, dtype=bool)
+            self._signatures = np.zeros((1024, NUM_PERM), dtype=np.uint64)
+            self._keys = np.empty(0, dtype=np.uint64)
+            self._key_slots = np.empty(0, dtype=np.int64)
+            self._pending: Dict[int, List[int]] = {}
+            self._pending_count = 0
+
+    # Maintenance
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._task_ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        extra = capacity - len(self._task_ids)
+        self._task_ids = np.concatenate((self._task_ids, np.zeros(extra, dtype=np.int64)))
+        self._projects = np.concatenate((self._projects, np.zeros(extra, dtype=np.int64)))
+        self._title_crcs = np.concatenate((self._title_crcs, np.zeros(extra, dtype=np.uint32)))
+        self._alive = np.concatenate((self._alive, np.zeros(extra, dtype=bool)))
+        self._signatures = np.concatenate(
+            (self._signatures, np.zeros((extra, NUM_PERM), dtype=np.uint64))
+        )
+
+    def _add_many(self, rows: Sequence[Tuple[int, int, str]],
+                  bulk: bool = False) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Store signatures for (task_id, project_id, title) rows.
+
+        Bucket entries go to the pending dict, or with `bulk` are returned as
+        (keys, slots) arrays for the caller to merge in one sort.
+        """
+        if not rows:
+            return None
+        task_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        projects = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+        signatures = minhash_many([title_shingles(r[2]) for r in rows])
+        title_crcs = np.fromiter((_title_crc(r[2]) for r in rows), dtype=np.uint32, count=len(rows))
+        keys = band_keys(signatures, projects)
+
+        if not bulk:
+            for task_id in task_ids.tolist():
+                self._retire(task_id)
+        start = self._size
+        slots = np.arange(start, start + len(rows))
+        self._grow(start + len(rows))
+        self._task_ids[slots] = task_ids
+        self._projects[slots] = projects
+        self._title_crcs[slots] = title_crcs
+        self._signatures[slots] = signatures
+        self._alive[slots] = True
+        self._size += len(rows)
+        self._slot_of.update(zip(task_ids.tolist(), slots.tolist()))
+
+        if bulk:
+            return keys.ravel(), np.repeat(slots, BANDS)
+        for slot, slot_keys in zip(slots.tolist(), keys.tolist()):
+            for key in slot_keys:
+                self._pending.setdefault(key, []).append(slot)
+        self._pending_count += keys.size
+        if self._pending_count >= _MERGE_AT:
+            self._merge()
+        return None
+
+    def _retire(self, task_id: int) -> None:
+        slot = self._slot_of.pop(task_id, None)
+        if slot is not None:
+            self._alive[slot] = False
+
+    def _merge(self, extra: Sequence[Tuple[np.ndarray, np.ndarray]] = ()) -> None:
+        """Fold pending (and bulk) entries into the sorted arrays and drop retired slots"""
+        parts_keys = [self._keys] + [keys for keys, _ in extra]
+        parts_slots = [self._key_slots] + [slots for _, slots in extra]
+        if self._pending:
+            pending_keys = np.fromiter(
+                (k for k, slots in self._pending.items() for _ in slots), dtype=np.uint64
+            )
+            pending_slots = np.fromiter(
+                (s for slots in self._pending.values() for s in slots), dtype=np.int64
+            )
+            parts_keys.append(pending_keys)
+            parts_slots.append(pending_slots)
+
+        keys = np.concatenate(parts_keys)
+        slots = np.concatenate(parts_slots)
+        live = self._alive[slots]
+        keys, slots = keys[live], slots[live]
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._key_slots = keys[order], slots[order]
+        self._pending = {}
+        self._pending_count = 0
+
+    def bootstrap(self, db: Session) -> None:
+        """Index every existing task once; later changes arrive incrementally"""
+        with self._lock:
+            if self._bootstrapped:
+                return
+            result = db.execute(
+                select(Task.id, Task.project_id, Task.title)
+                .execution_options(yield_per=_BOOTSTRAP_BATCH)
+            )
+            entries = [self._add_many(rows, bulk=True) for rows in result.partitions(_BOOTSTRAP_BATCH)]
+            self._merge([entry for entry in entries if entry is not None])
+            self._bootstrapped = True
+
+    def _is_current(self, task_id: int, project_id: int, title: str) -> bool:
+        """Whether the task is indexed with this project and title already"""
+        slot = self._slot_of.get(task_id)
+        return (
+            slot is not None
+            and self._projects[slot] == project_id
+            and self._title_crcs[slot] == _title_crc(title)
+        )
+
+    def apply(self, changes: List[Dict]) -> None:
+        """Index committed task inserts, updates and deletes (no-op until bootstrapped)"""
+        with self._lock:
+            if not self._bootstrapped:
+                return
+            # Last write per task wins; a batch may touch the same task twice
+            latest: Dict[int, Tuple[int, int, str]] = {}
+            for change in changes:
+                if change["table"] != "tasks":
+                    continue
+                task_id, payload = change["row_id"], change["payload"]
+                if change["op"] == "delete":
+                    latest.pop(task_id, None)
+                    self._retire(task_id)
+                elif payload and "title" in payload and "project_id" in payload:
+                    latest[task_id] = (task_id, payload["project_id"], payload["title"])
+            # Status and deadline updates leave the signature alone
+            self._add_many([row for row in latest.values() if not self._is_current(*row)])
+
+    # Queries
+
+    def _bucket_slots(self, keys: Iterable[int]) -> np.ndarray:
+        keys = np.fromiter(keys, dtype=np.uint64)
+        lo = np.searchsorted(self._keys, keys, side="left")
+        hi = np.searchsorted(self._keys, keys, side="right")
+        found = [self._key_slots[a:b] for a, b in zip(lo.tolist(), hi.tolist())]
+        found.extend(
+            np.asarray(self._pending[key], dtype=np.int64)
+            for key in keys.tolist() if key in self._pending
+        )
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        slots = np.unique(np.concatenate(found))
+        return slots[self._alive[slots]]
+
+    def find_similar(self, title: str, project_id: int, exclude_task_id: int = None,
+                     limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Likely duplicates of a title within a project.
+
+        Returns:
+            (task_id, estimated Jaccard similarity) pairs, most similar first
+        """
+        signature = minhash_many([title_shingles(title)])
+        keys = band_keys(signature, np.array([project_id]))[0]
+        with self._lock:
+            slots = self._bucket_slots(keys.tolist())
+            if not len(slots):
+                return []
+            similarity = (self._signatures[slots] == signature).mean(axis=1)
+            task_ids = self._task_ids[slots]
+        keep = (similarity >= self.threshold) & (task_ids != (exclude_task_id or -1))
+        order = np.argsort(-similarity[keep], kind="stable")[:limit]
+        return [
+            (int(task_id), round(float(sim), 3))
+            for task_id, sim in zip(task_ids[keep][order], similarity[keep][order])
+        ]
+
+    def clusters(self, project_id: Optional[int] = None) -> Dict[int, List[List[int]]]:
+        """
+        Group tasks into duplicate clusters, per project.
+
+        Tasks sharing a bucket are compared against the bucket's first member
+        only (no all-pairs comparison) and joined with union-find.
+        """
+        with self._lock:
+            slots = np.flatnonzero(self._alive[:self._size])
+            if project_id is not None:
+                slots = slots[self._projects[slots] == project_id]
+            if len(slots) < 2:
+                return {}
+            signatures = self._signatures[slots]
+            projects = self._projects[slots]
+            task_ids = self._task_ids[slots]
+
+        keys = band_keys(signatures, projects).ravel()
+        members = np.repeat(np.arange(len(slots)), BANDS)
+        order = np.argsort(keys, kind="stable")
+        keys, members = keys[order], members[order]
+
+        # First member of each bucket run is the pivot for that bucket
+        run_start = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        pivots = np.repeat(members[run_start], np.diff(np.append(run_start, len(keys))))
+        candidate = members != pivots
+        a, b = pivots[candidate], members[candidate]
+        similar = (signatures[a] == signatures[b]).mean(axis=1) >= self.threshold
+
+        parent = list(range(len(slots)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for x, y in zip(a[similar].tolist(), b[similar].tolist()):
+            rx, ry = find(x), find(y)
+            if rx != ry:
+                parent[ry] = rx
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(slots)):
+            groups.setdefault(find(i), []).append(i)
+
+        result: Dict[int, List[List[int]]] = {}
+        for group in groups.values():
+            if len(group) > 1:
+                result.setdefault(int(projects[group[0]]), []).append(
+                    sorted(int(task_ids[i]) for i in group)
+                )
+        return result
+
+
+task_dedup_index = DuplicateTaskIndex()
+consume_changes(task_dedup_index.apply)
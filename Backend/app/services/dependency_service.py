@@ -0,0 +1,487 @@
+"""
+Task dependency graphs and critical-path schedules, one cached graph per project.
+
+Edges live in task_dependencies: a task can't start until the tasks it depends
+on are done. Inserting an edge that closes a cycle is rejected by a recursive
+query in the inserting transaction. A project's graph is loaded the first time
+it is asked for and then kept current from the change feed, so it also follows
+writes made by other worker processes.
+
+Each graph keeps adjacency lists indexed by slot and a topological order that
+an edge insert repairs locally (Pearce-Kelly: only tasks lying between the
+edge's ends in the current order are visited). Schedules follow the critical
+path method, in days from the start of today (UTC):
+
+    earliest start  ES = max(today, EF of every prerequisite)
+    earliest finish EF = ES + duration
+    latest finish   LF = min(own deadline, LS of every dependent, project finish)
+    latest start    LS = LF - duration;  slack = LS - ES
+
+Completed tasks take no time and their deadlines no longer count, but they
+stay in the chain: a task that depends on a completed one still waits for
+that task's open prerequisites, in both passes.
+
+When an edge, deadline, estimate or status changes, ES is pushed forward only
+through the task's dependents and LF backward only through its prerequisites,
+in topological order, stopping where values no longer change. Only a change of
+the project finish (the largest EF) re-runs the backward pass over the graph.
+Critical tasks have no slack; negative slack means a task can't meet its own
+deadline or one of its dependents'.
+"""
+import heapq
+import logging
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, or_, text
+from sqlalchemy.orm import Session
+from app.models import Task, TaskDependency, TaskStatus, log_changes
+from app.services.change_feed import consume_changes
+
+logger = logging.getLogger(__name__)
+
+# Duration of a task without an estimate, in days
+DEFAULT_TASK_DAYS = 1.0
+
+# Projects whose graphs are kept in memory (least recently used are dropped)
+MAX_CACHED_PROJECTS = 256
+
+_EPOCH = datetime(1970, 1, 1)
+_EPSILON = 1e-9
+
+
+def to_days(value: Optional[datetime]) -> float:
+    """Days since the epoch for a naive UTC datetime (inf for None)"""
+    if value is None:
+        return math.inf
+    return (value - _EPOCH).total_seconds() / 86400.0
+
+
+def from_days(days: float) -> datetime:
+    return _EPOCH + timedelta(days=days)
+
+
+def _today() -> float:
+    return float(math.floor(to_days(datetime.utcnow())))
+
+
+def _parse_deadline(value) -> Optional[datetime]:
+    """Deadline from an ORM row or a change payload (ISO string)"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+class DependencyCycleError(Exception):
+    """An edge would close a cycle in a cached graph (the graph is out of date)"""
+
+
+class ProjectGraph:
+    """One project's task graph with its incrementally maintained schedule"""
+
+    def __init__(self, project_id: int, anchor: float):
+        self.project_id = project_id
+        self.anchor = anchor
+        self.slot_of: Dict[int, int] = {}
+        self.ids: List[int] = []
+        self.alive: List[bool] = []
+        self.done: List[bool] = []
+        self.duration: List[float] = []
+        self.deadline: List[float] = []
+        self.succ: List[List[int]] = []
+        self.pred: List[List[int]] = []
+        self.ord: List[int] = []
+        self.es: List[float] = []
+        self.ef: List[float] = []
+        self.ls: List[float] = []
+        self.lf: List[float] = []
+        self.edge_ids: Dict[Tuple[int, int], int] = {}
+        self.finish = anchor
+
+    # Building
+
+    def _new_slot(self, task_id: int, done: bool, duration: float, deadline: float) -> int:
+        slot = len(self.ids)
+        self.slot_of[task_id] = slot
+        self.ids.append(task_id)
+        self.alive.append(True)
+        self.done.append(done)
+        self.duration.append(0.0 if done else duration)
+        self.deadline.append(deadline)
+        self.succ.append([])
+        self.pred.append([])
+        self.ord.append(slot)
+        self.es.append(self.anchor)
+        self.ef.append(self.anchor)
+        self.ls.append(self.anchor)
+        self.lf.append(self.anchor)
+        return slot
+
+    @classmethod
+    def build(cls, project_id: int, tasks: Iterable, edges: Iterable, anchor: float) -> "ProjectGraph":
+        """
+        Args:
+            tasks: (id, status, deadline, estimated_days) rows
+            edges: (edge_id, depends_on_id, task_id) rows
+        """
+        graph = cls(project_id, anchor)
+        for task_id, status, deadline, estimate in tasks:
+            graph._new_slot(task_id, status == TaskStatus.COMPLETED,
+                            estimate or DEFAULT_TASK_DAYS, to_days(deadline))
+        for edge_id, before_id, after_id in edges:
+            u, v = graph.slot_of.get(before_id), graph.slot_of.get(after_id)
+            if u is not None and v is not None and (u, v) not in graph.edge_ids:
+                graph.succ[u].append(v)
+                graph.pred[v].append(u)
+                graph.edge_ids[(u, v)] = edge_id
+        graph.reschedule(anchor)
+        return graph
+
+    def reschedule(self, anchor: float) -> None:
+        """Full recompute: topological order (Kahn), forward and backward pass"""
+        self.anchor = anchor
+        indegree = [len(p) for p in self.pred]
+        ready = [slot for slot in range(len(self.ids)) if indegree[slot] == 0]
+        order = []
+        while ready:
+            slot = ready.pop()
+            order.append(slot)
+            for s in self.succ[slot]:
+                indegree[s] -= 1
+                if indegree[s] == 0:
+                    ready.append(s)
+        if len(order) != len(self.ids):
+            raise DependencyCycleError(f"Dependency cycle in project {self.project_id}")
+        for position, slot in enumerate(order):
+            self.ord[slot] = position
+            self._forward_one(slot)
+        self.finish = max((self.ef[s] for s in order if self.alive[s]), default=anchor)
+        for slot in reversed(order):
+            self._backward_one(slot)
+
+    # Passes
+
+    def _forward_one(self, slot: int) -> None:
+        if not self.alive[slot]:
+            self.es[slot] = self.anchor
+        else:
+            self.es[slot] = max([self.anchor] + [self.ef[p] for p in self.pred[slot]])
+        self.ef[slot] = self.es[slot] + self.duration[slot]
+
+    def _backward_one(self, slot: int) -> None:
+        deadline = math.inf if self.done[slot] else self.deadline[slot]
+        self.lf[slot] = min([deadline, self.finish] + [self.ls[s] for s in self.succ[slot]])
+        self.ls[slot] = self.lf[slot] - self.duration[slot]
+
+    def _propagate(self, forward: Iterable[int], backward: Iterable[int]) -> None:
+        """Re-propagate ES from `forward` slots and LF from `backward` slots"""
+        heap = [(self.ord[slot], slot) for slot in set(forward)]
+        heapq.heapify(heap)
+        queued = {slot for _, slot in heap}
+        raised, lowered = -math.inf, False
+        while heap:
+            _, slot = heapq.heappop(heap)
+            queued.discard(slot)
+            before = self.ef[slot]
+            self._forward_one(slot)
+            if self.ef[slot] == before:
+                continue
+            if self.ef[slot] > before:
+                raised = max(raised, self.ef[slot])
+            elif before >= self.finish - _EPSILON:
+                lowered = True
+            for s in self.succ[slot]:
+                if s not in queued:
+                    queued.add(s)
+                    heapq.heappush(heap, (self.ord[s], s))
+
+        finish = self.finish
+        if raised > finish:
+            finish = raised
+        elif lowered:
+            # The task that ended the project finishes earlier: find the new last one
+            finish = max((ef for ef, alive in zip(self.ef, self.alive) if alive), default=self.anchor)
+        if finish != self.finish:
+            # Every latest finish is capped by the project finish
+            self.finish = finish
+            for slot in sorted(range(len(self.ids)), key=self.ord.__getitem__, reverse=True):
+                self._backward_one(slot)
+            return
+
+        heap = [(-self.ord[slot], slot) for slot in set(backward)]
+        heapq.heapify(heap)
+        queued = {slot for _, slot in heap}
+        while heap:
+            _, slot = heapq.heappop(heap)
+            queued.discard(slot)
+            before = self.ls[slot]
+            self._backward_one(slot)
+            if self.ls[slot] == before:
+                continue
+            for p in self.pred[slot]:
+                if p not in queued:
+                    queued.add(p)
+                    heapq.heappush(heap, (-self.ord[p], p))
+
+    def _reorder(self, u: int, v: int) -> None:
+        """Make ord[u] < ord[v] before adding u -> v, moving only the tasks in between"""
+        lower, upper = self.ord[v], self.ord[u]
+        if lower > upper:
+            return
+        forward, stack = [], [v]
+        seen = {v}
+        while stack:
+            slot = stack.pop()
+            forward.append(slot)
+            for s in self.succ[slot]:
+                if s == u:
+                    raise DependencyCycleError(f"Task {self.ids[v]} already leads to task {self.ids[u]}")
+                if s not in seen and self.ord[s] < upper:
+                    seen.add(s)
+                    stack.append(s)
+        backward, stack = [], [u]
+        seen = {u}
+        while stack:
+            slot = stack.pop()
+            backward.append(slot)
+            for p in self.pred[slot]:
+                if p not in seen and self.ord[p] > lower:
+                    seen.add(p)
+                    stack.append(p)
+        moved = sorted(backward, key=self.ord.__getitem__) + sorted(forward, key=self.ord.__getitem__)
+        positions = sorted(self.ord[slot] for slot in moved)
+        for slot, position in zip(moved, positions):
+            self.ord[slot] = position
+
+    # Changes
+
+    def add_edge(self, edge_id: int, before_id: int, after_id: int) -> None:
+        u, v = self.slot_of.get(before_id), self.slot_of.get(after_id)
+        if u is None or v is None or (u, v) in self.edge_ids:
+            return
+        self._reorder(u, v)
+        self.succ[u].append(v)
+        self.pred[v].append(u)
+        self.edge_ids[(u, v)] = edge_id
+        self._propagate([v], [u])
+
+    def remove_edge(self, edge_id: int) -> None:
+        edge = next((pair for pair, eid in self.edge_ids.items() if eid == edge_id), None)
+        if edge is None:
+            return
+        u, v = edge
+        del self.edge_ids[edge]
+        self.succ[u].remove(v)
+        self.pred[v].remove(u)
+        self._propagate([v], [u])
+
+    def upsert_task(self, task_id: int, status, deadline, estimate) -> None:
+        done = status == TaskStatus.COMPLETED
+        duration = 0.0 if done else (estimate or DEFAULT_TASK_DAYS)
+        deadline = to_days(_parse_deadline(deadline))
+        slot = self.slot_of.get(task_id)
+        if slot is None:
+            # Slots are never reused, so its position comes after every other task
+            slot = self._new_slot(task_id, done, duration, deadline)
+        elif (self.done[slot], self.duration[slot], self.deadline[slot]) == (done, duration, deadline):
+            return
+        else:
+            self.done[slot], self.duration[slot], self.deadline[slot] = done, duration, deadline
+        self._propagate([slot], [slot])
+
+    def remove_task(self, task_id: int) -> List[int]:
+        """Drop a task and its edges; returns the ids of the edges dropped"""
+        slot = self.slot_of.pop(task_id, None)
+        if slot is None:
+            return []
+        after, before = list(self.succ[slot]), list(self.pred[slot])
+        dropped = [self.edge_ids.pop((slot, s)) for s in after] + [self.edge_ids.pop((p, slot)) for p in before]
+        for s in after:
+            self.pred[s].remove(slot)
+        for p in before:
+            self.succ[p].remove(slot)
+        self.succ[slot], self.pred[slot] = [], []
+        self.alive[slot] = False
+        self.duration[slot] = 0.0
+        self.deadline[slot] = math.inf
+        self._propagate(after + [slot], before)
+        return dropped
+
+    # Reading
+
+    def schedule(self) -> Dict:
+        """Critical-path schedule of the open tasks"""
+        open_slots = [s for s in range(len(self.ids)) if self.alive[s] and not self.done[s]]
+        path = []
+        ends = [s for s in open_slots if self.ef[s] >= self.finish - _EPSILON]
+        if ends:
+            # Ties go to the lower task id, never to the order changes arrived in
+            slot = min(ends, key=lambda s: (self.ls[s] - self.es[s], self.ids[s]))
+            while slot is not None:
+                # Completed tasks on the chain are walked through but not listed
+                if not self.done[slot]:
+                    path.append(self.ids[slot])
+                binding = [
+                    p for p in self.pred[slot]
+                    if abs(self.ef[p] - self.es[slot]) <= _EPSILON
+                ]
+                slot = min(binding, key=lambda p: (self.ls[p] - self.es[p], self.ids[p])) if binding else None
+            path.reverse()
+
+        tasks = []
+        for s in sorted(open_slots, key=lambda s: (self.es[s], self.ids[s])):
+            slack = self.ls[s] - self.es[s]
+            tasks.append({
+                "id": self.ids[s],
+                "depends_on": sorted(self.ids[p] for p in self.pred[s]),
+                "duration_days": round(self.duration[s], 4),
+                "earliest_start": from_days(self.es[s]),
+                "earliest_finish": from_days(self.ef[s]),
+                "latest_start": from_days(self.ls[s]),
+                "latest_finish": from_days(self.lf[s]),
+                "slack_days": round(slack, 4),
+                "critical": slack <= _EPSILON,
+            })
+        return {
+            "project_id": self.project_id,
+            "start": from_days(self.anchor),
+            "finish": from_days(self.finish),
+            "duration_days": round(self.finish - self.anchor, 4),
+            "critical_path": path,
+            "late_tasks": [t["id"] for t in tasks if t["slack_days"] < 0],
+            "tasks": tasks,
+        }
+
+
+class DependencyGraphCache:
+    """Per-project graphs, loaded on first use and updated from committed changes"""
+
+    def __init__(self, max_projects: int = MAX_CACHED_PROJECTS):
+        self.max_projects = max_projects
+        self._graphs: "OrderedDict[int, ProjectGraph]" = OrderedDict()
+        self._project_of_task: Dict[int, int] = {}
+        self._project_of_edge: Dict[int, int] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    def critical_path(self, db: Session, project_id: int) -> Dict:
+        """Schedule of a project's open tasks, loading its graph if needed"""
+        with self._lock:
+            graph = self._graph(db, project_id)
+            today = _today()
+            if graph.anchor != today:
+                graph.reschedule(today)
+            return graph.schedule()
+
+    def _graph(self, db: Session, project_id: int) -> ProjectGraph:
+        graph = self._graphs.get(project_id)
+        if graph is not None:
+            self._graphs.move_to_end(project_id)
+            return graph
+        tasks = db.query(Task.id, Task.status, Task.deadline, Task.estimated_days).filter(
+            Task.project_id == project_id
+        ).all()
+        edges = db.query(TaskDependency.id, TaskDependency.depends_on_id, TaskDependency.task_id).filter(
+            TaskDependency.project_id == project_id
+        ).all()
+        graph = ProjectGraph.build(project_id, tasks, edges, _today())
+        self._graphs[project_id] = graph
+        self._project_of_task.update((task_id, project_id) for task_id in graph.ids)
+        self._project_of_edge.update((edge_id, project_id) for edge_id in graph.edge_ids.values())
+        while len(self._graphs) > self.max_projects:
+            self._forget(next(iter(self._graphs)))
+        return graph
+
+    def _forget(self, project_id: int) -> None:
+        graph = self._graphs.pop(project_id, None)
+        if graph is None:
+            return
+        for task_id in graph.slot_of:
+            self._project_of_task.pop(task_id, None)
+        for edge_id in graph.edge_ids.values():
+            self._project_of_edge.pop(edge_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+            self._project_of_task.clear()
+            self._project_of_edge.clear()
+
+    def apply(self, changes: List[Dict]) -> None:
+        """Update cached graphs for committed task, dependency and project changes"""
+        with self._lock:
+            for change in changes:
+                table, op, row_id, payload = change["table"], change["op"], change["row_id"], change["payload"]
+                try:
+                    if table == "tasks":
+                        self._apply_task(op, row_id, payload)
+                    elif table == "task_dependencies":
+                        self._apply_edge(op, row_id, payload)
+                    elif table == "projects" and op == "delete":
+                        self._forget(row_id)
+                except DependencyCycleError:
+                    # Only possible when the cached graph missed a change; reload it on next use
+                    project_id = (payload or {}).get("project_id") or self._project_of_task.get(row_id)
+                    logger.warning("Dependency graph of project %s out of date; dropped", project_id)
+                    self._forget(project_id)
+
+    def _apply_task(self, op: str, task_id: int, payload: Optional[Dict]) -> None:
+        cached_in = self._project_of_task.get(task_id)
+        project_id = payload["project_id"] if payload else None
+        if cached_in is not None and cached_in != project_id:
+            # Deleted or moved to another project
+            for edge_id in self._graphs[cached_in].remove_task(task_id):
+                self._project_of_edge.pop(edge_id, None)
+            del self._project_of_task[task_id]
+        graph = self._graphs.get(project_id) if project_id is not None else None
+        if graph is not None:
+            graph.upsert_task(task_id, payload.get("status"), payload.get("deadline"), payload.get("estimated_days"))
+            self._project_of_task[task_id] = project_id
+
+    def _apply_edge(self, op: str, edge_id: int, payload: Optional[Dict]) -> None:
+        if op == "delete":
+            project_id = self._project_of_edge.pop(edge_id, None)
+            if project_id in self._graphs:
+                self._graphs[project_id].remove_edge(edge_id)
+            return
+        graph = self._graphs.get(payload["project_id"])
+        if graph is not None:
+            graph.add_edge(edge_id, payload["depends_on_id"], payload["task_id"])
+            self._project_of_edge[edge_id] = payload["project_id"]
+
+
+dependency_graphs = DependencyGraphCache()
+consume_changes(dependency_graphs.apply)
+
+
+def would_create_cycle(db: Session, task_id: int, depends_on_id: int) -> bool:
+    """
+    Whether `depends_on_id` already depends on `task_id`, directly or through
+    other tasks. Run it after inserting the new edge and before committing: the
+    insert holds SQLite's write lock, so no concurrent edge can slip in between.
+    """
+    row = db.execute(text("""
+        WITH RECURSIVE upstream(id) AS (
+            SELECT depends_on_id FROM task_dependencies WHERE task_id = :start
+            UNION
+            SELECT d.depends_on_id FROM task_dependencies d JOIN upstream u ON d.task_id = u.id
+        )
+        SELECT 1 FROM upstream WHERE id = :target LIMIT 1
+    """), {"start": depends_on_id, "target": task_id}).first()
+    return row is not None
+
+
+def drop_dependencies(db: Session, task_id: int) -> List[int]:
+    """Delete every edge touching a task (when it moves to another project); returns their ids"""
+    edge_ids = db.execute(
+        delete(TaskDependency)
+        .where(or_(TaskDependency.task_id == task_id, TaskDependency.depends_on_id == task_id))
+        .returning(TaskDependency.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    log_changes(db, "task_dependencies", "delete", [(edge_id, None) for edge_id in edge_ids])
+    return edge_ids
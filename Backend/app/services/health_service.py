@@ -0,0 +1,205 @@
+"""
+Project health scores, persisted on Project.health_score.
+
+Reads select the stored column. Every committed task write notes the projects
+whose score it changes; HealthRecomputer collects those ids for a short delay
+and rescores them in one batch, so a burst of writes to a project costs one
+grouped query. check() compares a sample of stored scores with fresh ones.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+from sqlalchemy import case, event, func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Project, Task, TaskStatus
+from app.services.response_cache import response_cache, project_tag
+
+logger = logging.getLogger(__name__)
+
+# Same rule as the dashboard's live score: progress minus 5 points per
+# overdue open task, at most 30 points off
+OVERDUE_PENALTY = 5.0
+MAX_OVERDUE_PENALTY = 30.0
+
+# SQLite caps the number of bound parameters per statement
+_IN_CHUNK = 500
+
+
+def health_score(total: int, completed: int, overdue: int) -> float:
+    """0-100 health of a project from its task counts (100 with no tasks)"""
+    if not total:
+        return 100.0
+    progress = completed / total * 100
+    return max(0.0, progress - min(overdue * OVERDUE_PENALTY, MAX_OVERDUE_PENALTY))
+
+
+class ProjectHealthService:
+    """Computes project health scores in SQL and stores them on Project.health_score"""
+
+    def scores(self, db: Session, project_ids: Optional[Iterable[int]] = None) -> Dict[int, float]:
+        """
+        Health score per project, from one grouped query per chunk of ids.
+
+        The overdue count is the stored Project.overdue_tasks counter kept by
+        the deadline scheduler, so scores never compare deadlines to the clock.
+        """
+        completed = func.sum(case((Task.status == TaskStatus.COMPLETED, 1), else_=0))
+        query = (
+            db.query(Project.id, func.count(Task.id), completed, Project.overdue_tasks)
+            .outerjoin(Task, Task.project_id == Project.id)
+            .group_by(Project.id)
+        )
+
+        if project_ids is None:
+            chunks = [query]
+        else:
+            ids = sorted(set(project_ids))
+            chunks = [
+                query.filter(Project.id.in_(ids[start:start + _IN_CHUNK]))
+                for start in range(0, len(ids), _IN_CHUNK)
+            ]
+        return {
+            project_id: health_score(total, completed or 0, overdue or 0)
+            for chunk in chunks
+            for project_id, total, completed, overdue in chunk
+        }
+
+    def recompute(self, db: Session, project_ids: Optional[Iterable[int]] = None) -> Dict:
+        """
+        Store fresh health scores, writing only the projects whose score changed.
+
+        Returns:
+            Counts of projects scored and updated
+        """
+        scores = self.scores(db, project_ids)
+        changed = []
+        ids = sorted(scores)
+        for start in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[start:start + _IN_CHUNK]
+            for project in db.query(Project).filter(Project.id.in_(chunk)):
+                score = round(scores[project.id], 2)
+                if project.health_score is None or abs(project.health_score - score) >= 0.005:
+                    project.health_score = score
+                    changed.append(project.id)
+        db.commit()
+
+        if changed:
+            response_cache.invalidate(*(project_tag(project_id) for project_id in changed))
+        return {"projects": len(scores), "updated": len(changed)}
+
+    def check(self, db: Session, sample: int = 100, repair: bool = False) -> Dict:
+        """
+        Compare stored scores with freshly computed ones for a random sample of projects.
+
+        Returns:
+            Counts checked and repaired, plus each mismatch (stored vs expected)
+        """
+        stored = dict(
+            db.query(Project.id, Project.health_score).order_by(func.random()).limit(sample).all()
+        )
+        expected = self.scores(db, stored)
+        mismatches = [
+            {"project_id": project_id, "stored": stored[project_id], "expected": round(score, 2)}
+            for project_id, score in sorted(expected.items())
+            if stored[project_id] is None or abs(stored[project_id] - round(score, 2)) >= 0.005
+        ]
+        repaired = 0
+        if mismatches and repair:
+            repaired = self.recompute(db, [m["project_id"] for m in mismatches])["updated"]
+        if mismatches:
+            logger.warning("Health scores out of date for %d of %d sampled project(s)",
+                           len(mismatches), len(stored))
+        return {"checked": len(stored), "mismatched": mismatches, "repaired": repaired}
+
+
+project_health = ProjectHealthService()
+
+
+class HealthRecomputer:
+    """Debounced set of projects to rescore, flushed in batches on a background thread"""
+
+    def __init__(self):
+        self._pending: Set[int] = set()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stop = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def mark(self, project_ids: Iterable[int]) -> None:
+        """Queue projects for rescoring after the debounce delay"""
+        with self._condition:
+            self._pending.update(project_ids)
+            self._condition.notify()
+
+    def flush(self) -> Dict:
+        """Rescore every queued project now"""
+        with self._condition:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return {"projects": 0, "updated": 0}
+        try:
+            with SessionLocal() as db:
+                return project_health.recompute(db, pending)
+        except Exception:
+            # Keep the ids so the next flush retries them
+            self.mark(pending)
+            raise
+
+    def start(self) -> None:
+        """Queue one full rescore (catching up on offline writes), then start the thread"""
+        from app.services.job_queue import job_queue
+
+        if self._thread is not None:
+            return
+        self._stop = False
+        # Deduplicated, so workers starting together share one full pass
+        job, created = job_queue.enqueue(
+            "recompute_health", {"project_ids": None}, dedup_key="recompute_health:all"
+        )
+        self._thread = threading.Thread(target=self._run, name="health-recompute", daemon=True)
+        self._thread.start()
+        logger.info("Health recomputer started (full rescore %s as job %d)",
+                    "queued" if created else "already queued", job.id)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the thread after flushing what is still queued"""
+        with self._condition:
+            self._stop = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._stop:
+                    self._condition.wait()
+                # Let the rest of a burst of writes arrive before rescoring
+                flush_at = time.monotonic() + settings.health_recompute_delay
+                while not self._stop and time.monotonic() < flush_at:
+                    self._condition.wait(flush_at - time.monotonic())
+                stopping = self._stop
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Health recompute failed; retrying after the next delay")
+            if stopping:
+                return
+
+
+health_recomputer = HealthRecomputer()
+
+
+@event.listens_for(Session, "after_commit")
+def queue_health_recompute(session):
+    """Hand the projects whose tasks this session changed to the recomputer"""
+    touched = session.info.pop("health_dirty", None)
+    if touched and health_recomputer.running:
+        health_recomputer.mark(touched)
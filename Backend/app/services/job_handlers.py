@@ -0,0 +1,99 @@
+"""
+Built-in background job handlers.
+
+Each handler gets the job's JSON payload and returns a JSON-serializable
+result that is stored on the job. Heavy modules are imported inside the
+handlers so registering them stays cheap.
+"""
+from typing import Dict
+from pydantic import ValidationError
+from app.database import SessionLocal
+from app.models import Project, Task, User
+from app.services.job_queue import job_queue, PermanentJobError
+from app.services.response_cache import response_cache, project_tag
+
+
+@job_queue.handler("retrain_health_model")
+def retrain_health_model(payload: Dict) -> Dict:
+    """Retrain and (if it validates better) publish the health model"""
+    from app.services.training_service import health_model_trainer
+
+    report = health_model_trainer.retrain()
+    if report["status"] in ("failed", "already_running"):
+        raise RuntimeError(f"Health model retrain {report['status']}")
+    return report
+
+
+@job_queue.handler("recompute_health")
+def recompute_health(payload: Dict) -> Dict:
+    """Store fresh health scores for `project_ids` (all projects when absent)"""
+    from app.services.health_service import project_health
+
+    with SessionLocal() as db:
+        return project_health.recompute(db, payload.get("project_ids"))
+
+
+@job_queue.handler("prune_change_log")
+def prune_change_log(payload: Dict) -> Dict:
+    """Delete change_log rows older than the retention horizon"""
+    from app.services import change_feed
+
+    with SessionLocal() as db:
+        return {"deleted": change_feed.prune_change_log(db)}
+
+
+@job_queue.handler("import_tasks")
+def import_tasks(payload: Dict) -> Dict:
+    """
+    Create many tasks in one transaction.
+
+    Rows referencing a missing project or user are skipped and reported; the
+    rest are inserted together and tagged with the job id. If the process dies
+    after the commit but before the job is marked done, the retry finds the
+    tagged tasks and reports them instead of inserting them again.
+    """
+    from app.schemas import TaskCreate
+
+    try:
+        rows = [TaskCreate.model_validate(row) for row in payload.get("tasks", [])]
+    except ValidationError as exc:
+        raise PermanentJobError(f"Invalid task in import: {exc}") from None
+
+    job_id = job_queue.current_job_id()
+    with SessionLocal(expire_on_commit=False) as db:
+        project_ids = sorted({row.project_id for row in rows})
+        user_ids = sorted({row.assigned_to for row in rows if row.assigned_to})
+        known_projects = set()
+        known_users = set()
+        for start in range(0, len(project_ids), 500):
+            chunk = project_ids[start:start + 500]
+            known_projects.update(pid for (pid,) in db.query(Project.id).filter(Project.id.in_(chunk)))
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start:start + 500]
+            known_users.update(uid for (uid,) in db.query(User.id).filter(User.id.in_(chunk)))
+
+        tasks = []
+        skipped = []
+        for index, row in enumerate(rows):
+            if row.project_id not in known_projects:
+                skipped.append({"index": index, "error": "Project not found"})
+            elif row.assigned_to and row.assigned_to not in known_users:
+                skipped.append({"index": index, "error": "Assigned user not found"})
+            else:
+                tasks.append(Task(**row.model_dump(), import_job_id=job_id))
+
+        # Committed by an earlier attempt that died before the job was marked done
+        if job_id is not None:
+            imported = [tid for (tid,) in db.query(Task.id).filter(Task.import_job_id == job_id).order_by(Task.id)]
+            if imported:
+                return {"created": len(imported), "task_ids": imported, "skipped": skipped}
+        db.add_all(tasks)
+        db.commit()
+
+    if tasks:
+        response_cache.invalidate("tasks", *(project_tag(pid) for pid in {t.project_id for t in tasks}))
+    return {
+        "created": len(tasks),
+        "task_ids": [task.id for task in tasks],
+        "skipped": skipped,
+    }
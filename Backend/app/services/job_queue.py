@@ -0,0 +1,354 @@
+"""
+Durable background jobs stored in the `jobs` table.
+
+Request handlers enqueue work and answer 202 with the job id instead of
+blocking. Worker threads in every API process claim jobs with one atomic
+UPDATE ... RETURNING, so several processes can share the queue without
+running a job twice. Handlers are plain functions registered per kind:
+
+    @job_queue.handler("recompute_health")
+    def recompute_health(payload):
+        ...
+        return {"updated": 3}
+
+A failing job is retried with exponential backoff until `max_attempts`. A
+running job holds a lease that its process keeps refreshing; if the process
+dies, the job is queued again once the lease expires.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from fastapi import Response
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentJobError(Exception):
+    """Raise from a handler to fail the job without retrying (e.g. invalid payload)"""
+
+
+class JobQueue:
+    """Enqueues jobs and runs them on a few worker threads per process"""
+
+    def __init__(self):
+        self._handlers: Dict[str, Callable[[Dict], Any]] = {}
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._running: Set[int] = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    # Handlers
+
+    def handler(self, kind: str):
+        """Register the function that runs jobs of `kind`"""
+        def register(func: Callable[[Dict], Any]):
+            self._handlers[kind] = func
+            return func
+        return register
+
+    def current_job_id(self) -> Optional[int]:
+        """Id of the job the calling thread is running; None outside a handler"""
+        return getattr(self._local, "job_id", None)
+
+    def _handler_for(self, kind: str) -> Callable[[Dict], Any]:
+        import app.services.job_handlers  # noqa: F401  registers the built-in handlers
+        try:
+            return self._handlers[kind]
+        except KeyError:
+            raise PermanentJobError(f"No handler for job kind '{kind}'") from None
+
+    # Producer side
+
+    def enqueue(self, kind: str, payload: Dict = None, priority: int = 0, dedup_key: str = None,
+                max_attempts: int = None, db: Session = None) -> Tuple[Job, bool]:
+        """
+        Queue a job, or return the queued/running job with the same dedup key.
+
+        Returns:
+            (job, created) where created is False for a deduplicated request
+        """
+        self._handler_for(kind)
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            if dedup_key is not None:
+                existing = self._active(db, dedup_key)
+                if existing is not None:
+                    return existing, False
+
+            now = datetime.utcnow()
+            job = Job(
+                kind=kind,
+                payload=json.dumps(payload) if payload is not None else None,
+                priority=priority,
+                status=JobStatus.QUEUED,
+                dedup_key=dedup_key,
+                attempts=0,
+                max_attempts=max_attempts or settings.job_max_attempts,
+                run_after=now,
+                created_at=now,
+            )
+            db.add(job)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another request or process queued the same key in between
+                db.rollback()
+                existing = self._active(db, dedup_key) if dedup_key is not None else None
+                if existing is None:
+                    raise
+                return existing, False
+            db.refresh(job)
+            self._wake.set()
+            return job, True
+        finally:
+            if own_session:
+                db.close()
+
+    @staticmethod
+    def _active(db: Session, dedup_key: str) -> Optional[Job]:
+        return (
+            db.query(Job)
+            .filter(Job.dedup_key == dedup_key, Job.status.in_((JobStatus.QUEUED, JobStatus.RUNNING)))
+            .first()
+        )
+
+    def cancel(self, job_id: int, db: Session) -> bool:
+        """Cancel a job that has not started; False if it is running or finished"""
+        result = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+            .values(status=JobStatus.CANCELLED, finished_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    # Consumer side
+
+    def claim(self) -> Optional[Dict]:
+        """Atomically take the next due job (highest priority, then oldest)"""
+        now = datetime.utcnow()
+        due = (Job.status == JobStatus.QUEUED, Job.run_after <= now)
+        with SessionLocal() as db:
+            # Cheap read first, so idle polling never takes SQLite's write lock
+            if db.execute(select(Job.id).where(*due).limit(1)).first() is None:
+                return None
+            next_id = (
+                select(Job.id).where(*due)
+                .order_by(Job.priority.desc(), Job.id)
+                .limit(1)
+                .scalar_subquery()
+            )
+            row = db.execute(
+                update(Job)
+                .where(Job.id == next_id, Job.status == JobStatus.QUEUED)
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=Job.attempts + 1,
+                    locked_by=self.worker_id,
+                    locked_at=now,
+                    started_at=now,
+                )
+                .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+                .execution_options(synchronize_session=False)
+            ).first()
+            db.commit()
+        return dict(row._mapping) if row is not None else None
+
+    def run_next(self) -> bool:
+        """Claim and run one job; False if none was due"""
+        job = self.claim()
+        if job is None:
+            return False
+        with self._lock:
+            self._running.add(job["id"])
+        self._local.job_id = job["id"]
+        try:
+            handler = self._handler_for(job["kind"])
+            result = handler(json.loads(job["payload"]) if job["payload"] else {})
+        except Exception as exc:
+            self._failed(job, exc)
+        else:
+            self._update(
+                job["id"],
+                status=JobStatus.SUCCEEDED,
+                result=json.dumps(result, default=str) if result is not None else None,
+                error=None,
+                finished_at=datetime.utcnow(),
+                locked_at=None,
+            )
+            logger.info("Job %d (%s) succeeded on attempt %d", job["id"], job["kind"], job["attempts"])
+        finally:
+            self._local.job_id = None
+            with self._lock:
+                self._running.discard(job["id"])
+        return True
+
+    def _failed(self, job: Dict, exc: Exception) -> None:
+        error = f"{type(exc).__name__}: {exc}"
+        if isinstance(exc, PermanentJobError) or job["attempts"] >= job["max_attempts"]:
+            self._update(job["id"], status=JobStatus.FAILED, error=error,
+                         finished_at=datetime.utcnow(), locked_at=None)
+            logger.error("Job %d (%s) failed after %d attempt(s): %s",
+                         job["id"], job["kind"], job["attempts"], error)
+            return
+        delay = settings.job_retry_backoff * 2 ** (job["attempts"] - 1)
+        self._update(job["id"], status=JobStatus.QUEUED, error=error, locked_by=None, locked_at=None,
+                     run_after=datetime.utcnow() + timedelta(seconds=delay))
+        logger.warning("Job %d (%s) attempt %d failed, retrying in %.1fs: %s",
+                       job["id"], job["kind"], job["attempts"], delay, error)
+
+    def _update(self, job_id: int, **values) -> None:
+        """Finish a job this process holds (no-op if its lease was taken over)"""
+        with SessionLocal() as db:
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.locked_by == self.worker_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    # Leases
+
+    def heartbeat(self) -> None:
+        """Refresh the lease of every job this process is running"""
+        with self._lock:
+            running = list(self._running)
+        if not running:
+            return
+        with SessionLocal() as db:
+            db.execute(
+                update(Job)
+                .where(Job.id.in_(running), Job.status == JobStatus.RUNNING, Job.locked_by == self.worker_id)
+                .values(locked_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    def requeue_expired(self) -> int:
+        """Queue again (or fail, when out of attempts) running jobs whose lease expired"""
+        now = datetime.utcnow()
+        expired = (
+            Job.status == JobStatus.RUNNING,
+            Job.locked_at < now - timedelta(seconds=settings.job_lease_seconds),
+        )
+        with SessionLocal() as db:
+            if db.execute(select(Job.id).where(*expired).limit(1)).first() is None:
+                return 0
+            error = "Lease expired; the process running the job stopped"
+            failed = db.execute(
+                update(Job)
+                .where(*expired, Job.attempts >= Job.max_attempts)
+                .values(status=JobStatus.FAILED, error=error, finished_at=now, locked_at=None)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            requeued = db.execute(
+                update(Job)
+                .where(*expired)
+                .values(status=JobStatus.QUEUED, error=error, run_after=now, locked_by=None, locked_at=None)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        if failed or requeued:
+            logger.warning("Expired job leases: %d requeued, %d failed", requeued, failed)
+            self._wake.set()
+        return failed + requeued
+
+    # Worker threads
+
+    def start(self, threads: int = None) -> None:
+        """Start the worker threads and the lease keeper (once per process)"""
+        threads = settings.job_worker_threads if threads is None else threads
+        if self._threads or threads <= 0:
+            return
+        # Forked workers each need their own identity for leases
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(threads)
+        ]
+        self._threads.append(threading.Thread(target=self._keep_leases, name="job-leases", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info("Job queue started with %d worker thread(s)", threads)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the threads; jobs still running are picked up again after their lease expires"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception:
+                logger.exception("Job worker error")
+            self._wake.wait(settings.job_poll_interval)
+            self._wake.clear()
+
+    def _keep_leases(self) -> None:
+        interval = settings.job_lease_seconds / 3
+        while True:
+            try:
+                self.heartbeat()
+                self.requeue_expired()
+            except Exception:
+                logger.exception("Job lease maintenance failed")
+            if self._stop.wait(interval):
+                return
+
+
+job_queue = JobQueue()
+
+
+def describe(job: Job) -> Dict:
+    """Job row as a JobResponse dict, with payload and result decoded"""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "priority": job.priority,
+        "dedup_key": job.dedup_key,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "payload": json.loads(job.payload) if job.payload else None,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "run_after": job.run_after,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def accepted(job: Job, created: bool, response: Response) -> Dict:
+    """Body of a 202 Accepted response for `job`; also sets the Location header"""
+    status_url = f"/api/jobs/{job.id}"
+    response.headers["Location"] = status_url
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "deduplicated": not created,
+        "status_url": status_url,
+    }
@@ -0,0 +1,46 @@
+import importlib
+import sys
+import threading
+from typing import Any
+
+
+class LazyService:
+    """
+    Stand-in for a service singleton whose module is imported on first use.
+
+    Services built on NumPy, SciPy, pandas or scikit-learn are referenced
+    through this from routers, so processes that only serve CRUD and auth
+    never import those libraries. The first attribute access imports the
+    module and forwards to the real singleton from then on.
+    """
+
+    def __init__(self, module: str, name: str):
+        self._module = module
+        self._name = name
+        self._target = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """True once the real service has been imported (here or elsewhere, e.g. by warm-up)"""
+        return self._target is not None or self._module in sys.modules
+
+    def load(self) -> Any:
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    module = importlib.import_module(self._module)
+                    self._target = getattr(module, self._name)
+        return self._target
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy {self._module}.{self._name} ({state})>"
+
+
+def lazy_service(module: str, name: str) -> LazyService:
+    """Reference `module.name` without importing `module` yet"""
+    return LazyService(module, name)
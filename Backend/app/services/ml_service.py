@@ -1,19 +1,27 @@
+import os
+import pickle
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import IsolationForest, RandomForestClassifier
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.models import DeveloperMetrics
+from app.services.reassignment_service import reassignment_engine
 from typing import List, Dict, Tuple
 
 
 class MLService:
     def __init__(self):
         self.health_model = None
+        self.health_model_version = None
         self.isolation_model = None
         self._train_health_model()
     
     def _train_health_model(self):
-        """Train the project health prediction model with sample data"""
+        """Load the retrained model if one was published, else train on sample data"""
+        if self._load_published_model():
+            return
+        
         # Sample training data
         sample_data = pd.DataFrame({
             "tasks_completed": [60, 45, 70, 30, 80, 50, 65, 40],
@@ -28,6 +36,24 @@ class MLService:
         self.health_model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.health_model.fit(X, y)
     
+    def _load_published_model(self) -> bool:
+        """
+        Swap in the model published by the retraining job, if it changed.
+        
+        The job replaces the file atomically, so a single stat per prediction is
+        enough for every process (including pool workers) to pick it up.
+        """
+        try:
+            version = os.stat(settings.health_model_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if version == self.health_model_version:
+            return True
+        with open(settings.health_model_path, "rb") as f:
+            model = pickle.load(f)
+        self.health_model, self.health_model_version = model, version
+        return True
+    
     def predict_health(self, tasks: int, hours: int, bugs: int) -> Tuple[str, float]:
         """
         Predict project health based on metrics
@@ -37,12 +63,16 @@ class MLService:
         """
         if self.health_model is None:
             self._train_health_model()
+        else:
+            self._load_published_model()
         
+        # Read the reference once so a concurrent swap can't mix two models
+        model = self.health_model
         features = np.array([[tasks, hours, bugs]])
-        prediction = self.health_model.predict(features)[0]
+        prediction = model.predict(features)[0]
         
         # Get probability/confidence
-        probabilities = self.health_model.predict_proba(features)[0]
+        probabilities = model.predict_proba(features)[0]
         max_prob = np.max(probabilities)
         
         return prediction, float(max_prob)
@@ -101,48 +131,12 @@ class MLService:
     
     def suggest_task_reassignments(self, db: Session) -> List[Dict]:
         """
-        Suggest task reassignments for developers who are 120%+ loaded
+        Suggest concrete task moves for developers who are 120%+ loaded
         
         Returns:
-            List of reassignment suggestions
+            List of reassignment suggestions, each naming the tasks to move
         """
-        metrics = db.query(DeveloperMetrics).all()
-        
-        if not metrics:
-            return []
-        
-        suggestions = []
-        
-        for metric in metrics:
-            load_pct = (metric.hours_worked / 40.0) * 100
-            
-            if load_pct >= 120:
-                # Find developers with lower load
-                available_devs = [
-                    m for m in metrics 
-                    if m.developer_id != metric.developer_id 
-                    and (m.hours_worked / 40.0) * 100 < 100
-                ]
-                
-                if available_devs:
-                    # Sort by load (ascending)
-                    available_devs.sort(key=lambda x: x.hours_worked)
-                    suggested_assignee = available_devs[0]
-                    
-                    suggestions.append({
-                        "developer": metric.developer_name,
-                        "current_load": round(load_pct, 2),
-                        "suggested_reassignments": [
-                            {
-                                "from": metric.developer_name,
-                                "to": suggested_assignee.developer_name,
-                                "reason": f"Developer is {load_pct:.1f}% loaded. {suggested_assignee.developer_name} has capacity."
-                            }
-                        ],
-                        "reason": f"Overloaded at {load_pct:.1f}% capacity"
-                    })
-        
-        return suggestions
+        return reassignment_engine.suggest(db)
 
 
 ml_service = MLService()
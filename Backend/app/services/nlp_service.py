@@ -1,5 +1,45 @@
+import heapq
 import re
-from typing import List
+from collections import Counter
+from itertools import repeat
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Sentence boundaries and word tokens, compiled once per process (also used by
+# ai_engine and the assignee recommender)
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+WORD = re.compile(r'\b\w+\b')
+
+# Common stop words (simple list)
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
+    'could', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'
+})
+
+# Bump whenever summaries for the same input can change (invalidates caches)
+SUMMARY_ALGORITHM_VERSION = 2
+
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_SENTENCE_LENGTH = 1024 * 1024
+
+
+class _TermIndex(dict):
+    """Word -> column id for a batch; stop words and short words map to -1"""
+    
+    def __init__(self):
+        super().__init__()
+        self.size = 0
+    
+    def __missing__(self, word: str) -> int:
+        if len(word) > 2 and word not in STOP_WORDS:
+            term, self.size = self.size, self.size + 1
+        else:
+            term = -1
+        self[word] = term
+        return term
 
 
 class NLPService:
@@ -29,53 +69,203 @@ class NLPService:
         if len(sentences) <= max_sentences:
             return text
         
-        # Score sentences (simple TF-based scoring)
-        word_freq = NLPService._calculate_word_frequency(text)
-        sentence_scores = {}
-        
-        for i, sentence in enumerate(sentences):
-            score = sum(word_freq.get(word.lower(), 0) for word in sentence.split())
-            sentence_scores[i] = score
+        # Tokenize every sentence once; frequencies and scores share the tokens
+        tokens = [NLPService._tokenize(sentence) for sentence in sentences]
+        counts: Counter = Counter()
+        for sentence_tokens in tokens:
+            counts.update(sentence_tokens)
+        word_freq = NLPService._content_words(counts)
         
-        # Select top sentences
-        sorted_sentences = sorted(sentence_scores.items(), key=lambda x: x[1], reverse=True)
-        top_indices = sorted([idx for idx, _ in sorted_sentences[:max_sentences]])
+        # Select top sentences (ties keep the earlier sentence)
+        top_indices = heapq.nlargest(
+            max_sentences,
+            range(len(sentences)),
+            key=lambda i: NLPService._score(tokens[i], word_freq)
+        )
         
         # Reconstruct summary maintaining order
-        summary_sentences = [sentences[idx] for idx in top_indices]
-        return " ".join(summary_sentences)
+        return " ".join(sentences[idx] for idx in sorted(top_indices))
+    
+    @staticmethod
+    def summarize_stream(source: IO[str], max_sentences: int = 5,
+                         chunk_size: int = STREAM_CHUNK_SIZE) -> Tuple[str, int]:
+        """
+        Summarize a seekable text stream in bounded memory.
+        
+        The first pass builds word frequencies, the second scores sentences and
+        keeps the best ones in a min-heap of size `max_sentences`. Text without
+        sentence punctuation is cut every MAX_SENTENCE_LENGTH characters, so no
+        sentence is longer than MAX_SENTENCE_LENGTH + chunk_size and memory is
+        O(vocabulary + max_sentences * (MAX_SENTENCE_LENGTH + chunk_size))
+        regardless of document size.
+        
+        Args:
+            source: Seekable text file object
+            max_sentences: Maximum number of sentences in summary
+            chunk_size: Characters read per chunk
+            
+        Returns:
+            Tuple of (summary, characters read)
+        """
+        counts: Counter = Counter()
+        chunk_lengths: List[int] = []
+        for sentence in NLPService._iter_sentences(source, chunk_size, chunk_lengths):
+            counts.update(NLPService._tokenize(sentence))
+        word_freq = NLPService._content_words(counts)
+        
+        source.seek(0)
+        heap: List[Tuple[int, int, str]] = []
+        for index, sentence in enumerate(NLPService._iter_sentences(source, chunk_size)):
+            # (score, -index) orders ties so the earlier sentence survives
+            entry = (NLPService._score(NLPService._tokenize(sentence), word_freq), -index, sentence)
+            if len(heap) < max_sentences:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+        
+        summary_sentences = [sentence for _, _, sentence in sorted(heap, key=lambda e: -e[1])]
+        return " ".join(summary_sentences), sum(chunk_lengths)
+    
+    @staticmethod
+    def summarize_batch(texts: List[str], max_sentences: int = 5,
+                        digest_sentences: int = 0) -> Tuple[List[str], Optional[str]]:
+        """
+        Summarize many documents against one shared TF-IDF model.
+        
+        All sentences of the batch go into a single sparse sentence-term matrix
+        (COO arrays). Document term counts, IDF across the batch and every
+        sentence score are then computed with vectorized NumPy operations, and
+        the top sentences of every document are picked in one sort.
+        
+        Args:
+            texts: Documents to summarize
+            max_sentences: Maximum number of sentences per summary
+            digest_sentences: If > 0, also build a combined digest of this many
+                sentences scored across the whole batch
+                
+        Returns:
+            Tuple of (one summary per document, digest or None)
+        """
+        import numpy as np
+        
+        sentences: List[str] = []
+        sentence_doc: List[int] = []
+        term_ids: List[int] = []
+        token_counts: List[int] = []
+        vocab = _TermIndex()
+        lookup = vocab.__getitem__
+        for doc, text in enumerate(texts):
+            for sentence in NLPService._split_sentences(text or ""):
+                words = NLPService._tokenize(sentence)
+                sentences.append(sentence)
+                sentence_doc.append(doc)
+                term_ids.extend(map(lookup, words))
+                token_counts.append(len(words))
+        
+        # Sentence-term matrix in COO form: one (row, col) entry per content word
+        n_docs, n_sentences, n_terms = len(texts), len(sentences), max(vocab.size, 1)
+        rows = np.repeat(np.arange(n_sentences), token_counts)
+        cols = np.asarray(term_ids, dtype=np.int64)
+        content = cols >= 0
+        rows, cols = rows[content], cols[content]
+        docs = np.asarray(sentence_doc, dtype=np.int64)
+        
+        # Document-term counts: one (doc, term) key per token occurrence
+        keys = docs[rows] * n_terms + cols
+        doc_terms, inverse, doc_counts = np.unique(keys, return_inverse=True, return_counts=True)
+        doc_freq = np.bincount(doc_terms % n_terms, minlength=n_terms)
+        idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+        
+        # Each token contributes its document's TF-IDF weight to its sentence
+        weights = doc_counts[inverse] * idf[cols]
+        scores = np.bincount(rows, weights=weights, minlength=n_sentences)
+        
+        # Rank sentences within each document: by doc, score desc, position asc
+        positions = np.arange(n_sentences)
+        order = np.lexsort((positions, -scores, docs))
+        sorted_docs = docs[order]
+        rank = positions - np.searchsorted(sorted_docs, sorted_docs, side="left")
+        chosen = np.sort(order[rank < max_sentences])
+        
+        per_doc: List[List[str]] = [[] for _ in range(n_docs)]
+        for index in chosen.tolist():
+            per_doc[sentence_doc[index]].append(sentences[index])
+        sentence_counts = np.bincount(docs, minlength=n_docs)
+        summaries = [
+            (text if sentence_counts[doc] <= max_sentences else " ".join(per_doc[doc]))
+            if text and text.strip() else ""
+            for doc, text in enumerate(texts)
+        ]
+        
+        digest = None
+        if digest_sentences and n_sentences:
+            corpus_weights = np.bincount(cols, minlength=n_terms) * idf
+            corpus_scores = np.bincount(rows, weights=corpus_weights[cols], minlength=n_sentences)
+            count = min(digest_sentences, n_sentences)
+            # Every sentence above the cut-off score, then the earliest ones tied at it
+            cutoff = np.partition(corpus_scores, n_sentences - count)[n_sentences - count]
+            above = np.flatnonzero(corpus_scores > cutoff)
+            tied = np.flatnonzero(corpus_scores == cutoff)[:count - len(above)]
+            top = np.concatenate((above, tied))
+            digest = " ".join(sentences[i] for i in np.sort(top).tolist())
+        
+        return summaries, digest
+    
+    @staticmethod
+    def _iter_sentences(source: IO[str], chunk_size: int,
+                        chunk_lengths: List[int] = None) -> Iterator[str]:
+        """Yield sentences from a stream, carrying partial sentences across chunks"""
+        carry = ""
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            if chunk_lengths is not None:
+                chunk_lengths.append(len(chunk))
+            parts = SENTENCE_SPLIT.split(carry + chunk)
+            carry = parts.pop()
+            # Text without sentence punctuation: cut it rather than buffer it all
+            while len(carry) > MAX_SENTENCE_LENGTH:
+                parts.append(carry[:MAX_SENTENCE_LENGTH])
+                carry = carry[MAX_SENTENCE_LENGTH:]
+            for part in parts:
+                part = part.strip()
+                if part:
+                    yield part
+        carry = carry.strip()
+        if carry:
+            yield carry
     
     @staticmethod
     def _split_sentences(text: str) -> List[str]:
         """Split text into sentences"""
         # Simple sentence splitting (can be improved with NLTK if needed)
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = SENTENCE_SPLIT.split(text)
         return [s.strip() for s in sentences if s.strip()]
     
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        """Lowercase word tokens with punctuation removed"""
+        return WORD.findall(text.lower())
+    
+    @staticmethod
+    def _content_words(counts: Counter) -> Dict[str, int]:
+        """Drop stop words and words of 2 characters or fewer from token counts"""
+        # Filtering the vocabulary once is cheaper than filtering every token
+        return {
+            word: count for word, count in counts.items()
+            if len(word) > 2 and word not in STOP_WORDS
+        }
+    
+    @staticmethod
+    def _score(tokens: Iterable[str], freq: Dict[str, int]) -> int:
+        """Sum of corpus frequencies of a sentence's words"""
+        return sum(map(freq.get, tokens, repeat(0)))
+    
     @staticmethod
     def _calculate_word_frequency(text: str) -> dict:
         """Calculate word frequency in text"""
-        # Remove punctuation and convert to lowercase
-        words = re.findall(r'\b\w+\b', text.lower())
-        
-        # Remove common stop words (simple list)
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
-            'could', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those',
-            'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'
-        }
-        
-        words = [w for w in words if w not in stop_words and len(w) > 2]
-        
-        # Calculate frequency
-        freq = {}
-        for word in words:
-            freq[word] = freq.get(word, 0) + 1
-        
-        return freq
+        return NLPService._content_words(Counter(NLPService._tokenize(text)))
 
 
 nlp_service = NLPService()
-
@@ -0,0 +1,194 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models import DeveloperMetrics, Task, TaskStatus
+from app.services.dependency_service import DEFAULT_TASK_DAYS
+
+
+# Capacity model shared by the workload endpoints
+STANDARD_WEEK_HOURS = 40.0
+OVERLOAD_THRESHOLD = 120.0  # percent of a standard week
+TARGET_LOAD = 100.0         # overloaded developers are relieved down to this
+CAPACITY_LIMIT = 100.0      # receivers must stay at or below this
+
+# Cost of moving a task by status: untouched work moves first,
+# in-progress work last. Completed tasks are never candidates.
+MOVE_COST = {
+    TaskStatus.TODO: 0,
+    TaskStatus.BLOCKED: 1,
+    TaskStatus.IN_PROGRESS: 2,
+}
+
+# SQLite caps the number of bound parameters per statement
+_IN_CHUNK = 500
+
+# (developer_id, developer_name, hours_worked, open_task_count)
+DeveloperRow = Tuple[int, str, float, int]
+# (task_id, title, assigned_to, status, deadline, estimated_days)
+TaskRow = Tuple[int, str, int, TaskStatus, object, Optional[float]]
+
+
+def load_percentage(hours_worked: float) -> float:
+    """Load of a developer as a percentage of a standard week"""
+    return (hours_worked / STANDARD_WEEK_HOURS) * 100 if hours_worked > 0 else 0.0
+
+
+class ReassignmentEngine:
+    """
+    Greedy capacity-constrained task reassignment.
+
+    Receivers are kept in a max-heap keyed by spare hours, so every move
+    costs O(log D). Each overloaded developer's open tasks are ordered by
+    move cost (status, then latest deadline first) and handed to whoever
+    currently has the most spare capacity until the developer is back at
+    the target load. Overall cost is O(T log T + T log D).
+
+    A task carries the share of its developer's hours given by its estimate:
+    hours are split across their open tasks in proportion to `estimated_days`,
+    and unestimated tasks count as DEFAULT_TASK_DAYS.
+    """
+
+    def plan(self, developers: Iterable[DeveloperRow], tasks: Iterable[TaskRow]) -> List[Dict]:
+        """
+        Compute concrete task moves.
+
+        Args:
+            developers: Rows of (developer_id, developer_name, hours_worked, open_task_count)
+            tasks: Open tasks of the overloaded developers as
+                (task_id, title, assigned_to, status, deadline, estimated_days)
+
+        Returns:
+            One suggestion per overloaded developer that can be relieved
+        """
+        by_id = {}
+        donors = []
+        receivers = []
+        for dev_id, name, hours, open_count in developers:
+            hours = float(hours or 0.0)
+            by_id[dev_id] = (name, hours, open_count)
+            load = load_percentage(hours)
+            if load >= OVERLOAD_THRESHOLD and open_count:
+                donors.append(dev_id)
+            elif load < CAPACITY_LIMIT:
+                spare = STANDARD_WEEK_HOURS * CAPACITY_LIMIT / 100 - hours
+                # heapq is a min-heap: negate spare hours for max-first order
+                receivers.append((-spare, dev_id))
+
+        if not donors or not receivers:
+            return []
+        heapq.heapify(receivers)
+
+        candidates: Dict[int, List[Tuple[int, float, int, str, float]]] = {d: [] for d in donors}
+        open_days = dict.fromkeys(donors, 0.0)
+        for task_id, title, assigned_to, status, deadline, estimated_days in tasks:
+            bucket = candidates.get(assigned_to)
+            if bucket is None:
+                continue
+            days = estimated_days or DEFAULT_TASK_DAYS
+            open_days[assigned_to] += days
+            if status not in MOVE_COST:
+                continue
+            # Latest deadline first; tasks without a deadline are the easiest to move
+            due = -deadline.timestamp() if deadline is not None else float("-inf")
+            bucket.append((MOVE_COST[status], due, task_id, title, days))
+
+        # Relieve the most overloaded developers first
+        donors.sort(key=lambda d: by_id[d][1], reverse=True)
+
+        suggestions = []
+        for dev_id in donors:
+            name, hours, _ = by_id[dev_id]
+            if not open_days[dev_id]:
+                continue
+            hours_per_day = hours / open_days[dev_id]
+            target_hours = STANDARD_WEEK_HOURS * TARGET_LOAD / 100
+            current_load = load_percentage(hours)
+            moves = []
+
+            for _, _, task_id, title, days in sorted(candidates[dev_id]):
+                if hours <= target_hours or not receivers:
+                    break
+                task_hours = hours_per_day * days
+                neg_spare, receiver_id = receivers[0]
+                if -neg_spare < task_hours:
+                    # The roomiest receiver cannot take it, so nobody can; a smaller task may still fit
+                    continue
+                receiver_name = by_id[receiver_id][0]
+                moves.append({
+                    "task_id": task_id,
+                    "task_title": title,
+                    "from": name,
+                    "from_developer_id": dev_id,
+                    "to": receiver_name,
+                    "to_developer_id": receiver_id,
+                    "estimated_hours": round(task_hours, 2),
+                    "reason": f"Developer is {current_load:.1f}% loaded. {receiver_name} has capacity."
+                })
+                hours -= task_hours
+                heapq.heapreplace(receivers, (neg_spare + task_hours, receiver_id))
+
+            if moves:
+                suggestions.append({
+                    "developer": name,
+                    "current_load": round(current_load, 2),
+                    "projected_load": round(load_percentage(hours), 2),
+                    "suggested_reassignments": moves,
+                    "reason": f"Overloaded at {current_load:.1f}% capacity"
+                })
+
+        return suggestions
+
+    def suggest(self, db: Session) -> List[Dict]:
+        """Plan reassignments from the latest metrics and open tasks in the database"""
+        developers = self.load_developers(db)
+        donor_ids = [
+            dev_id for dev_id, _, hours, open_count in developers
+            if open_count and load_percentage(hours or 0.0) >= OVERLOAD_THRESHOLD
+        ]
+        if not donor_ids:
+            return []
+        return self.plan(developers, self.load_open_tasks(db, donor_ids))
+
+    @staticmethod
+    def load_developers(db: Session) -> List[DeveloperRow]:
+        """Latest metrics row per developer joined with their open task count"""
+        latest = (
+            db.query(func.max(DeveloperMetrics.id).label("id"))
+            .group_by(DeveloperMetrics.developer_id)
+            .subquery()
+        )
+        open_counts = (
+            db.query(Task.assigned_to.label("developer_id"), func.count(Task.id).label("open_tasks"))
+            .filter(Task.assigned_to.isnot(None), Task.status != TaskStatus.COMPLETED)
+            .group_by(Task.assigned_to)
+            .subquery()
+        )
+        rows = (
+            db.query(
+                DeveloperMetrics.developer_id,
+                DeveloperMetrics.developer_name,
+                DeveloperMetrics.hours_worked,
+                func.coalesce(open_counts.c.open_tasks, 0),
+            )
+            .join(latest, DeveloperMetrics.id == latest.c.id)
+            .outerjoin(open_counts, open_counts.c.developer_id == DeveloperMetrics.developer_id)
+            .all()
+        )
+        return [tuple(row) for row in rows]
+
+    @staticmethod
+    def load_open_tasks(db: Session, developer_ids: Sequence[int]) -> List[TaskRow]:
+        """Open tasks assigned to the given developers, fetched as plain rows"""
+        rows: List[TaskRow] = []
+        for start in range(0, len(developer_ids), _IN_CHUNK):
+            chunk = developer_ids[start:start + _IN_CHUNK]
+            rows.extend(
+                db.query(Task.id, Task.title, Task.assigned_to, Task.status, Task.deadline, Task.estimated_days)
+                .filter(Task.assigned_to.in_(chunk), Task.status != TaskStatus.COMPLETED)
+                .all()
+            )
+        return rows
+
+
+reassignment_engine = ReassignmentEngine()
@@ -0,0 +1,256 @@
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Task, TaskStatus, User, UserRole
+from app.services.change_feed import consume_changes
+from app.services.nlp_service import STOP_WORDS, WORD
+from app.services.reassignment_service import OVERLOAD_THRESHOLD, load_percentage, reassignment_engine
+
+
+# Hashing trick: terms map straight to one of N_FEATURES columns, so profiles
+# never need a shared vocabulary and new words need no rebuild.
+N_FEATURES = 1 << 18
+
+_BOOTSTRAP_BATCH = 20_000
+
+
+def title_features(title: str) -> List[int]:
+    """Hashed column ids of a title's content words and word bigrams"""
+    words = [w for w in WORD.findall((title or "").lower()) if len(w) > 2 and w not in STOP_WORDS]
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return sorted({zlib.crc32(term.encode()) % N_FEATURES for term in terms})
+
+
+class AssigneeRecommender:
+    """
+    Recommends assignees for a task title from developers' completed work.
+
+    Every developer has a hashed TF-IDF profile built from the titles of the
+    tasks they completed, stored as one L2-normalized sparse matrix, so a
+    title is scored against all profiles with a single sparse matrix-vector
+    product over the columns it touches.
+
+    Profiles follow the change feed: completing, reopening, reassigning,
+    renaming or deleting a task adds or removes its title. Only the affected
+    developers' rows are re-weighted (against the current IDF snapshot) and
+    kept as overrides until the next full refresh. The full refresh, which
+    also recomputes IDF, runs only once enough rows or documents have changed.
+    """
+
+    def __init__(self, load_weight: float = None):
+        self.load_weight = load_weight if load_weight is not None else settings.assignee_load_weight
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every profile; the next bootstrap() reads them again"""
+        with self._lock:
+            self._bootstrapped = False
+            self._row_of: Dict[int, int] = {}
+            # What each completed task contributes: (developer id, title features)
+            self._contributions: Dict[int, Tuple[int, Tuple[int, ...]]] = {}
+            self._developer_ids: List[int] = []
+            # Raw term counts at the last refresh, plus per-row changes since
+            self._counts = sparse.csr_matrix((0, N_FEATURES))
+            self._pending: Dict[int, Counter] = {}
+            self._doc_freq = np.zeros(N_FEATURES, dtype=np.int64)
+            self._documents = 0
+            self._refreshed_documents = 0
+            self._idf = np.ones(N_FEATURES)
+            self._weights = sparse.csc_matrix((0, N_FEATURES))
+            # Re-weighted rows of developers whose profile changed since the last refresh
+            self._overrides: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _row(self, developer_id: int) -> int:
+        row = self._row_of.get(developer_id)
+        if row is None:
+            row = self._row_of[developer_id] = len(self._developer_ids)
+            self._developer_ids.append(developer_id)
+        return row
+
+    def _count(self, contribution: Tuple[int, Tuple[int, ...]], sign: int) -> None:
+        """Add (sign 1) or take back (sign -1) one task's terms"""
+        developer_id, features = contribution
+        row = self._row(developer_id)
+        self._pending.setdefault(row, Counter()).update(dict.fromkeys(features, sign))
+        self._doc_freq[list(features)] += sign
+        self._documents += sign
+        self._overrides.pop(row, None)
+
+    def _set(self, task_id: int, contribution: Optional[Tuple[int, Tuple[int, ...]]]) -> None:
+        """Make a task contribute `contribution` (None for nothing) to the profiles"""
+        current = self._contributions.get(task_id)
+        if current == contribution:
+            return
+        if current is not None:
+            self._count(current, -1)
+            del self._contributions[task_id]
+        if contribution is not None:
+            self._count(contribution, 1)
+            self._contributions[task_id] = contribution
+
+    @staticmethod
+    def _contribution(developer_id: Optional[int], title: str) -> Optional[Tuple[int, Tuple[int, ...]]]:
+        features = title_features(title)
+        if developer_id is None or not features:
+            return None
+        return developer_id, tuple(features)
+
+    def _needs_refresh(self) -> bool:
+        if not self._pending:
+            return False
+        # IDF drifts slowly: refresh after ~10% more documents or 5% of rows touched
+        return (
+            self._documents > self._refreshed_documents * 1.1
+            or len(self._pending) > max(64, len(self._developer_ids) // 20)
+        )
+
+    @staticmethod
+    def _tfidf(counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+        """Sublinear term frequency times IDF"""
+        return (1 + np.log(counts)) * idf
+
+    def _refresh(self) -> None:
+        """Fold pending counts into the matrix and recompute every weight"""
+        shape = (len(self._developer_ids), N_FEATURES)
+        counts = self._counts
+        counts.resize(shape)
+        rows, cols, values = [], [], []
+        for row, added in self._pending.items():
+            rows.extend([row] * len(added))
+            cols.extend(added.keys())
+            values.extend(added.values())
+        counts = counts + sparse.csr_matrix((values, (rows, cols)), shape=shape)
+        # Terms taken back by reopened or deleted tasks
+        counts.eliminate_zeros()
+        self._counts = counts
+        self._pending = {}
+        self._overrides = {}
+        self._refreshed_documents = self._documents
+
+        self._idf = np.log((1 + self._documents) / (1 + self._doc_freq)) + 1
+        weights = counts.tocoo()
+        data = self._tfidf(weights.data, self._idf[weights.col])
+        norms = np.sqrt(np.bincount(weights.row, weights=data * data, minlength=shape[0]))
+        norms[norms == 0] = 1.0
+        self._weights = sparse.csc_matrix((data / norms[weights.row], (weights.row, weights.col)), shape=shape)
+
+    def _override(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Current weights of one pending row, using the IDF snapshot"""
+        cached = self._overrides.get(row)
+        if cached is not None:
+            return cached
+        merged = Counter(self._pending[row])
+        if row < self._counts.shape[0]:
+            start, end = self._counts.indptr[row], self._counts.indptr[row + 1]
+            for col, value in zip(self._counts.indices[start:end], self._counts.data[start:end]):
+                merged[int(col)] += value
+        merged = {col: value for col, value in merged.items() if value > 0}
+        cols = np.fromiter(merged.keys(), dtype=np.int64, count=len(merged))
+        data = self._tfidf(np.fromiter(merged.values(), dtype=np.float64, count=len(merged)), self._idf[cols])
+        if len(data):
+            data /= np.linalg.norm(data)
+        order = np.argsort(cols)
+        cached = self._overrides[row] = (cols[order], data[order])
+        return cached
+
+    def bootstrap(self, db: Session) -> None:
+        """Build profiles from every completed, assigned task once"""
+        with self._lock:
+            if self._bootstrapped:
+                return
+            result = db.execute(
+                select(Task.id, Task.assigned_to, Task.title)
+                .where(Task.status == TaskStatus.COMPLETED, Task.assigned_to.isnot(None))
+                .execution_options(yield_per=_BOOTSTRAP_BATCH)
+            )
+            for task_id, developer_id, title in result:
+                self._set(task_id, self._contribution(developer_id, title))
+            self._refresh()
+            self._bootstrapped = True
+
+    def apply(self, changes: List[Dict]) -> None:
+        """Update profiles for committed task changes (no-op until bootstrapped)"""
+        with self._lock:
+            if not self._bootstrapped:
+                return
+            for change in changes:
+                if change["table"] != "tasks":
+                    continue
+                payload = change["payload"]
+                if change["op"] == "delete":
+                    self._set(change["row_id"], None)
+                elif payload and {"status", "assigned_to", "title"} <= payload.keys():
+                    completed = payload["status"] == TaskStatus.COMPLETED
+                    self._set(change["row_id"], self._contribution(
+                        payload["assigned_to"] if completed else None, payload["title"]
+                    ))
+
+    def similarities(self, title: str) -> Dict[int, float]:
+        """Cosine similarity of a title to every developer profile"""
+        features = title_features(title)
+        with self._lock:
+            if self._needs_refresh():
+                self._refresh()
+            if not features or not self._developer_ids:
+                return {}
+            features = np.asarray(features)
+            query = self._idf[features]
+            query /= np.linalg.norm(query)
+            scores = np.zeros(len(self._developer_ids))
+            scores[:self._weights.shape[0]] = self._weights[:, features] @ query
+            for row in self._pending:
+                cols, data = self._override(row)
+                if not len(cols):
+                    scores[row] = 0.0
+                    continue
+                hits = np.searchsorted(cols, features).clip(max=len(cols) - 1)
+                found = cols[hits] == features
+                scores[row] = data[hits[found]] @ query[found]
+            return {
+                developer_id: float(score)
+                for developer_id, score in zip(self._developer_ids, scores) if score > 0
+            }
+
+    def recommend(self, db: Session, title: str, k: int = 5) -> List[Dict]:
+        """
+        Top-k developers for a task title.
+
+        score = (1 - load_weight) * similarity + load_weight * availability,
+        where availability falls linearly from 1 at no load to 0 at the
+        overload threshold.
+        """
+        self.bootstrap(db)
+        similarity = self.similarities(title)
+
+        loads: Dict[int, Tuple[float, int]] = {
+            developer_id: (load_percentage(hours or 0), open_tasks)
+            for developer_id, _, hours, open_tasks in reassignment_engine.load_developers(db)
+        }
+        developers = db.query(User.id, User.name).filter(User.role == UserRole.DEVELOPER).all()
+
+        candidates = []
+        for developer_id, name in developers:
+            load, open_tasks = loads.get(developer_id, (0.0, 0))
+            availability = min(max(1 - load / OVERLOAD_THRESHOLD, 0.0), 1.0)
+            match = similarity.get(developer_id, 0.0)
+            candidates.append({
+                "developer_id": developer_id,
+                "developer": name,
+                "score": round((1 - self.load_weight) * match + self.load_weight * availability, 4),
+                "similarity": round(match, 4),
+                "load_percentage": round(load, 2),
+                "open_tasks": open_tasks,
+            })
+        candidates.sort(key=lambda c: (-c["score"], -c["similarity"], c["developer_id"]))
+        return candidates[:k]
+
+
+assignee_recommender = AssigneeRecommender()
+consume_changes(assignee_recommender.apply)
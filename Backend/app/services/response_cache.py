@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Set, Tuple
+from app.config import settings
+
+
+class ResponseCache:
+    """
+    In-memory cache for expensive read endpoints, invalidated by writes.
+
+    Every entry carries a TTL and a set of dependency tags ("tasks",
+    "developer_metrics", "project:3", ...). Routers call `invalidate` with the
+    tags a write touched, which drops exactly the entries depending on them.
+
+    Concurrent misses for the same key are coalesced: the first caller
+    computes, everyone else waits on the same future. Each tag has a
+    generation counter, so a computation that started before an invalidation
+    is handed to its waiters but never stored, and requests arriving after the
+    invalidation start a fresh computation instead of joining the stale one.
+    """
+
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        self.ttl = ttl if ttl is not None else settings.response_cache_ttl
+        self.max_entries = max_entries if max_entries is not None else settings.response_cache_max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, Tuple[str, ...]]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[Hashable]] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._in_flight: Dict[Tuple, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    # Lookup
+
+    def _lookup(self, key: Hashable, tags: Tuple[str, ...]):
+        """Under the lock: (value, None) on a hit, else (None, (future, owner, generation))"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at, _ = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value, None
+            self._drop(key)
+
+        generation = self._generation(tags)
+        flight_key = (key, generation)
+        future = self._in_flight.get(flight_key)
+        if future is not None:
+            self.coalesced += 1
+            return None, (future, False, generation)
+        self.misses += 1
+        future = self._in_flight[flight_key] = Future()
+        return None, (future, True, generation)
+
+    def _complete(self, key: Hashable, tags: Tuple[str, ...], ttl: float,
+                  generation: Tuple[int, ...], future: Future, value: Any = None,
+                  error: BaseException = None) -> None:
+        with self._lock:
+            self._in_flight.pop((key, generation), None)
+            if error is None and self._generation(tags) == generation:
+                self._store(key, tags, value, ttl)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def _generation(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        """Under the lock: changes whenever any of `tags` is invalidated or the cache is cleared"""
+        return (self._epoch,) + tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any],
+                       tags: Iterable[str] = (), ttl: float = None) -> Any:
+        """Cached value for `key`, computing it at most once across concurrent callers"""
+        tags = tuple(tags)
+        with self._lock:
+            value, flight = self._lookup(key, tags)
+        if flight is None:
+            return value
+        future, owner, generation = flight
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as exc:
+            self._complete(key, tags, ttl, generation, future, error=exc)
+            raise
+        self._complete(key, tags, ttl, generation, future, value=value)
+        return value
+
+    async def aget_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]],
+                              tags: Iterable[str] = (), ttl: float = None) -> Any:
+        """Async variant of `get_or_compute` for endpoints that await their work"""
+        tags = tuple(tags)
+        with self._lock:
+            value, flight = self._lookup(key, tags)
+        if flight is None:
+            return value
+        future, owner, generation = flight
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            value = await compute()
+        except BaseException as exc:
+            self._complete(key, tags, ttl, generation, future, error=exc)
+            raise
+        self._complete(key, tags, ttl, generation, future, value=value)
+        return value
+
+    # Storage
+
+    def _store(self, key: Hashable, tags: Tuple[str, ...], value: Any, ttl: float = None) -> None:
+        self._drop(key)
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        self._entries[key] = (value, expires_at, tags)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry depending on any of `tags`; returns how many were dropped"""
+        with self._lock:
+            dropped = 0
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._by_tag.get(tag, ())):
+                    self._drop(key)
+                    dropped += 1
+            self.invalidations += dropped
+            return dropped
+
+    def clear(self) -> None:
+        """Drop everything, including results of computations still in flight"""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def project_tag(project_id: int) -> str:
+    """Dependency tag for everything derived from one project and its tasks"""
+    return f"project:{project_id}"
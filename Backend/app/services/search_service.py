@@ -0,0 +1,114 @@
+import re
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from app.models import TaskStatus
+
+
+_TERM = re.compile(r'\w+')
+
+SEARCH_KINDS = ("all", "tasks", "projects")
+
+
+def build_match_query(query: str, prefix: bool = True) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word is quoted (so FTS5 operators in user input are inert) and,
+    with `prefix`, matched as a prefix: "auth imp" -> "auth"* "imp"*.
+    Returns None when the query has no words.
+    """
+    terms = _TERM.findall(query)
+    if not terms:
+        return None
+    suffix = "*" if prefix else ""
+    return " ".join(f'"{term}"{suffix}' for term in terms)
+
+
+class SearchService:
+    """
+    Ranked full-text search over tasks and projects.
+
+    Matching and bm25 ranking run inside the FTS5 index; project and status
+    filters are applied in the same SQL statement, and only the top `limit`
+    rows per kind are returned.
+    """
+
+    def search(self, db: Session, query: str, project_id: int = None,
+               statuses: List[TaskStatus] = None, kind: str = "all",
+               prefix: bool = True, limit: int = 20) -> Dict:
+        match = build_match_query(query, prefix)
+        results = {"query": query, "tasks": [], "projects": []}
+        if match is None:
+            return results
+
+        if kind in ("all", "tasks"):
+            results["tasks"] = self._search_tasks(db, match, project_id, statuses, limit)
+        # Status filters only apply to tasks
+        if kind in ("all", "projects") and not statuses:
+            results["projects"] = self._search_projects(db, match, project_id, limit)
+        return results
+
+    @staticmethod
+    def _search_tasks(db: Session, match: str, project_id: Optional[int],
+                      statuses: Optional[List[TaskStatus]], limit: int) -> List[Dict]:
+        filters = ""
+        params = {"match": match, "limit": limit}
+        if project_id is not None:
+            filters += " AND t.project_id = :project_id"
+            params["project_id"] = project_id
+        if statuses:
+            filters += " AND t.status IN :statuses"
+            # Enum columns store member names
+            params["statuses"] = [status.name for status in statuses]
+
+        stmt = text(
+            "SELECT t.id, t.title, t.status, t.project_id, t.assigned_to, t.deadline, "
+            "bm25(tasks_fts) AS score "
+            "FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid "
+            f"WHERE tasks_fts MATCH :match{filters} "
+            "ORDER BY score LIMIT :limit"
+        )
+        if statuses:
+            stmt = stmt.bindparams(bindparam("statuses", expanding=True))
+
+        return [
+            {
+                "id": row.id,
+                "title": row.title,
+                "status": TaskStatus[row.status] if row.status else None,
+                "project_id": row.project_id,
+                "assigned_to": row.assigned_to,
+                "deadline": row.deadline,
+                "score": round(-row.score, 4),
+            }
+            for row in db.execute(stmt, params)
+        ]
+
+    @staticmethod
+    def _search_projects(db: Session, match: str, project_id: Optional[int], limit: int) -> List[Dict]:
+        filters = ""
+        params = {"match": match, "limit": limit}
+        if project_id is not None:
+            filters = " AND p.id = :project_id"
+            params["project_id"] = project_id
+
+        # Name matches weigh twice as much as client name matches
+        stmt = text(
+            "SELECT p.id, p.name, p.client_name, bm25(projects_fts, 2.0, 1.0) AS score "
+            "FROM projects_fts JOIN projects p ON p.id = projects_fts.rowid "
+            f"WHERE projects_fts MATCH :match{filters} "
+            "ORDER BY score LIMIT :limit"
+        )
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "client_name": row.client_name,
+                "score": round(-row.score, 4),
+            }
+            for row in db.execute(stmt, params)
+        ]
+
+
+search_service = SearchService()
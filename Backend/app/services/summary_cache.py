@@ -0,0 +1,180 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.config import settings
+from app.services.nlp_service import SUMMARY_ALGORITHM_VERSION
+
+# The persisted table is trimmed back to the byte budget every N writes
+_PRUNE_EVERY = 64
+
+
+class SummaryCache:
+    """
+    Content-addressed cache of summaries with a byte budget.
+
+    Entries are keyed by a BLAKE2 digest of (algorithm version, max_sentences,
+    text) and evicted least-recently-used once the stored summaries exceed
+    `max_bytes`. With a `path`, entries are also written through to a SQLite
+    side table so they survive restarts. Inputs shorter than `min_chars`
+    bypass the cache: summarizing them is cheaper than hashing and storing.
+    """
+
+    def __init__(self, max_bytes: int = None, min_chars: int = None, path: str = None):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.summary_cache_max_bytes
+        self.min_chars = min_chars if min_chars is not None else settings.summary_cache_min_chars
+        self.path = path if path is not None else settings.summary_cache_path
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    def key_for(self, text: str, max_sentences: int) -> Optional[str]:
+        """Cache key for a request, or None if the input is too small to cache"""
+        if len(text) < self.min_chars:
+            with self._lock:
+                self.bypassed += 1
+            return None
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{SUMMARY_ALGORITHM_VERSION}:{max_sentences}:".encode())
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        """
+        Look up a summary, falling back to the persisted table.
+
+        May block on SQLite; call it from a worker thread in async code.
+        """
+        if key is None:
+            return None
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return summary
+
+            summary = self._load(key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._insert(key, summary)
+            return summary
+
+    def put(self, key: Optional[str], summary: str) -> None:
+        """
+        Store a summary, evicting least-recently-used entries over budget.
+
+        May block on SQLite; call it from a worker thread in async code.
+        """
+        if key is None:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._insert(key, summary)
+            self._store(key, summary)
+
+    def clear(self) -> None:
+        """Drop every entry, including persisted ones"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("DELETE FROM summary_cache")
+                conn.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current memory usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "persistent": bool(self.path),
+            }
+
+    @staticmethod
+    def _size(key: str, summary: str) -> int:
+        return len(key) + len(summary.encode("utf-8", "surrogatepass"))
+
+    def _insert(self, key: str, summary: str) -> None:
+        size = self._size(key, summary)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = summary
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, old_summary = self._entries.popitem(last=False)
+            self._bytes -= self._size(old_key, old_summary)
+            self.evictions += 1
+
+    # SQLite side table (only used when a path is configured)
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summary_cache ("
+                "key TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _load(self, key: str) -> Optional[str]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT summary FROM summary_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE summary_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        conn.commit()
+        return row[0]
+
+    def _store(self, key: str, summary: str) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        conn.execute(
+            "INSERT OR REPLACE INTO summary_cache (key, summary, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, summary, self._size(key, summary), time.time()),
+        )
+        self._writes += 1
+        if self._writes % _PRUNE_EVERY:
+            conn.commit()
+            return
+        # Keep the table within the same byte budget, newest entries first
+        conn.execute(
+            "DELETE FROM summary_cache WHERE key IN ("
+            " SELECT key FROM ("
+            "  SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS running"
+            "  FROM summary_cache"
+            " ) WHERE running > ?"
+            ")",
+            (self.max_bytes,),
+        )
+        conn.commit()
+
+
+summary_cache = SummaryCache()
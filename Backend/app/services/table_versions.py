@@ -0,0 +1,82 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Iterable, Optional
+from fastapi import HTTPException, Request, Response
+
+
+class TableVersions:
+    """
+    Per-table write counters used to derive ETags without touching the database.
+
+    The change feed's after_commit hook bumps the counter of every table a
+    transaction logged to change_log, and the change log follower does the
+    same for other workers' commits. A response's
+    ETag is a digest of the counters it depends on plus its query string, so
+    an unchanged poll is answered with 304 straight from memory. A random
+    token generated at startup keeps ETags from an earlier process (whose
+    counters also started at zero) from ever matching, and is renewed in
+    forked workers, whose counters diverge from their siblings'.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._boot = os.urandom(8).hex()
+
+    def reseed(self) -> None:
+        """Start a new token (runs in every forked child)"""
+        self._lock = threading.Lock()
+        self._boot = os.urandom(8).hex()
+
+    def bump(self, *tables: str) -> None:
+        """Record a committed write to one or more tables"""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def version(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def etag(self, tables: Iterable[str], query: str = "") -> str:
+        """Weak ETag for a response built from `tables` with the given query string"""
+        state = ",".join(f"{table}={self._versions.get(table, 0)}" for table in tables)
+        digest = hashlib.blake2b(f"{self._boot}|{state}|{query}".encode(), digest_size=12).hexdigest()
+        return f'W/"{digest}"'
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
+
+
+table_versions = TableVersions()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=table_versions.reseed)
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header (list or "*")"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    opaque = etag[2:]
+    return any(c == "*" or c == etag or c == opaque or c[2:] == opaque for c in candidates)
+
+
+def conditional_get(*tables: str):
+    """
+    Dependency that answers `If-None-Match` with 304 when `tables` are unchanged.
+
+    List it before `get_db` so an unchanged poll never opens a session. On a
+    normal response the ETag header is set for the client's next poll.
+    """
+    def dependency(request: Request, response: Response) -> str:
+        etag = table_versions.etag(tables, request.url.query)
+        if _matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return etag
+
+    return dependency
@@ -0,0 +1,101 @@
+"""
+Server-side filters and sort orders for task listings.
+
+Every filter compiles to a comparison on a stored column (or the indexed
+`task_changed_at` expression), never a function of a column or of the clock,
+so SQLite can answer it from one of the indexes declared on Task:
+
+    project_id [+ status] [+ deadline range]   ix_tasks_project_status_deadline
+    status [+ deadline range]                  ix_tasks_status_deadline
+    assigned_to [+ status] [+ deadline range]  ix_tasks_assignee_status_deadline
+    overdue=true [+ project_id]                ix_tasks_overdue (partial)
+    deadline range                             ix_tasks_deadline
+    updated_since                              ix_tasks_changed_at
+
+Overdue is the `overdue` flag kept by the deadline scheduler, not a
+comparison with the current time.
+
+Without statistics SQLite assumes an open-ended range matches a quarter of
+the table and would rather walk it in id order than use the range's index,
+so on SQLite the range filters carry a likelihood() hint.
+"""
+from datetime import datetime
+from typing import List, Optional
+from fastapi import HTTPException, Query
+from sqlalchemy import false, func, literal_column, true
+from app.models import Task, TaskStatus, as_utc, task_changed_at
+
+# Share of tasks a deadline or updated_since range is assumed to match
+RANGE_LIKELIHOOD = 0.05
+
+# sort parameter -> ORDER BY; id breaks ties so pages never overlap
+TASK_SORTS = {
+    "id": (Task.id,),
+    "-id": (Task.id.desc(),),
+    "deadline": (Task.deadline.asc().nulls_last(), Task.id),
+    "-deadline": (Task.deadline.desc().nulls_last(), Task.id.desc()),
+    "created_at": (Task.created_at, Task.id),
+    "-created_at": (Task.created_at.desc(), Task.id.desc()),
+    "updated_at": (task_changed_at, Task.id),
+    "-updated_at": (task_changed_at.desc(), Task.id.desc()),
+}
+
+
+def task_order(sort: str = "id") -> tuple:
+    """Dependency turning the `sort` query parameter into ORDER BY terms"""
+    if sort not in TASK_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(TASK_SORTS)}")
+    return TASK_SORTS[sort]
+
+
+class TaskFilters:
+    """Task filter query parameters of GET /api/tasks and /api/aggregate (use with Depends())"""
+
+    def __init__(
+        self,
+        project_id: Optional[int] = None,
+        status: List[TaskStatus] = Query(None),
+        assigned_to: Optional[int] = None,
+        deadline_from: Optional[datetime] = None,
+        deadline_to: Optional[datetime] = None,
+        overdue: Optional[bool] = None,
+        updated_since: Optional[datetime] = None,
+    ):
+        if deadline_from and deadline_to and as_utc(deadline_from) > as_utc(deadline_to):
+            raise HTTPException(status_code=400, detail="deadline_from must not be after deadline_to")
+        self.project_id = project_id
+        self.status = status
+        self.assigned_to = assigned_to
+        self.deadline_from = deadline_from
+        self.deadline_to = deadline_to
+        self.overdue = overdue
+        self.updated_since = as_utc(updated_since)
+
+    def conditions(self, sqlite: bool = False) -> list:
+        """WHERE terms for the filters that were given"""
+        def selective(condition):
+            # The probability must be a literal constant, not a bound parameter
+            return func.likelihood(condition, literal_column(repr(RANGE_LIKELIHOOD))) if sqlite else condition
+
+        conditions = []
+        if self.project_id is not None:
+            conditions.append(Task.project_id == self.project_id)
+        if self.status:
+            conditions.append(Task.status.in_(self.status))
+        if self.assigned_to is not None:
+            conditions.append(Task.assigned_to == self.assigned_to)
+        if self.deadline_from is not None:
+            conditions.append(selective(Task.deadline >= self.deadline_from))
+        if self.deadline_to is not None:
+            conditions.append(selective(Task.deadline <= self.deadline_to))
+        if self.overdue is not None:
+            # A literal, not a bound parameter, so the partial index applies
+            conditions.append(Task.overdue == (true() if self.overdue else false()))
+        if self.updated_since is not None:
+            conditions.append(selective(task_changed_at >= self.updated_since))
+        return conditions
+
+    def apply(self, query):
+        """Filter a query over Task"""
+        sqlite = query.session.get_bind().dialect.name == "sqlite"
+        return query.filter(*self.conditions(sqlite))
@@ -0,0 +1,215 @@
+"""
+Retraining pipeline for the project health classifier.
+
+The training set pairs each developer's metrics with the health score of
+every project they have tasks on. It is read with one SQL statement in
+chunks, fitted in the analysis process pool, validated on a holdout split
+against the live model, and published only if accuracy does not drop.
+"""
+import asyncio
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import DeveloperMetrics, Project, Task
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = ["tasks_completed", "hours_worked", "bugs_reported"]
+
+# Project.health_score (0-100) bands mapped to the classifier's labels
+HEALTH_BANDS = ((80.0, "Excellent"), (60.0, "Good"), (40.0, "Fair"))
+
+
+def health_labels(scores: np.ndarray) -> np.ndarray:
+    """Map health scores to "Excellent" / "Good" / "Fair" / "Poor" labels"""
+    conditions = [scores >= floor for floor, _ in HEALTH_BANDS]
+    return np.select(conditions, [label for _, label in HEALTH_BANDS], default="Poor")
+
+
+def load_training_set(db: Session, chunk_size: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stream the metrics/outcome join in chunks into feature and label arrays.
+
+    Returns:
+        Tuple of (features with shape (n, 3), labels with shape (n,))
+    """
+    chunk_size = chunk_size or settings.retrain_chunk_size
+    assignments = (
+        select(Task.assigned_to.label("developer_id"), Task.project_id)
+        .where(Task.assigned_to.isnot(None))
+        .distinct()
+        .subquery()
+    )
+    stmt = (
+        select(
+            DeveloperMetrics.tasks_completed,
+            DeveloperMetrics.hours_worked,
+            DeveloperMetrics.bugs_reported,
+            Project.health_score,
+        )
+        .join(assignments, assignments.c.developer_id == DeveloperMetrics.developer_id)
+        .join(Project, Project.id == assignments.c.project_id)
+        .where(Project.health_score.isnot(None))
+        .execution_options(yield_per=chunk_size)
+    )
+
+    chunks = [
+        np.asarray(part, dtype=np.float64)
+        for part in db.execute(stmt).partitions(chunk_size)
+    ]
+    if not chunks:
+        return np.empty((0, len(FEATURE_COLUMNS))), np.empty(0, dtype=object)
+    data = np.nan_to_num(np.concatenate(chunks))
+    return data[:, :3], health_labels(data[:, 3])
+
+
+def fit_health_model(X: np.ndarray, y: np.ndarray, holdout: float) -> Dict:
+    """
+    Fit a candidate and score it against the live model on the same holdout.
+
+    Runs inside a pool worker, where `ml_service` is already loaded.
+    """
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import train_test_split
+    from app.services.ml_service import ml_service
+
+    started = time.perf_counter()
+    frame = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+    _, counts = np.unique(y, return_counts=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        frame, y,
+        test_size=holdout,
+        random_state=42,
+        stratify=y if counts.min() >= 2 else None,
+    )
+
+    candidate = RandomForestClassifier(n_estimators=100, random_state=42)
+    candidate.fit(X_train, y_train)
+
+    if ml_service.health_model is None:
+        ml_service._train_health_model()
+    else:
+        ml_service._load_published_model()
+
+    return {
+        "model": candidate,
+        "candidate_accuracy": float(candidate.score(X_test, y_test)),
+        "baseline_accuracy": float(ml_service.health_model.score(X_test, y_test)),
+        "train_size": len(y_train),
+        "test_size": len(y_test),
+        "fit_seconds": time.perf_counter() - started,
+    }
+
+
+def publish_model(model) -> None:
+    """Atomically replace the published model file"""
+    path = settings.health_model_path
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # A unique temp file per publish, so concurrent publishers never share one
+    with tempfile.NamedTemporaryFile(dir=directory or ".", suffix=".tmp", delete=False) as f:
+        try:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    try:
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+
+class HealthModelTrainer:
+    """Runs one retraining at a time and keeps the report of the last run"""
+
+    def __init__(self):
+        self._running = threading.Lock()
+        self.last_report: Optional[Dict] = None
+
+    def retrain(self, db: Session = None) -> Dict:
+        """
+        Rebuild the health model from the database.
+
+        Returns:
+            Run report with status, dataset size, accuracies and timings
+        """
+        if not self._running.acquire(blocking=False):
+            return {"status": "already_running"}
+
+        own_session = db is None
+        db = db or SessionLocal()
+        started = time.perf_counter()
+        try:
+            X, y = load_training_set(db)
+            load_seconds = time.perf_counter() - started
+            report = {"dataset_size": len(y), "load_seconds": round(load_seconds, 3)}
+
+            if len(y) < settings.retrain_min_samples or len(np.unique(y)) < 2:
+                report["status"] = "skipped"
+                logger.info(
+                    "Health model retrain skipped: %d rows, %d classes (load %.3fs)",
+                    len(y), len(np.unique(y)), load_seconds,
+                )
+                return self._finish(report)
+
+            # Counts against the pool's queue limit like any other analysis call
+            from app.services.worker_pool import run_in_pool
+            result = asyncio.run(run_in_pool(
+                fit_health_model, X, y, settings.retrain_holdout_fraction,
+                timeout=settings.retrain_timeout,
+            ))
+
+            model = result.pop("model")
+            report.update(result)
+            report["fit_seconds"] = round(report["fit_seconds"], 3)
+            if result["candidate_accuracy"] >= result["baseline_accuracy"]:
+                publish_model(model)
+                report["status"] = "published"
+            else:
+                report["status"] = "rejected"
+            report["total_seconds"] = round(time.perf_counter() - started, 3)
+
+            logger.info(
+                "Health model retrain %s: %d rows (train %d / holdout %d), "
+                "accuracy %.3f vs live %.3f, load %.3fs, fit %.3fs, total %.3fs",
+                report["status"], report["dataset_size"], report["train_size"], report["test_size"],
+                report["candidate_accuracy"], report["baseline_accuracy"],
+                report["load_seconds"], report["fit_seconds"], report["total_seconds"],
+            )
+            return self._finish(report)
+        except Exception:
+            logger.exception("Health model retrain failed")
+            return self._finish({"status": "failed", "total_seconds": round(time.perf_counter() - started, 3)})
+        finally:
+            if own_session:
+                db.close()
+            self._running.release()
+
+    def _finish(self, report: Dict) -> Dict:
+        report["finished_at"] = datetime.utcnow()
+        self.last_report = report
+        return report
+
+
+health_model_trainer = HealthModelTrainer()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(health_model_trainer.retrain())
@@ -0,0 +1,82 @@
+"""
+Optional warm-up for the AI services.
+
+The API imports NumPy, SciPy, pandas and scikit-learn lazily, on the first
+request that needs them. `warm_up()` front-loads that work instead: it
+imports every heavy service, builds the model singletons, optionally
+bootstraps the in-memory indexes from the database and starts the analysis
+process pool. Enable it at startup with WARM_UP_ON_STARTUP=true.
+"""
+import importlib
+import logging
+import time
+from typing import Dict
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (module, singleton) pairs loaded by warm-up, cheapest first
+HEAVY_SERVICES = (
+    ("forecast_engine", "forecast_engine"),
+    ("app.services.dedup_service", "task_dedup_index"),
+    ("app.services.recommendation_service", "assignee_recommender"),
+    ("app.services.training_service", "health_model_trainer"),
+    ("app.services.ml_service", "ml_service"),
+)
+
+
+def warm_up(bootstrap_indexes: bool = False, start_pool: bool = True) -> Dict[str, float]:
+    """
+    Load heavy services now instead of on the first AI request.
+
+    Args:
+        bootstrap_indexes: Also build the duplicate, assignee and workload
+            indexes from the database
+        start_pool: Start the analysis process pool and let every child
+            load its models
+
+    Returns:
+        Seconds spent per step
+    """
+    timings: Dict[str, float] = {}
+
+    def step(name: str, action) -> None:
+        started = time.perf_counter()
+        try:
+            action()
+        except ImportError as exc:
+            # forecast_engine lives next to main.py and is only importable from there
+            logger.warning("Warm-up skipped %s: %s", name, exc)
+            return
+        timings[name] = round(time.perf_counter() - started, 3)
+
+    for module, name in HEAVY_SERVICES:
+        step(f"{module}.{name}", lambda: getattr(importlib.import_module(module), name))
+
+    if bootstrap_indexes:
+        from app.database import SessionLocal
+        from app.services.anomaly_service import workload_detector
+        from app.services.dedup_service import task_dedup_index
+        from app.services.recommendation_service import assignee_recommender
+
+        db = SessionLocal()
+        try:
+            step("task_dedup_index.bootstrap", lambda: task_dedup_index.bootstrap(db))
+            step("assignee_recommender.bootstrap", lambda: assignee_recommender.bootstrap(db))
+            step("workload_detector.bootstrap", lambda: workload_detector.bootstrap(db))
+        finally:
+            db.close()
+
+    if start_pool and settings.worker_pool_size > 0:
+        from concurrent.futures import wait
+        from app.services.worker_pool import get_pool
+
+        def start():
+            pool = get_pool()
+            # One trivial call per child so every initializer has run
+            wait([pool.submit(int) for _ in range(settings.worker_pool_size)])
+
+        step("worker_pool", start)
+
+    logger.info("Warm-up finished in %.3fs: %s", sum(timings.values()), timings)
+    return timings
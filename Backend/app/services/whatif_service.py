@@ -0,0 +1,283 @@
+"""
+What-if capacity planning over a NumPy snapshot of open work.
+
+The snapshot holds, as arrays, every developer with metrics (latest
+hours_worked), every open task (assignee, project, deadline, overdue flag,
+estimated hours) and every project (task and completed counts). It takes
+three queries to build and is reused until a write to tasks, projects, users
+or developer metrics bumps one of their table versions.
+
+A scenario never touches the database. Moves rewrite a copy of the task
+assignee array and deadline shifts offset a copy of the deadlines. Then
+loads, overload flags, overdue counts and health scores of all developers
+and projects are recomputed together with bincount, without a Python loop
+over entities.
+
+A moved task takes with it its share of its assignee's hours, split across
+their open tasks by estimated days (the reassignment engine's estimate).
+Unassigned tasks, and tasks of assignees without metrics, use the team's
+average hours per estimated day.
+"""
+import threading
+from datetime import datetime
+from typing import Dict, List, Sequence
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.models import Project, Task, TaskStatus
+from app.schemas import WhatIfDeadlineShift, WhatIfMove
+from app.services.dependency_service import DEFAULT_TASK_DAYS
+from app.services.health_service import MAX_OVERDUE_PENALTY, OVERDUE_PENALTY
+from app.services.reassignment_service import OVERLOAD_THRESHOLD, STANDARD_WEEK_HOURS, ReassignmentEngine
+from app.services.table_versions import table_versions
+
+# Writes to these tables make the snapshot stale
+SNAPSHOT_TABLES = ("tasks", "projects", "users", "developer_metrics")
+
+# Assignee id of unassigned tasks in the snapshot
+UNASSIGNED = -1
+
+SECONDS_PER_DAY = 86400
+
+
+def load_percentages(hours: np.ndarray) -> np.ndarray:
+    """load_percentage() over an array of hours"""
+    return np.where(hours > 0, hours / STANDARD_WEEK_HOURS * 100, 0.0)
+
+
+def health_scores(total: np.ndarray, completed: np.ndarray, overdue: np.ndarray) -> np.ndarray:
+    """health_score() over arrays of per-project task counts"""
+    progress = np.divide(completed * 100.0, total, out=np.full(total.shape, 100.0), where=total > 0)
+    penalty = np.minimum(overdue * OVERDUE_PENALTY, MAX_OVERDUE_PENALTY)
+    return np.where(total > 0, np.maximum(progress - penalty, 0.0), 100.0)
+
+
+class CapacitySnapshot:
+    """Developers, open tasks and project counts as arrays, sorted by id"""
+
+    def __init__(self, db: Session):
+        developers = sorted(ReassignmentEngine.load_developers(db))
+        self.developer_ids = np.fromiter((row[0] for row in developers), dtype=np.int64, count=len(developers))
+        self.developer_names = [row[1] for row in developers]
+        self.hours = np.fromiter((float(row[2] or 0.0) for row in developers), dtype=float, count=len(developers))
+
+        completed = func.sum(case((Task.status == TaskStatus.COMPLETED, 1), else_=0))
+        projects = (
+            db.query(Project.id, func.count(Task.id), completed)
+            .outerjoin(Task, Task.project_id == Project.id)
+            .group_by(Project.id)
+            .order_by(Project.id)
+            .all()
+        )
+        self.project_ids = np.array([row[0] for row in projects], dtype=np.int64)
+        self.total = np.array([row[1] for row in projects], dtype=np.int64)
+        self.completed = np.array([row[2] or 0 for row in projects], dtype=np.int64)
+
+        tasks = (
+            db.query(Task.id, Task.assigned_to, Task.project_id, Task.deadline, Task.overdue, Task.estimated_days)
+            .filter(Task.status != TaskStatus.COMPLETED)
+            .order_by(Task.id)
+            .all()
+        )
+        count = len(tasks)
+        self.task_ids = np.fromiter((row[0] for row in tasks), dtype=np.int64, count=count)
+        self.assigned_to = np.fromiter(
+            (UNASSIGNED if row[1] is None else row[1] for row in tasks), dtype=np.int64, count=count
+        )
+        self.task_project = np.searchsorted(
+            self.project_ids, np.fromiter((row[2] for row in tasks), dtype=np.int64, count=count)
+        )
+        self.deadline = np.array([row[3] for row in tasks], dtype="datetime64[s]")
+        self.overdue = np.fromiter((bool(row[4]) for row in tasks), dtype=bool, count=count)
+
+        # Hours per estimated day of each developer's open work; the extra last
+        # slot holds the team average for unassigned tasks and assignees without metrics
+        self.task_developer = self.developer_slots(self.assigned_to)
+        self.open_tasks = np.bincount(self.task_developer, minlength=self.developers + 1)
+        task_days = np.fromiter((row[5] or DEFAULT_TASK_DAYS for row in tasks), dtype=float, count=count)
+        open_days = np.bincount(self.task_developer, task_days, minlength=self.developers + 1)[:-1]
+        busy = open_days > 0
+        per_day = np.divide(self.hours, open_days, out=np.zeros_like(self.hours), where=busy)
+        average = self.hours[busy].sum() / open_days[busy].sum() if busy.any() else 0.0
+        self.task_hours = np.append(per_day, average)[self.task_developer] * task_days
+
+    @property
+    def developers(self) -> int:
+        return len(self.developer_ids)
+
+    def developer_slots(self, developer_ids: np.ndarray) -> np.ndarray:
+        """Array position of each developer id; `developers` for ids without metrics"""
+        slots = np.searchsorted(self.developer_ids, developer_ids)
+        found = slots < self.developers
+        found[found] = self.developer_ids[slots[found]] == developer_ids[found]
+        return np.where(found, slots, self.developers)
+
+    def task_positions(self, task_ids: Sequence[int]) -> np.ndarray:
+        """Array positions of open tasks, 400 for any other id"""
+        ids = np.asarray(task_ids, dtype=np.int64)
+        positions = np.searchsorted(self.task_ids, ids)
+        found = positions < len(self.task_ids)
+        found[found] = self.task_ids[positions[found]] == ids[found]
+        if not found.all():
+            missing = int(ids[~found][0])
+            raise HTTPException(status_code=400, detail=f"Task {missing} is not an open task")
+        return positions
+
+
+class WhatIfSimulator:
+    """Evaluates reassignments and deadline shifts against a cached capacity snapshot"""
+
+    def __init__(self):
+        self._snapshot = None
+        self._key = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, db: Session) -> CapacitySnapshot:
+        """The cached snapshot, rebuilt first if any of its tables changed since"""
+        key = tuple(table_versions.version(table) for table in SNAPSHOT_TABLES)
+        with self._lock:
+            if self._snapshot is None or self._key != key:
+                # Keyed by the versions read before loading: a write landing
+                # mid-build makes the next call rebuild again
+                self._snapshot = CapacitySnapshot(db)
+                self._key = key
+            return self._snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._key = None
+
+    def simulate(self, db: Session, moves: List[WhatIfMove] = (),
+                 deadline_shifts: List[WhatIfDeadlineShift] = ()) -> Dict:
+        """
+        Apply moves (in order) and deadline shifts to a copy of the snapshot.
+
+        Returns:
+            Totals before and after, plus the developers and projects whose
+            load or health the scenario changes
+        """
+        snap = self.snapshot(db)
+        assigned_to = self._apply_moves(snap, moves)
+        moved = np.flatnonzero(assigned_to != snap.assigned_to)
+
+        # Load: only moved tasks change anyone's hours or open count
+        slots = snap.developers + 1
+        before, after = snap.task_developer[moved], snap.developer_slots(assigned_to[moved])
+        hours_delta = (np.bincount(after, snap.task_hours[moved], slots)
+                       - np.bincount(before, snap.task_hours[moved], slots))[:-1]
+        count_delta = (np.bincount(after, minlength=slots) - np.bincount(before, minlength=slots))[:-1]
+        hours_after = np.maximum(snap.hours + hours_delta, 0.0)
+        open_before = snap.open_tasks[:-1]
+        open_after = open_before + count_delta
+        load_before, load_after = load_percentages(snap.hours), load_percentages(hours_after)
+        overloaded_before = load_before >= OVERLOAD_THRESHOLD
+        overloaded_after = load_after >= OVERLOAD_THRESHOLD
+
+        # Health: shifted deadlines are compared with the clock again, the
+        # others keep the overdue flag the deadline scheduler maintains
+        shift = self._shift_seconds(snap, deadline_shifts)[snap.task_project]
+        shifted = shift != 0
+        due = snap.deadline + shift.astype("timedelta64[s]")
+        now = np.datetime64(datetime.utcnow(), "s")
+        overdue_after = np.where(shifted, due <= now, snap.overdue)
+        projects = len(snap.project_ids)
+        overdue_counts_before = np.bincount(snap.task_project, snap.overdue, projects).astype(np.int64)
+        overdue_counts_after = np.bincount(snap.task_project, overdue_after, projects).astype(np.int64)
+        health_before = health_scores(snap.total, snap.completed, overdue_counts_before)
+        health_after = health_scores(snap.total, snap.completed, overdue_counts_after)
+
+        changed = np.flatnonzero((count_delta != 0) | (hours_after != snap.hours))
+        changed_projects = np.flatnonzero(overdue_counts_before != overdue_counts_after)
+        return {
+            "tasks_moved": len(moved),
+            "tasks_shifted": int((shifted & ~np.isnat(snap.deadline)).sum()),
+            "developers": snap.developers,
+            "overloaded_before": int(overloaded_before.sum()),
+            "overloaded_after": int(overloaded_after.sum()),
+            "projects": projects,
+            "changed_developers": [
+                {
+                    "developer_id": developer_id,
+                    "developer": snap.developer_names[slot],
+                    "open_tasks_before": tasks_before,
+                    "open_tasks_after": tasks_after,
+                    "hours_before": h_before,
+                    "hours_after": h_after,
+                    "load_before": l_before,
+                    "load_after": l_after,
+                    "overloaded_before": o_before,
+                    "overloaded_after": o_after,
+                }
+                for slot, developer_id, tasks_before, tasks_after, h_before, h_after,
+                l_before, l_after, o_before, o_after in zip(
+                    changed.tolist(),
+                    snap.developer_ids[changed].tolist(),
+                    open_before[changed].tolist(),
+                    open_after[changed].tolist(),
+                    np.round(snap.hours[changed], 2).tolist(),
+                    np.round(hours_after[changed], 2).tolist(),
+                    np.round(load_before[changed], 2).tolist(),
+                    np.round(load_after[changed], 2).tolist(),
+                    overloaded_before[changed].tolist(),
+                    overloaded_after[changed].tolist(),
+                )
+            ],
+            "changed_projects": [
+                {
+                    "project_id": project_id,
+                    "overdue_before": o_before,
+                    "overdue_after": o_after,
+                    "health_before": h_before,
+                    "health_after": h_after,
+                }
+                for project_id, o_before, o_after, h_before, h_after in zip(
+                    snap.project_ids[changed_projects].tolist(),
+                    overdue_counts_before[changed_projects].tolist(),
+                    overdue_counts_after[changed_projects].tolist(),
+                    np.round(health_before[changed_projects], 2).tolist(),
+                    np.round(health_after[changed_projects], 2).tolist(),
+                )
+            ],
+        }
+
+    @staticmethod
+    def _apply_moves(snap: CapacitySnapshot, moves: List[WhatIfMove]) -> np.ndarray:
+        """Assignee of every open task after the moves"""
+        assigned_to = snap.assigned_to.copy()
+        for move in moves:
+            if bool(move.task_ids) == (move.from_developer_id is not None):
+                raise HTTPException(
+                    status_code=400, detail="Each move needs either task_ids or from_developer_id"
+                )
+            target = UNASSIGNED if move.to_developer_id is None else move.to_developer_id
+            if target != UNASSIGNED and snap.developer_slots(np.array([target]))[0] == snap.developers:
+                raise HTTPException(
+                    status_code=400, detail=f"Developer {target} has no metrics to plan capacity with"
+                )
+            if move.task_ids:
+                positions = snap.task_positions(move.task_ids)
+            else:
+                positions = assigned_to == move.from_developer_id
+            assigned_to[positions] = target
+        return assigned_to
+
+    @staticmethod
+    def _shift_seconds(snap: CapacitySnapshot, deadline_shifts: List[WhatIfDeadlineShift]) -> np.ndarray:
+        """Deadline offset of every project, in whole seconds"""
+        shift = np.zeros(len(snap.project_ids), dtype=np.int64)
+        if not deadline_shifts:
+            return shift
+        ids = np.array([item.project_id for item in deadline_shifts], dtype=np.int64)
+        positions = np.searchsorted(snap.project_ids, ids)
+        found = positions < len(snap.project_ids)
+        found[found] = snap.project_ids[positions[found]] == ids[found]
+        if not found.all():
+            raise HTTPException(status_code=404, detail=f"Project {int(ids[~found][0])} not found")
+        seconds = np.array([round(item.days * SECONDS_PER_DAY) for item in deadline_shifts], dtype=np.int64)
+        np.add.at(shift, positions, seconds)
+        return shift
+
+
+whatif_simulator = WhatIfSimulator()
@@ -0,0 +1,188 @@
+"""
+Process pool for CPU-bound ML and NLP work.
+
+Route handlers await `run_in_pool(task, *args)` so forest fits and long
+summaries run outside the API worker's GIL. Each child process loads the
+models once in its initializer; tasks are module-level functions so they
+can be pickled by reference.
+
+A call holds one of the pool's slots until it finishes in the child, not
+only while a request waits for it, so calls that time out still count
+against the queue limit. If a child dies, the broken pool is replaced and
+the next call starts fresh children.
+"""
+import asyncio
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Calls submitted and not yet finished in a child (timed out or not)
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def _init_worker():
+    """Child initializer: drop inherited DB connections and pre-load models"""
+    from app.database import engine
+    engine.dispose(close=False)
+
+    from app.services.ml_service import ml_service
+    from app.services.nlp_service import nlp_service  # noqa: F401
+    if ml_service.health_model is None:
+        ml_service._train_health_model()
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """Create the shared pool on first use; None when the pool is disabled"""
+    global _pool
+    if settings.worker_pool_size <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.worker_pool_size,
+                    mp_context=multiprocessing.get_context(settings.worker_pool_start_method),
+                    initializer=_init_worker,
+                )
+    return _pool
+
+
+def _replace_broken_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a pool whose child died; get_pool() starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def in_flight() -> int:
+    """Calls submitted to the pool that have not finished yet"""
+    return _in_flight
+
+
+def _call_finished(_future: Future) -> None:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+def _submit(func: Callable, *args) -> Tuple[ProcessPoolExecutor, Future]:
+    """Submit to the pool, taking a slot that is released when the call finishes"""
+    global _in_flight
+    with _in_flight_lock:
+        if _in_flight >= settings.worker_pool_size + settings.worker_pool_max_queue:
+            raise HTTPException(status_code=503, detail="Analysis workers are busy, retry shortly")
+        _in_flight += 1
+    for attempt in range(2):
+        pool = get_pool()
+        try:
+            future = pool.submit(func, *args)
+        except BrokenProcessPool:
+            _replace_broken_pool(pool)
+            if attempt:
+                _call_finished(None)
+                raise HTTPException(status_code=503, detail="Analysis workers are restarting, retry shortly")
+            continue
+        future.add_done_callback(_call_finished)
+        return pool, future
+
+
+def shutdown_pool(wait: bool = True):
+    """Stop the pool's child processes"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool, False)
+
+
+async def run_in_pool(func: Callable, *args, timeout: Optional[float] = None):
+    """
+    Run `func(*args)` in the process pool and await the result.
+
+    Args:
+        timeout: Seconds to wait for the call (defaults to `worker_pool_timeout`)
+
+    Raises:
+        HTTPException 503: More calls are queued than `worker_pool_max_queue`
+            allows, or a child process died while running the call
+        HTTPException 504: The call exceeded its timeout
+    """
+    pool = get_pool()
+    if pool is None:
+        return await run_in_threadpool(func, *args)
+
+    pool, future = _submit(func, *args)
+    try:
+        # Timing out cancels the call if it has not started; a running call
+        # can't be interrupted and keeps its slot until it finishes
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future),
+            timeout=settings.worker_pool_timeout if timeout is None else timeout,
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Analysis timed out")
+    except BrokenProcessPool:
+        _replace_broken_pool(pool)
+        raise HTTPException(status_code=503, detail="Analysis worker stopped unexpectedly, retry shortly")
+
+
+# Tasks executed inside the pool. Anything that needs the database opens its
+# own session in the child, since sessions cannot cross process boundaries.
+
+def workload_task() -> List[Dict]:
+    from app.database import SessionLocal
+    from app.services.ml_service import ml_service
+    db = SessionLocal()
+    try:
+        return ml_service.analyze_workload(db)
+    finally:
+        db.close()
+
+
+def reassignments_task() -> List[Dict]:
+    from app.database import SessionLocal
+    from app.services.ml_service import ml_service
+    db = SessionLocal()
+    try:
+        return ml_service.suggest_task_reassignments(db)
+    finally:
+        db.close()
+
+
+def health_task(tasks: int, hours: int, bugs: int) -> Tuple[str, float]:
+    from app.services.ml_service import ml_service
+    prediction, confidence = ml_service.predict_health(tasks, hours, bugs)
+    # numpy scalars are converted before crossing the process boundary
+    return str(prediction), float(confidence)
+
+
+def summary_task(text: str, max_sentences: int) -> str:
+    from app.services.nlp_service import nlp_service
+    return nlp_service.summarize_text(text, max_sentences)
+
+
+def summary_file_task(path: str, max_sentences: int) -> Tuple[str, int]:
+    from app.services.nlp_service import nlp_service
+    with open(path, "r", encoding="utf-8", errors="replace") as source:
+        return nlp_service.summarize_stream(source, max_sentences)
+
+
+def summary_batch_task(texts: List[str], max_sentences: int,
+                       digest_sentences: int) -> Tuple[List[str], Optional[str]]:
+    from app.services.nlp_service import nlp_service
+    return nlp_service.summarize_batch(texts, max_sentences, digest_sentences)
@@ -0,0 +1,119 @@
+"""
+Helpers for the CRUD write paths.
+
+Creates and updates don't look up referenced rows first: SQLite enforces the
+foreign keys, and only when it rejects a write are the references checked to
+name the missing one in a 404. An INSERT gets its id and created_at back with
+RETURNING, an UPDATE sets every column client-side, and objects are not
+expired on commit, so the response needs no reload.
+
+A PUT may send the `version` it read; a stale one is rejected with 409
+instead of silently overwriting a concurrent change.
+
+Deleting a project or user takes a fixed number of statements however many
+tasks and metrics hang off it: children are removed or unassigned with one
+bulk statement each and logged to the change feed with one multi-row INSERT.
+The ON DELETE actions on the foreign keys cover any other delete path.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from app.models import DeveloperMetrics, Project, Task, User, log_changes, row_payload
+
+# (detail for the 404, model, id the write referenced)
+Reference = Tuple[str, Any, Optional[int]]
+
+
+def apply_update(obj, data: Dict) -> None:
+    """Set the fields of a PUT body on `obj`, checking and bumping its version"""
+    expected = data.pop("version", None)
+    if expected is not None and expected != obj.version:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Version {expected} is out of date (current version is {obj.version}); reload and retry"
+        )
+    for key, value in data.items():
+        setattr(obj, key, value)
+    obj.version = obj.version + 1
+
+
+def commit_write(db: Session, references: Iterable[Reference] = (), duplicates: Dict[str, str] = None) -> None:
+    """
+    Commit a create or update, turning constraint failures into HTTP errors.
+
+    Args:
+        references: Foreign keys the write set; the first one that does not
+            exist becomes a 404 when the database reports a violation
+        duplicates: "table.column" of a unique constraint -> detail for a 400
+
+    Raises:
+        HTTPException: 404 for a missing reference, 400 for a duplicate,
+            409 when a concurrent write changed the row first
+    """
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        message = str(exc.orig)
+        if "FOREIGN KEY" in message:
+            for detail, model, row_id in references:
+                if row_id is not None and db.get(model, row_id) is None:
+                    raise HTTPException(status_code=404, detail=detail) from None
+        for column, detail in (duplicates or {}).items():
+            if f"UNIQUE constraint failed: {column}" in message:
+                raise HTTPException(status_code=400, detail=detail) from None
+        raise
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409, detail="Changed by another request in the meantime; reload and retry"
+        ) from None
+    finally:
+        db.expire_on_commit = True
+
+
+def delete_project(db: Session, project: Project) -> List[int]:
+    """
+    Delete a project and all of its tasks, then commit.
+
+    Returns:
+        Ids of the deleted tasks
+    """
+    task_ids = db.execute(
+        delete(Task).where(Task.project_id == project.id)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    log_changes(db, "tasks", "delete", [(task_id, None) for task_id in task_ids])
+    db.delete(project)
+    db.commit()
+    return task_ids
+
+
+def delete_user(db: Session, user: User) -> Dict:
+    """
+    Delete a user, unassigning their tasks and deleting their metrics, then commit.
+
+    Returns:
+        Ids of the unassigned tasks and the number of metrics deleted
+    """
+    unassigned = db.execute(
+        update(Task).where(Task.assigned_to == user.id)
+        .values(assigned_to=None, version=Task.version + 1)
+        .returning(*Task.__table__.columns)
+        .execution_options(synchronize_session=False)
+    ).all()
+    metric_ids = db.execute(
+        delete(DeveloperMetrics).where(DeveloperMetrics.developer_id == user.id)
+        .returning(DeveloperMetrics.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    log_changes(db, "tasks", "update", [(row.id, row_payload(row)) for row in unassigned])
+    log_changes(db, "developer_metrics", "delete", [(metric_id, None) for metric_id in metric_ids])
+    db.delete(user)
+    db.commit()
+    return {"unassigned_tasks": [row.id for row in unassigned], "deleted_metrics": len(metric_ids)}
@@ -1,15 +1,18 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import enforce_foreign_keys
 
-# SQLite database URL
-DATABASE_URL = "sqlite:///./zenycon.db"
+# SQLite database URL (shared with the app package, DATABASE_URL in .env)
+DATABASE_URL = settings.database_url
 
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False}
 )
+enforce_foreign_keys(engine)
 
 # Create a SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -20,7 +23,17 @@ Base = declarative_base()
 # ✅ Initialize the database and create tables
 def init_db():
     import models  # ensure models are imported before creating tables
+    from app.models import ChangeLog, Job, TaskDependency, upgrade_foreign_keys, upgrade_schema
     Base.metadata.create_all(bind=engine)
+    # Change feed outbox and background jobs, shared by both API stacks
+    ChangeLog.__table__.create(bind=engine, checkfirst=True)
+    Job.__table__.create(bind=engine, checkfirst=True)
+    TaskDependency.__table__.create(bind=engine, checkfirst=True)
+    # Columns added since the database was created
+    with engine.begin() as connection:
+        upgrade_schema(connection)
+    # ON DELETE actions added since the database was created
+    upgrade_foreign_keys(engine)
     print("✅ Database initialized and tables created successfully!")
 
 # Dependency for FastAPI routes
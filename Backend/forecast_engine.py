@@ -0,0 +1,115 @@
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+
+class DeliveryForecaster:
+    """
+    Monte-Carlo delivery forecasts from historical task throughput.
+
+    Task completions are modelled as a Poisson process whose daily rate is
+    uncertain: each simulation draws a rate from the Gamma posterior given
+    the completions observed in the history window, then draws the time to
+    finish the remaining tasks from Gamma(remaining, 1 / rate). Both draws
+    are vectorized over every (project, simulation) pair, so a whole
+    portfolio is forecast in one NumPy pass.
+
+    A project with no open tasks is done: it finishes now, on time. One with
+    open tasks but no completions in the history window is forecast from the
+    prior alone and labelled as such.
+    """
+
+    def __init__(self, simulations: int = 5000, history_days: int = 56,
+                 prior_completions: float = 1.0, prior_days: float = 14.0, seed: int = 42):
+        self.simulations = simulations
+        self.history_days = history_days
+        # Weak prior: roughly one task per two weeks until history says otherwise
+        self.prior_completions = prior_completions
+        self.prior_days = prior_days
+        self.seed = seed
+
+    def simulate(self, remaining: Sequence[int], completed_recently: Sequence[int]) -> np.ndarray:
+        """
+        Simulate days until all remaining tasks are done.
+
+        Args:
+            remaining: Open task count per project
+            completed_recently: Tasks completed per project within the history window
+
+        Returns:
+            Array of shape (projects, simulations) with days to completion
+        """
+        remaining = np.asarray(remaining, dtype=np.float64)
+        completed = np.asarray(completed_recently, dtype=np.float64)
+        rng = np.random.default_rng(self.seed)
+        size = (remaining.shape[0], self.simulations)
+
+        shape = (completed + self.prior_completions)[:, None]
+        rate_scale = 1.0 / (self.history_days + self.prior_days)
+        rates = rng.gamma(shape, rate_scale, size=size)
+
+        days = np.zeros(size)
+        active = remaining > 0
+        if active.any():
+            days[active] = rng.gamma(remaining[active, None], 1.0 / rates[active])
+        return days
+
+    def forecast(self, projects: List[Dict], now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Forecast delivery for many projects at once.
+
+        Args:
+            projects: Dicts with project_id, remaining, completed_recently and end_date
+
+        Returns:
+            One forecast per project with on-time probability and P50/P90 finish dates
+        """
+        if not projects:
+            return []
+        now = now or datetime.utcnow()
+
+        days = self.simulate(
+            [p["remaining"] for p in projects],
+            [p["completed_recently"] for p in projects],
+        )
+        p50, p90 = np.percentile(days, [50, 90], axis=1)
+
+        deadlines = np.array([
+            (p["end_date"].replace(tzinfo=None) - now).total_seconds() / 86400 if p["end_date"] else np.inf
+            for p in projects
+        ])
+        on_time = (days <= deadlines[:, None]).mean(axis=1)
+
+        results = []
+        for i, project in enumerate(projects):
+            has_deadline = project["end_date"] is not None
+            done = project["remaining"] == 0
+            probability = (1.0 if done else float(on_time[i])) if has_deadline else None
+            results.append({
+                "project_id": project["project_id"],
+                "remaining_tasks": int(project["remaining"]),
+                "daily_throughput": round(
+                    project["completed_recently"] / self.history_days, 3
+                ),
+                "on_time_probability": round(probability, 3) if has_deadline else None,
+                "p50_finish": now + timedelta(days=float(p50[i])),
+                "p90_finish": now + timedelta(days=float(p90[i])),
+                "prediction": self.label(probability, done or project["completed_recently"] > 0),
+            })
+        return results
+
+    @staticmethod
+    def label(on_time_probability: Optional[float], has_throughput: bool = True) -> str:
+        """Map an on-time probability to the dashboard's status label"""
+        if not has_throughput:
+            # Nothing completed recently: the finish dates are the prior's guess
+            return "No Recent Progress ⏸️"
+        if on_time_probability is None or on_time_probability >= 0.8:
+            return "On Track 🚀"
+        if on_time_probability >= 0.5:
+            return "Slight Delay ⚠️"
+        return "Critical 🚨"
+
+
+# Singleton instance
+forecast_engine = DeliveryForecaster()
@@ -2,8 +2,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 from fastapi.security import HTTPBearer
+import threading
 from database import init_db
 from routes import projects, workload, auth
+from app.routers import (
+    aggregate, ai, changes, jobs, metrics, search, tasks, users,
+    projects as api_projects,
+)
+from app.config import settings
+from app.services.change_feed import change_follower
+from app.services.deadline_scheduler import deadline_scheduler
+from app.services.health_service import health_recomputer
+from app.services.job_queue import job_queue
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -19,6 +29,28 @@ security = HTTPBearer()
 @app.on_event("startup")
 def on_startup():
     init_db()
+    # Replays writes committed by other processes (uvicorn --workers, serve.py,
+    # job runners); with none it only polls change_log for its highest seq
+    change_follower.start()
+    if settings.warm_up_on_startup:
+        # Heavy libraries and models load in the background; /health answers meanwhile
+        from app.services.warmup import warm_up
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    # Background jobs queued by any process (health recomputes, retraining, imports)
+    job_queue.start()
+    # Stored health scores follow task writes in debounced batches
+    health_recomputer.start()
+    # Keeps overdue counts (and health) current as deadlines pass
+    if settings.deadline_scheduler_enabled:
+        deadline_scheduler.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    deadline_scheduler.stop()
+    health_recomputer.stop()
+    job_queue.stop()
+    change_follower.stop()
 
 # Configure CORS
 app.add_middleware(
@@ -41,6 +73,17 @@ app.include_router(projects.router)
 app.include_router(workload.router)
 app.include_router(auth.router)
 
+# REST API under /api (app/routers)
+app.include_router(users.router)
+app.include_router(api_projects.router)
+app.include_router(tasks.router)
+app.include_router(metrics.router)
+app.include_router(ai.router)
+app.include_router(search.router)
+app.include_router(changes.router)
+app.include_router(jobs.router)
+app.include_router(aggregate.router)
+
 @app.get("/")
 def root():
     return {
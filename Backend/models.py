@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Float, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
 from database import Base
+from app.models import UTCDateTime
 
 
 class UserRole(str, enum.Enum):
@@ -30,10 +31,12 @@ class User(Base):
     password = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
-    tasks = relationship("Task", back_populates="assigned_user")
-    metrics = relationship("DeveloperMetrics", back_populates="developer")
+    tasks = relationship("Task", back_populates="assigned_user", passive_deletes=True)
+    metrics = relationship("DeveloperMetrics", back_populates="developer",
+                           cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Project(Base):
@@ -44,12 +47,14 @@ class Project(Base):
     client_name = Column(String, nullable=False)
     start_date = Column(DateTime(timezone=True), nullable=False)
     end_date = Column(DateTime(timezone=True), nullable=True)
-    health_score = Column(Float, default=0.0)  # 0-100 score
+    health_score = Column(Float, default=100.0)  # 0-100 score; a project without tasks scores 100
+    overdue_tasks = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Task(Base):
@@ -58,11 +63,15 @@ class Task(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     status = Column(SQLEnum(TaskStatus), default=TaskStatus.TODO)
-    deadline = Column(DateTime(timezone=True), nullable=True)
-    assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    deadline = Column(UTCDateTime, nullable=True, index=True)
+    estimated_days = Column(Float, nullable=True)
+    overdue = Column(Boolean, nullable=False, default=False, server_default="0")
+    assigned_to = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    import_job_id = Column(Integer, nullable=True)
     
     # Relationships
     assigned_user = relationship("User", back_populates="tasks")
@@ -73,12 +82,13 @@ class DeveloperMetrics(Base):
     __tablename__ = "developer_metrics"
     
     id = Column(Integer, primary_key=True, index=True)
-    developer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    developer_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     developer_name = Column(String, nullable=False, index=True)
     tasks_completed = Column(Integer, default=0)
     hours_worked = Column(Float, default=0.0)
     bugs_reported = Column(Integer, default=0)
     recorded_at = Column(DateTime(timezone=True), server_default=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
     developer = relationship("User", back_populates="metrics")
@@ -5,6 +5,7 @@ from models import User
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
+from app.services.response_cache import response_cache
 
 router = APIRouter(
     prefix="/auth",
@@ -20,7 +21,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Utility functions
 def verify_password(plain, hashed):
-    return pwd_context.verify(plain, hashed)
+    # Users created through /api/users have no password and cannot log in
+    return bool(hashed) and pwd_context.verify(plain, hashed)
 
 def get_password_hash(password):  # ✅ renamed for clarity
     return pwd_context.hash(password)
@@ -43,6 +45,7 @@ def register_user(name: str, email: str, password: str, role: str, db: Session =
     user = User(name=name, email=email, password=hashed, role=role)
     db.add(user)
     db.commit()
+    response_cache.invalidate("users")
     db.refresh(user)
 
     return {"message": "User registered successfully", "user": user.name, "role": user.role}
@@ -1,17 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 from database import get_db
 from models import Project, Task, TaskStatus, User
-from datetime import datetime
+from datetime import datetime, timedelta
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-import random
+from app.services.lazy import lazy_service
+from app.services.table_versions import conditional_get
+from app.services.response_cache import response_cache, project_tag
+from app.services.writes import commit_write
 
 router = APIRouter(
     prefix="/projects",
     tags=["Projects"]
 )
 
+# NumPy/SciPy-backed engines are imported on first use, not at startup
+forecast_engine = lazy_service("forecast_engine", "forecast_engine")
+assignee_recommender = lazy_service("app.services.recommendation_service", "assignee_recommender")
+
 # 🔐 Security setup
 SECRET_KEY = "zenycon-secret-key"
 ALGORITHM = "HS256"
@@ -31,20 +39,33 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
 
-# 🧮 Simple project health calculation
-def calculate_health_score(project_id: int, db: Session):
-    tasks = db.query(Task).filter(Task.project_id == project_id).all()
-    if not tasks:
-        return 100.0
-
-    completed = sum(1 for t in tasks if t.status == TaskStatus.COMPLETED)
-    total = len(tasks)
-    progress = (completed / total) * 100
-
-    overdue = sum(1 for t in tasks if t.deadline and t.deadline < datetime.utcnow() and t.status != TaskStatus.COMPLETED)
-    overdue_penalty = min(overdue * 5, 30)  # limit penalty
+# 🔮 Forecast inputs: open and recently completed task counts per project in one query
+def load_forecast_inputs(db: Session, project_id: int = None):
+    window_start = datetime.utcnow() - timedelta(days=forecast_engine.history_days)
+    finished_at = func.coalesce(Task.updated_at, Task.created_at)
+    remaining = func.sum(case((Task.status != TaskStatus.COMPLETED, 1), else_=0))
+    completed_recently = func.sum(case(
+        ((Task.status == TaskStatus.COMPLETED) & (finished_at >= window_start), 1),
+        else_=0
+    ))
+
+    query = (
+        db.query(Project.id, Project.end_date, remaining, completed_recently)
+        .outerjoin(Task, Task.project_id == Project.id)
+        .group_by(Project.id, Project.end_date)
+    )
+    if project_id is not None:
+        query = query.filter(Project.id == project_id)
 
-    return max(0.0, progress - overdue_penalty)
+    return [
+        {
+            "project_id": pid,
+            "end_date": end_date,
+            "remaining": remaining or 0,
+            "completed_recently": recent or 0
+        }
+        for pid, end_date, remaining, recent in query.all()
+    ]
 
 
 # 📦 Create a new project (🔒 Protected)
@@ -73,13 +94,25 @@ def create_project(
 # 🧾 List all projects (🔒 Protected)
 @router.get("/all")
 def list_projects(
+    current_user: dict = Depends(get_current_user),
+    _etag: str = Depends(conditional_get("projects")),
+    db: Session = Depends(get_db)
+):
+    """
+    All projects with their stored health scores (rescored shortly after each task
+    write); 304 on If-None-Match while projects are unchanged
+    """
+    return db.query(Project).all()
+
+
+# 🔮 Portfolio delivery forecast (🔒 Protected)
+@router.get("/forecast")
+def portfolio_forecast(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    projects = db.query(Project).all()
-    for project in projects:
-        project.health_score = calculate_health_score(project.id, db)
-    return projects
+    """Monte-Carlo delivery forecast for every project in one vectorized pass"""
+    return {"forecasts": forecast_engine.forecast(load_forecast_inputs(db))}
 
 
 # 🧩 Add task to project (🔒 Protected)
@@ -92,10 +125,6 @@ def add_task(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
     task = Task(
         title=title,
         project_id=project_id,
@@ -104,12 +133,21 @@ def add_task(
         status=TaskStatus.TODO
     )
     db.add(task)
-    db.commit()
+    # The foreign keys reject a missing project or user
+    commit_write(db, [
+        ("Project not found", Project, project_id),
+        ("Assigned user not found", User, assigned_to),
+    ])
+    response_cache.invalidate("tasks", project_tag(project_id))
     db.refresh(task)
-    return {
+    response = {
         "message": f"🧠 Task added successfully by {current_user['email']}!",
         "task": task
     }
+    if assigned_to is None:
+        # Unassigned tasks come back with suggested owners for the manager to pick from
+        response["recommended_assignees"] = assignee_recommender.recommend(db, title, k=3)
+    return response
 
 
 # 📊 Project analytics (🔒 Protected)
@@ -119,15 +157,27 @@ def project_analytics(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
+    """Cached until the project or one of its tasks changes (or the TTL expires)"""
+    return response_cache.get_or_compute(
+        ("project_analytics", project_id),
+        lambda: compute_project_analytics(project_id, db),
+        tags=(project_tag(project_id),)
+    )
+
+
+def compute_project_analytics(project_id: int, db: Session):
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    health_score = calculate_health_score(project_id, db)
+    health_score = project.health_score if project.health_score is not None else 100.0
     tasks = db.query(Task).filter(Task.project_id == project_id).all()
     completed = sum(1 for t in tasks if t.status == TaskStatus.COMPLETED)
     in_progress = sum(1 for t in tasks if t.status == TaskStatus.IN_PROGRESS)
     blocked = sum(1 for t in tasks if t.status == TaskStatus.BLOCKED)
+    forecast = forecast_engine.forecast(load_forecast_inputs(db, project_id))[0]
+    # When the project or one of its tasks last changed, so a cached body stays true
+    last_updated = max(row.updated_at or row.created_at for row in [project, *tasks])
 
     return {
         "project_name": project.name,
@@ -137,8 +187,12 @@ def project_analytics(
         "completed": completed,
         "in_progress": in_progress,
         "blocked": blocked,
-        "prediction": random.choice([
-            "On Track 🚀", "Slight Delay ⚠️", "Critical 🚨"
-        ]),
-        "last_updated": datetime.utcnow()
+        "prediction": forecast["prediction"],
+        "forecast": {
+            "on_time_probability": forecast["on_time_probability"],
+            "p50_finish": forecast["p50_finish"],
+            "p90_finish": forecast["p90_finish"],
+            "daily_throughput": forecast["daily_throughput"]
+        },
+        "last_updated": last_updated
     }
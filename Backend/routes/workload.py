@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import User, Task, TaskStatus
 import random
+from app.services.response_cache import response_cache
 
 router = APIRouter(
     prefix="/workload",
@@ -22,6 +23,15 @@ def analyze_workload(tasks):
 
 @router.get("/analyze")
 def analyze_all_workloads(db: Session = Depends(get_db)):
+    # Cached until users or tasks change (or the TTL expires)
+    return response_cache.get_or_compute(
+        "workload_analyze",
+        lambda: compute_workloads(db),
+        tags=("users", "tasks")
+    )
+
+
+def compute_workloads(db: Session):
     users = db.query(User).all()
     results = []
 
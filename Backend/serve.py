@@ -0,0 +1,199 @@
+"""
+Production launcher: pre-forked uvicorn workers sharing one copy of the models.
+
+`uvicorn main:app --workers N` starts N fresh interpreters, and each one
+imports NumPy, pandas and scikit-learn and trains the health model on its
+own. This launcher does that once in the master process, freezes the garbage
+collector and then forks the workers, so those pages stay shared
+copy-on-write between them.
+
+With --bootstrap the master also builds the duplicate, assignee and workload
+indexes. Each worker then replays the change log from the seq the indexes
+were built at, so writes made before it started still reach its copy. By
+default the workers build those indexes on first use.
+
+Usage:
+    python serve.py --workers 8 [--host 0.0.0.0] [--port 8000] [--app main:app]
+                    [--bootstrap] [--pool-size 0] [--report-interval 300]
+
+Memory per worker (RSS, shared, private and PSS) is logged a few seconds
+after startup and then every --report-interval seconds. PSS splits shared
+pages between the processes using them, so the PSS total is what the whole
+server really costs. Needs fork (Linux/macOS); the report reads /proc.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger("serve")
+
+
+def read_memory(pid: int) -> Optional[Dict[str, int]]:
+    """RSS, shared, private and PSS of a process in kB (None if unavailable)"""
+    fields: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as rollup:
+            for line in rollup:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "pss": fields.get("Pss", 0),
+    }
+
+
+def log_memory(workers: Dict[int, int]) -> None:
+    """Log one line per process plus the PSS total"""
+    processes = [("master", os.getpid())]
+    processes += [(f"worker {slot}", pid) for pid, slot in sorted(workers.items(), key=lambda item: item[1])]
+    total_pss = 0
+    for name, pid in processes:
+        memory = read_memory(pid)
+        if memory is None:
+            continue
+        total_pss += memory["pss"]
+        logger.info(
+            "%-10s pid %-7d rss %7.1f MB  shared %7.1f MB  private %7.1f MB  pss %7.1f MB",
+            name, pid, memory["rss"] / 1024, memory["shared"] / 1024,
+            memory["private"] / 1024, memory["pss"] / 1024,
+        )
+    if total_pss:
+        logger.info("total pss %.1f MB across %d processes", total_pss / 1024, len(processes))
+
+
+def load_in_master(config, bootstrap: bool, pool_size: int) -> None:
+    """Import the app and build every model and index before forking"""
+    from app.config import settings
+    from app.services.warmup import warm_up
+
+    # The forked workers are the parallelism; a process pool per worker would
+    # multiply processes (and, with spawn, reload the models in each child)
+    settings.worker_pool_size = pool_size
+
+    gc.disable()
+    config.load()
+    # Create and upgrade the tables once, before any worker reads them
+    import database
+    database.init_db()
+    if bootstrap:
+        from app.services.change_feed import change_follower, latest_seq
+        change_follower.start_seq = latest_seq()
+    warm_up(bootstrap_indexes=bootstrap, start_pool=False)
+
+    # Workers must open their own database connections
+    from app.database import engine
+    database.engine.dispose()
+    engine.dispose()
+
+    # Move everything loaded so far out of the collector's reach, so collections
+    # in the workers never write to (and un-share) those objects' pages
+    gc.collect()
+    gc.freeze()
+    gc.enable()
+
+
+def spawn_worker(config, sock, slot: int) -> int:
+    """Fork one uvicorn worker serving on the shared socket; returns its pid"""
+    pid = os.fork()
+    if pid:
+        return pid
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    code = 0
+    try:
+        import uvicorn
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:
+        logger.exception("Worker %d crashed", slot)
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="main:app", help="ASGI app (default: main:app)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--bootstrap", action="store_true",
+                        help="build the duplicate/assignee/workload indexes before forking")
+    parser.add_argument("--pool-size", type=int, default=0,
+                        help="analysis process pool per worker (default 0: run in the worker)")
+    parser.add_argument("--report-delay", type=float, default=5.0,
+                        help="seconds after startup before the first memory report")
+    parser.add_argument("--report-interval", type=float, default=300.0,
+                        help="seconds between memory reports (0 reports once)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if not hasattr(os, "fork"):
+        logger.error("Pre-forking needs os.fork; use `uvicorn main:app` on this platform")
+        return 1
+
+    import uvicorn
+    config = uvicorn.Config(args.app, host=args.host, port=args.port, log_level=args.log_level)
+
+    started = time.perf_counter()
+    load_in_master(config, bootstrap=args.bootstrap, pool_size=args.pool_size)
+    logger.info("Loaded %s and its models in %.1fs", args.app, time.perf_counter() - started)
+
+    sock = config.bind_socket()
+    workers: Dict[int, int] = {}
+    for slot in range(args.workers):
+        workers[spawn_worker(config, sock, slot)] = slot
+    logger.info("Serving on %s:%d with %d workers", args.host, args.port, args.workers)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        if not stopping:
+            stopping = True
+            for pid in list(workers):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    next_report = time.monotonic() + args.report_delay
+    while workers:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            slot = workers.pop(pid)
+            if not stopping:
+                code = os.waitstatus_to_exitcode(status)
+                exited = f"signal {-code}" if code < 0 else f"code {code}"
+                logger.warning("Worker %d (pid %d) exited with %s; restarting", slot, pid, exited)
+                time.sleep(1)
+                workers[spawn_worker(config, sock, slot)] = slot
+            continue
+        if not stopping and time.monotonic() >= next_report:
+            log_memory(workers)
+            next_report = time.monotonic() + args.report_interval if args.report_interval > 0 else float("inf")
+        time.sleep(0.2)
+
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Cold-start benchmark for the API.
+
+Measures:
+  1. Import cost of the app with `python -X importtime -c "import main"`,
+     including which heavy ML libraries got imported along the way.
+  2. Wall time from launching `uvicorn main:app` to the first 200 from /health.
+
+Usage:
+    python startup_benchmark.py [--module main] [--runs 3] [--port 8765] [--top 10]
+
+Set WARM_UP_ON_STARTUP=true in the environment to compare with warm-up enabled
+(warm-up runs in the background, so it should not delay /health).
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("numpy", "scipy", "pandas", "sklearn")
+
+
+def measure_imports(module: str) -> Tuple[float, List[Tuple[float, str]], List[str]]:
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        (total seconds, [(cumulative seconds, module)] sorted desc, heavy modules loaded)
+    """
+    probe = (
+        f"import {module}, sys, json; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    timings = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        seconds = int(cumulative) / 1e6
+        timings.append((seconds, name))
+        if name == module:
+            total = seconds
+    timings.sort(reverse=True)
+    heavy = json.loads(result.stdout.strip().splitlines()[-1])
+    return total, timings, heavy
+
+
+def _port_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex(("127.0.0.1", port)) != 0
+
+
+def measure_first_health(app: str, port: int, timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn until /health first answers 200"""
+    if not _port_free(port):
+        raise RuntimeError(f"port {port} is already in use")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/health"
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited: {server.stderr.read().decode(errors='replace')[-500:]}")
+            try:
+                with urllib.request.urlopen(url, timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"/health did not answer within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--app", default="main:app", help="ASGI app for uvicorn (default: main:app)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    import_runs: List[float] = []
+    for _ in range(args.runs):
+        total, timings, heavy = measure_imports(args.module)
+        import_runs.append(total)
+    print(f"import {args.module}: median {statistics.median(import_runs) * 1000:.0f} ms over {args.runs} runs")
+    print(f"heavy ML modules imported: {', '.join(heavy) if heavy else 'none'}")
+    print("slowest imports (cumulative, last run):")
+    for seconds, name in timings[:args.top]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    health_runs: List[float] = []
+    for _ in range(args.runs):
+        try:
+            health_runs.append(measure_first_health(args.app, args.port))
+        except (RuntimeError, TimeoutError) as exc:
+            print(f"first /health: failed ({exc})")
+            return 1
+    print(f"first /health: median {statistics.median(health_runs) * 1000:.0f} ms over {args.runs} runs "
+          f"(min {min(health_runs) * 1000:.0f} ms, max {max(health_runs) * 1000:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
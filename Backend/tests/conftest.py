@@ -0,0 +1,100 @@
+"""
+Shared fixtures.
+
+The suite runs against a throwaway SQLite file. DATABASE_URL is set before the
+app is imported, and every test starts from a database created by init_db,
+the same path the server's startup hook takes.
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+_DB_DIR = tempfile.mkdtemp(prefix="zenycon-tests-")
+DB_PATH = os.path.join(_DB_DIR, "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+# Pool work runs on a thread; the tests never fork or spawn
+os.environ["WORKER_POOL_SIZE"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def reset_database() -> None:
+    """Drop the test database and create it again with init_db"""
+    import database
+    from app.database import engine
+    from app.services.anomaly_service import workload_detector
+    from app.services.dedup_service import task_dedup_index
+    from app.services.dependency_service import dependency_graphs
+    from app.services.recommendation_service import assignee_recommender
+    from app.services.response_cache import response_cache
+    from app.services.whatif_service import whatif_simulator
+
+    database.engine.dispose()
+    engine.dispose()
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    database.init_db()
+    response_cache.clear()
+    dependency_graphs.clear()
+    task_dedup_index.clear()
+    assignee_recommender.clear()
+    workload_detector.clear()
+    whatif_simulator.clear()
+
+
+@pytest.fixture
+def client():
+    """API client over main:app on an empty database (startup hooks are not run)"""
+    import main
+
+    reset_database()
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def db(client):
+    """Session on the same database as `client`"""
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def create_user(client, name: str, role: str = "developer") -> dict:
+    email = f"{name.lower().replace(' ', '.')}@example.com"
+    response = client.post("/api/users/", json={"name": name, "role": role, "email": email})
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def create_project(client, name: str = "Apollo", client_name: str = "Acme") -> dict:
+    response = client.post("/api/projects/", json={
+        "name": name, "client_name": client_name, "start_date": datetime.utcnow().isoformat(),
+    })
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def create_task(client, project_id: int, title: str = "Task", **fields) -> dict:
+    body = {"title": title, "project_id": project_id, **fields}
+    if isinstance(body.get("deadline"), datetime):
+        body["deadline"] = body["deadline"].isoformat()
+    response = client.post("/api/tasks/", json=body)
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def record_hours(client, user: dict, hours: float) -> dict:
+    response = client.post("/api/metrics/", json={
+        "developer_id": user["id"], "developer_name": user["name"],
+        "tasks_completed": 1, "hours_worked": hours, "bugs_reported": 0,
+    })
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def days_from_now(days: float) -> datetime:
+    return datetime.utcnow() + timedelta(days=days)
@@ -0,0 +1,82 @@
+from datetime import datetime
+import pytest
+from conftest import create_project, create_task, create_user, days_from_now, record_hours
+
+
+def aggregate(client, **params) -> dict:
+    response = client.get("/api/aggregate/", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture
+def board(client):
+    ada, bob = create_user(client, "Ada"), create_user(client, "Bob")
+    record_hours(client, ada, 30)
+    record_hours(client, ada, 50)
+    record_hours(client, bob, 20)
+    apollo = create_project(client, "Apollo", "Acme")
+    gemini = create_project(client, "Gemini", "Globex")
+    create_task(client, apollo["id"], deadline=days_from_now(-1), assigned_to=ada["id"])
+    create_task(client, apollo["id"], deadline=days_from_now(-1), status="completed", assigned_to=ada["id"])
+    create_task(client, apollo["id"], deadline=datetime(2030, 1, 9), assigned_to=bob["id"])
+    create_task(client, gemini["id"], deadline=datetime(2030, 1, 13))
+    return {"ada": ada, "bob": bob, "apollo": apollo, "gemini": gemini}
+
+
+def test_totals_without_group_by(client, board):
+    result = aggregate(client, measures="count,overdue_count")
+
+    assert result["rows"] == 1
+    assert result["columns"] == {"count": [4], "overdue_count": [1]}
+
+
+def test_group_by_project_and_status(client, board):
+    result = aggregate(client, group_by=["project", "status"], measures=["count", "overdue_count"])
+
+    assert result["group_by"] == ["project", "status"]
+    assert result["columns"] == {
+        "project": [board["apollo"]["id"], board["apollo"]["id"], board["gemini"]["id"]],
+        "status": ["completed", "todo", "todo"],
+        "count": [1, 2, 1],
+        "overdue_count": [0, 1, 0],
+    }
+
+
+def test_client_name_and_deadline_week(client, board):
+    by_client = aggregate(client, group_by="client_name")
+    by_week = aggregate(client, group_by="deadline_week", project_id=board["gemini"]["id"])
+
+    assert by_client["columns"] == {"client_name": ["Acme", "Globex"], "count": [3, 1]}
+    # Sunday 2030-01-13 belongs to the week starting Monday 2030-01-07
+    assert by_week["columns"] == {"deadline_week": ["2030-01-07"], "count": [1]}
+
+
+def test_avg_hours_weighted_by_tasks(client, board):
+    result = aggregate(client, group_by="assignee", measures="avg_hours")
+
+    assert result["columns"] == {
+        "assignee": [None, board["ada"]["id"], board["bob"]["id"]],
+        "avg_hours": [None, 40.0, 20.0],
+    }
+    # Two of Ada's tasks (40h) and one of Bob's (20h)
+    assert aggregate(client, measures="avg_hours", project_id=board["apollo"]["id"])["columns"] == {
+        "avg_hours": [33.33]
+    }
+
+
+def test_task_filters_apply(client, board):
+    result = aggregate(client, group_by="project", status="todo", overdue="false")
+
+    assert result["columns"] == {"project": [board["apollo"]["id"], board["gemini"]["id"]], "count": [1, 1]}
+
+
+@pytest.mark.parametrize("params", [
+    {"group_by": "priority"},
+    {"group_by": "project,project"},
+    {"group_by": "project,status,assignee,client_name"},
+    {"measures": "median"},
+    {"measures": ""},
+])
+def test_bad_parameters_are_400(client, params):
+    assert client.get("/api/aggregate/", params=params).status_code == 400
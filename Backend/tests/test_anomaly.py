@@ -0,0 +1,60 @@
+from app.services.anomaly_service import workload_detector
+from app.services.change_feed import apply_changes
+from conftest import create_user, record_hours
+
+
+def alerts(client, overloaded_only: bool = False) -> dict:
+    response = client.get("/api/workload/alerts", params={"overloaded_only": overloaded_only})
+    assert response.status_code == 200, response.text
+    return {alert["developer_id"]: alert for alert in response.json()}
+
+
+def metric_insert(metric_id: int, user: dict, hours: float) -> dict:
+    payload = {"id": metric_id, "developer_id": user["id"], "developer_name": user["name"],
+               "hours_worked": hours, "tasks_completed": 1, "bugs_reported": 0}
+    return {"seq": metric_id, "table": "developer_metrics", "row_id": metric_id, "op": "insert", "payload": payload}
+
+
+def test_stored_metrics_are_replayed_once(client):
+    ada = create_user(client, "Ada")
+    for hours in (30, 32, 31):
+        record_hours(client, ada, hours)
+
+    assert alerts(client)[ada["id"]]["observations"] == 3
+
+    record_hours(client, ada, 50)
+    alert = alerts(client, overloaded_only=True)[ada["id"]]
+    assert (alert["observations"], alert["hours_worked"], alert["status"]) == (4, 50.0, "Overloaded")
+
+
+def test_rows_the_replay_read_are_not_counted_again(client, db):
+    ada = create_user(client, "Ada")
+    record_hours(client, ada, 30)
+    second = record_hours(client, ada, 32)
+    workload_detector.bootstrap(db)
+
+    # A commit that landed before the replay, delivered after it
+    apply_changes([metric_insert(second["id"], ada, 32)])
+    assert alerts(client)[ada["id"]]["observations"] == 2
+
+    apply_changes([metric_insert(second["id"] + 1, ada, 34)])
+    assert alerts(client)[ada["id"]]["observations"] == 3
+
+
+def test_metrics_from_other_processes_are_observed(client, db):
+    ada = create_user(client, "Ada")
+    workload_detector.bootstrap(db)
+
+    apply_changes([metric_insert(99, ada, 55)])
+
+    assert alerts(client, overloaded_only=True)[ada["id"]]["hours_worked"] == 55.0
+
+
+def test_deleted_user_is_no_longer_flagged(client):
+    ada = create_user(client, "Ada")
+    record_hours(client, ada, 55)
+    assert ada["id"] in alerts(client, overloaded_only=True)
+
+    client.delete(f"/api/users/{ada['id']}")
+
+    assert alerts(client) == {}
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+from conftest import create_project, create_task, create_user
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_main_app_serves_api_routers(client):
+    paths = set(client.get("/openapi.json").json()["paths"])
+
+    for path in ("/api/users/", "/api/tasks/", "/api/search/", "/api/aggregate/", "/api/jobs/",
+                 "/api/changes/", "/api/projects/{project_id}/critical-path", "/api/workload/what-if",
+                 "/projects/all", "/workload/analyze"):
+        assert path in paths
+
+
+def test_importing_main_loads_no_ml_libraries():
+    # A fresh interpreter: the test session has already imported them
+    script = (
+        "import sys, main\n"
+        "print(','.join(m for m in ('numpy', 'pandas', 'sklearn', 'scipy') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=os.environ.copy(),
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_api_user_on_init_db_database_cannot_log_in(client):
+    user = create_user(client, "Erin Api", role="manager")
+
+    assert client.get(f"/api/users/{user['id']}").json()["email"] == "erin.api@example.com"
+    response = client.post("/auth/login", params={"email": user["email"], "password": ""})
+    assert response.status_code == 401
+
+
+def test_cached_analytics_report_when_the_data_changed(client):
+    from routes.auth import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'pm@example.com', 'role': 'manager'})}"}
+    project = create_project(client)
+    task = create_task(client, project["id"])
+    path = f"/projects/{project['id']}/analytics"
+
+    first = client.get(path, headers=headers).json()
+    assert first["last_updated"] == task["created_at"]
+    assert client.get(path, headers=headers).json() == first
+
+    updated = client.put(f"/api/tasks/{task['id']}", json={"title": "Renamed"}).json()
+    assert client.get(path, headers=headers).json()["last_updated"] == updated["updated_at"]
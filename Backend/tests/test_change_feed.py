@@ -0,0 +1,183 @@
+import json
+import sqlite3
+import threading
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Task
+from app.services.change_feed import ChangeLogFollower, change_broadcaster, prune_change_log
+from app.services.job_queue import job_queue
+from conftest import DB_PATH, create_project, create_task
+
+
+def commit_from_another_process(sql: str, *params) -> None:
+    """Write with a connection SQLAlchemy knows nothing about, like a sibling worker"""
+    with sqlite3.connect(DB_PATH) as connection:
+        connection.execute(sql, params)
+
+
+def test_follower_replays_changes_from_other_processes(client):
+    project = create_project(client)
+    task = create_task(client, project["id"])
+    follower = ChangeLogFollower()
+    follower.last_seq = client.get("/api/changes/").json()["last_seq"]
+    etag = client.get("/api/tasks/").headers["ETag"]
+
+    commit_from_another_process("UPDATE tasks SET title = 'Renamed' WHERE id = ?", task["id"])
+    commit_from_another_process(
+        "INSERT INTO change_log (table_name, row_id, op, payload, created_at) "
+        "VALUES ('tasks', ?, 'update', ?, CURRENT_TIMESTAMP)",
+        task["id"], f'{{"id": {task["id"]}, "project_id": {project["id"]}, "title": "Renamed"}}',
+    )
+    assert client.get("/api/tasks/", headers={"If-None-Match": etag}).status_code == 304
+
+    assert follower.poll() == 1
+    assert follower.poll() == 0
+
+    response = client.get("/api/tasks/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Renamed"
+
+
+def test_follower_skips_changes_this_process_committed(client):
+    from app.services.change_feed import change_follower
+
+    change_follower.start()
+    try:
+        create_project(client)
+        etag = client.get("/api/projects/").headers["ETag"]
+
+        assert change_follower.poll() == 0
+        assert client.get("/api/projects/", headers={"If-None-Match": etag}).status_code == 304
+    finally:
+        change_follower.stop()
+
+
+def test_follower_resumes_from_start_seq(client):
+    """serve.py --bootstrap: writes between the master's bootstrap and a worker's start are replayed"""
+    project = create_project(client)
+    follower = ChangeLogFollower()
+    follower.start_seq = client.get("/api/changes/").json()["last_seq"]
+    create_task(client, project["id"])
+
+    follower.start()
+    follower.stop()
+
+    assert follower.poll() == 1
+
+
+def test_startup_hook_starts_follower(client, monkeypatch):
+    import main
+    from app.services.change_feed import change_follower
+
+    for service in (main.job_queue, main.health_recomputer, main.deadline_scheduler):
+        monkeypatch.setattr(service, "start", lambda: None)
+    monkeypatch.setattr(main.settings, "warm_up_on_startup", False)
+
+    main.on_startup()
+    try:
+        assert change_follower.running
+    finally:
+        main.on_shutdown()
+    assert not change_follower.running
+
+
+def age_changes(through_seq: int) -> None:
+    commit_from_another_process("UPDATE change_log SET created_at = '2000-01-01 00:00:00' WHERE seq <= ?", through_seq)
+
+
+def test_prune_job_deletes_changes_past_the_horizon(client):
+    project = create_project(client)
+    for title in ("A", "B", "C"):
+        create_task(client, project["id"], title)
+    last_seq = client.get("/api/changes/").json()["last_seq"]
+    age_changes(last_seq - 1)
+
+    with SessionLocal() as db:
+        assert prune_change_log(db, batch=2) == last_seq - 1
+    # The newest row survives even when it is past the horizon too
+    age_changes(last_seq)
+    job, _ = job_queue.enqueue("prune_change_log")
+    assert job_queue.run_next()
+    assert client.get(f"/api/jobs/{job.id}").json()["result"] == {"deleted": 0}
+
+    assert [c["seq"] for c in client.get("/api/changes/", params={"since": last_seq - 1}).json()["changes"]] == [
+        last_seq
+    ]
+    expired = client.get("/api/changes/", params={"since": last_seq - 2})
+    assert expired.status_code == 410
+
+
+def test_prune_keeps_changes_inside_the_horizon(client):
+    project = create_project(client)
+    create_task(client, project["id"], "A")
+    create_task(client, project["id"], "B")
+    age_changes(1)
+
+    with SessionLocal() as db:
+        assert prune_change_log(db) == 1
+    assert client.get("/api/changes/", params={"since": 1}).json()["changes"]
+
+
+def test_websocket_sends_backlog_heartbeats_and_live_changes(client, monkeypatch):
+    monkeypatch.setattr(settings, "change_feed_heartbeat", 0.05)
+    project = create_project(client)
+
+    with client.websocket_connect("/api/changes/ws?since=0") as ws:
+        backlog = ws.receive_json()
+        assert (backlog["type"], backlog["table"], backlog["row_id"]) == ("change", "projects", project["id"])
+        assert ws.receive_json() == {"type": "heartbeat"}
+
+        task = create_task(client, project["id"], "Live")
+        live = ws.receive_json()
+        while live["type"] == "heartbeat":
+            live = ws.receive_json()
+        assert (live["table"], live["op"], live["payload"]["title"]) == ("tasks", "insert", "Live")
+        assert live["seq"] > backlog["seq"] and live["row_id"] == task["id"]
+
+
+def test_websocket_closes_on_an_expired_cursor(client):
+    project = create_project(client)
+    create_task(client, project["id"])
+    age_changes(1)
+    with SessionLocal() as db:
+        prune_change_log(db)
+
+    with client.websocket_connect("/api/changes/ws?since=0") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 4001
+
+
+def test_sse_resumes_from_last_event_id_and_ends_with_resync(client, monkeypatch):
+    monkeypatch.setattr(change_broadcaster, "max_queue", 1)
+    project = create_project(client)
+    first = create_task(client, project["id"], "Backlog")
+    seq = client.get("/api/changes/").json()["last_seq"]
+
+    def burst():
+        # One commit with more changes than the subscriber's queue holds
+        with SessionLocal() as db:
+            db.add_all([Task(title=f"Burst {i}", project_id=project["id"]) for i in range(3)])
+            db.commit()
+
+    threading.Timer(0.3, burst).start()
+    response = client.get("/api/changes/stream", params={"since": 0}, headers={"Last-Event-ID": str(seq - 1)})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    change = events[0].split("\n")
+    assert change[:2] == [f"id: {seq}", "event: change"]
+    assert json.loads(change[2][len("data: "):])["row_id"] == first["id"]
+    assert events[-1] == "event: resync\ndata: {}"
+
+
+def test_sse_ends_with_expired_for_a_pruned_cursor(client):
+    project = create_project(client)
+    create_task(client, project["id"])
+    age_changes(1)
+    with SessionLocal() as db:
+        prune_change_log(db)
+
+    assert client.get("/api/changes/stream", params={"since": 0}).text == "event: expired\ndata: {}\n\n"
@@ -0,0 +1,97 @@
+import pytest
+from app.models import DeveloperMetrics, Project, Task
+from conftest import create_project, create_task, create_user, record_hours
+
+
+def etag(client, path: str) -> str:
+    response = client.get(path)
+    assert response.status_code == 200, response.text
+    return response.headers["ETag"]
+
+
+def assert_changes(client, path: str, write) -> None:
+    """`write()` must turn the ETag of `path` stale, and the next poll must be a 304 again"""
+    before = etag(client, path)
+    write()
+    after = client.get(path, headers={"If-None-Match": before})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before
+    assert client.get(path, headers={"If-None-Match": after.headers["ETag"]}).status_code == 304
+
+
+def test_unchanged_poll_is_not_modified(client):
+    create_project(client)
+    tag = etag(client, "/api/projects/")
+
+    assert client.get("/api/projects/", headers={"If-None-Match": tag}).status_code == 304
+
+
+@pytest.mark.parametrize("path", ["/api/projects/", "/api/aggregate/"])
+def test_project_writes_change_etag(client, path):
+    project = create_project(client)
+
+    assert_changes(client, path, lambda: create_project(client, "Gemini"))
+    assert_changes(client, path, lambda: client.put(f"/api/projects/{project['id']}", json={"name": "Apollo II"}))
+    assert_changes(client, path, lambda: client.delete(f"/api/projects/{project['id']}"))
+
+
+@pytest.mark.parametrize("path", ["/api/tasks/", "/api/aggregate/"])
+def test_task_writes_change_etag(client, path):
+    project = create_project(client)
+    task = create_task(client, project["id"])
+
+    assert_changes(client, path, lambda: create_task(client, project["id"], "Second"))
+    assert_changes(client, path, lambda: client.put(f"/api/tasks/{task['id']}", json={"title": "Renamed"}))
+    assert_changes(client, path, lambda: client.delete(f"/api/tasks/{task['id']}"))
+
+
+def test_project_delete_changes_task_etag(client):
+    project = create_project(client)
+    create_task(client, project["id"])
+
+    assert_changes(client, "/api/tasks/", lambda: client.delete(f"/api/projects/{project['id']}"))
+
+
+@pytest.mark.parametrize("path", ["/api/workload", "/api/aggregate/"])
+def test_metric_writes_change_etag(client, path):
+    user = create_user(client, "Ada")
+    metric = record_hours(client, user, 30)
+
+    assert_changes(client, path, lambda: record_hours(client, user, 10))
+    assert_changes(client, path, lambda: client.put(f"/api/metrics/{metric['id']}", json={"hours_worked": 45}))
+    assert_changes(client, path, lambda: client.delete(f"/api/metrics/{metric['id']}"))
+
+
+def test_user_delete_changes_task_and_metric_etags(client):
+    user = create_user(client, "Ada")
+    record_hours(client, user, 30)
+    project = create_project(client)
+    create_task(client, project["id"], assigned_to=user["id"])
+    tasks_tag, workload_tag = etag(client, "/api/tasks/"), etag(client, "/api/workload")
+
+    client.delete(f"/api/users/{user['id']}")
+
+    assert client.get("/api/tasks/", headers={"If-None-Match": tasks_tag}).status_code == 200
+    assert client.get("/api/workload", headers={"If-None-Match": workload_tag}).status_code == 200
+
+
+def test_session_writes_outside_routers_change_etag(client, db):
+    """Services and jobs commit without going through a router"""
+    project = create_project(client)
+    user = create_user(client, "Ada")
+
+    def add_task():
+        db.add(Task(title="From a job", project_id=project["id"]))
+        db.commit()
+
+    def rename_project():
+        db.get(Project, project["id"]).name = "Renamed"
+        db.commit()
+
+    def add_metric():
+        db.add(DeveloperMetrics(developer_id=user["id"], developer_name="Ada", hours_worked=5))
+        db.commit()
+
+    assert_changes(client, "/api/tasks/", add_task)
+    assert_changes(client, "/api/projects/", rename_project)
+    assert_changes(client, "/api/workload", add_metric)
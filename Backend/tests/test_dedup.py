@@ -0,0 +1,79 @@
+import pytest
+from app.services.change_feed import apply_changes
+from app.services.dedup_service import task_dedup_index
+from conftest import create_project, create_task, create_user
+
+TITLE = "Fix login redirect bug"
+
+
+def duplicates(project_id: int, title: str = TITLE) -> list:
+    return [task_id for task_id, _ in task_dedup_index.find_similar(title, project_id)]
+
+
+@pytest.fixture
+def project(client, db):
+    project = create_project(client)
+    task_dedup_index.bootstrap(db)
+    return project
+
+
+def test_api_writes_reach_the_index(client, project):
+    first = create_task(client, project["id"], TITLE)
+    second = create_task(client, project["id"], TITLE)
+    assert sorted(duplicates(project["id"])) == [first["id"], second["id"]]
+
+    client.put(f"/api/tasks/{first['id']}", json={"title": "Write release notes"})
+    client.delete(f"/api/tasks/{second['id']}")
+
+    assert duplicates(project["id"]) == []
+    assert duplicates(project["id"], "Write release notes") == [first["id"]]
+
+
+def test_status_updates_keep_the_indexed_title(client, project):
+    task = create_task(client, project["id"], TITLE)
+
+    client.put(f"/api/tasks/{task['id']}", json={"status": "in_progress"})
+
+    assert duplicates(project["id"]) == [task["id"]]
+
+
+def test_dashboard_route_tasks_reach_the_index(client, project):
+    from routes.auth import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'pm@example.com', 'role': 'manager'})}"}
+    ada = create_user(client, "Ada")
+    response = client.post(f"/projects/{project['id']}/task", params={"title": TITLE, "assigned_to": ada["id"]},
+                           headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert duplicates(project["id"]) == [response.json()["task"]["id"]]
+
+
+def test_project_delete_empties_the_index(client, project):
+    create_task(client, project["id"], TITLE)
+
+    client.delete(f"/api/projects/{project['id']}")
+
+    assert duplicates(project["id"]) == []
+
+
+def test_changes_from_other_processes_reach_the_index(project):
+    insert = {"seq": 1, "table": "tasks", "row_id": 99, "op": "insert",
+              "payload": {"id": 99, "project_id": project["id"], "title": TITLE}}
+    delete = {"seq": 2, "table": "tasks", "row_id": 99, "op": "delete", "payload": None}
+
+    apply_changes([insert])
+    assert duplicates(project["id"]) == [99]
+
+    apply_changes([delete])
+    assert duplicates(project["id"]) == []
+
+
+def test_changes_before_the_bootstrap_are_read_from_the_database(client):
+    project = create_project(client)
+    task = create_task(client, project["id"], TITLE)
+    assert duplicates(project["id"]) == []
+
+    client.get("/api/tasks/duplicates/check", params={"title": TITLE, "project_id": project["id"]})
+
+    assert duplicates(project["id"]) == [task["id"]]
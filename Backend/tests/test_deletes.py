@@ -0,0 +1,33 @@
+from conftest import create_project, create_task, create_user, record_hours
+
+
+def changes(client, since: int = 0) -> list:
+    return client.get("/api/changes/", params={"since": since}).json()["changes"]
+
+
+def test_deleting_a_project_deletes_and_logs_its_tasks(client):
+    apollo, gemini = create_project(client), create_project(client, "Gemini")
+    doomed = [create_task(client, apollo["id"], f"Task {n}") for n in range(3)]
+    kept = create_task(client, gemini["id"])
+    since = changes(client)[-1]["seq"]
+
+    assert client.delete(f"/api/projects/{apollo['id']}").status_code == 204
+
+    assert [task["id"] for task in client.get("/api/tasks/").json()] == [kept["id"]]
+    logged = {(c["table"], c["row_id"], c["op"]) for c in changes(client, since)}
+    assert logged == {("tasks", task["id"], "delete") for task in doomed} | {("projects", apollo["id"], "delete")}
+
+
+def test_deleting_a_user_unassigns_tasks_and_deletes_metrics(client):
+    user = create_user(client, "Ada")
+    metric = record_hours(client, user, 10)
+    project = create_project(client)
+    task = create_task(client, project["id"], assigned_to=user["id"])
+
+    assert client.delete(f"/api/users/{user['id']}").status_code == 204
+
+    unassigned = client.get(f"/api/tasks/{task['id']}").json()
+    assert unassigned["assigned_to"] is None
+    assert unassigned["version"] == task["version"] + 1
+    assert client.get(f"/api/metrics/{metric['id']}").status_code == 404
+    assert client.get(f"/api/users/{user['id']}").status_code == 404
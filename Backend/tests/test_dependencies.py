@@ -0,0 +1,104 @@
+import math
+import random
+import pytest
+from app.models import TaskStatus
+from app.services.dependency_service import DependencyCycleError, ProjectGraph, from_days
+from conftest import create_project, create_task, days_from_now
+
+ANCHOR = 20000.0
+
+
+def depend(client, task: dict, on: dict):
+    return client.post(f"/api/tasks/{task['id']}/dependencies", json={"depends_on_id": on["id"]})
+
+
+def test_completed_task_passes_on_its_prerequisites(client):
+    project = create_project(client)
+    design = create_task(client, project["id"], "Design", estimated_days=5, deadline=days_from_now(30))
+    review = create_task(client, project["id"], "Review", status="completed")
+    build = create_task(client, project["id"], "Build", estimated_days=3, deadline=days_from_now(2))
+    assert depend(client, review, design).status_code == 201
+    assert depend(client, build, review).status_code == 201
+
+    schedule = client.get(f"/api/projects/{project['id']}/critical-path").json()
+
+    tasks = {task["id"]: task for task in schedule["tasks"]}
+    assert set(tasks) == {design["id"], build["id"]}
+    assert tasks[build["id"]]["earliest_start"] == tasks[design["id"]]["earliest_finish"]
+    assert schedule["critical_path"] == [design["id"], build["id"]]
+    # Build misses its deadline by about 6 days, so Design (which it waits for) is late too
+    assert -7 < tasks[build["id"]]["slack_days"] == tasks[design["id"]]["slack_days"] < -5
+    assert sorted(schedule["late_tasks"]) == sorted([design["id"], build["id"]])
+
+
+def test_completed_task_deadline_does_not_count():
+    graph = ProjectGraph.build(1, [
+        (1, TaskStatus.TODO, None, 2.0),
+        (2, TaskStatus.COMPLETED, from_days(ANCHOR - 3), None),
+    ], [(1, 1, 2)], ANCHOR)
+
+    assert graph.schedule()["late_tasks"] == []
+
+
+def test_dependency_that_closes_a_cycle_is_rejected(client):
+    project = create_project(client)
+    first, second, third = (create_task(client, project["id"], title) for title in ("A", "B", "C"))
+    assert depend(client, second, first).status_code == 201
+    assert depend(client, third, second).status_code == 201
+
+    assert depend(client, first, third).status_code == 409
+    assert depend(client, first, first).status_code == 400
+    assert depend(client, third, second).status_code == 400
+    assert client.get(f"/api/projects/{project['id']}/critical-path").json()["critical_path"] == [
+        first["id"], second["id"], third["id"]
+    ]
+
+
+def snapshot(graph: ProjectGraph):
+    values = {
+        graph.ids[s]: tuple(round(v[s], 6) for v in (graph.es, graph.ef, graph.ls, graph.lf))
+        for s in range(len(graph.ids)) if graph.alive[s]
+    }
+    return values, round(graph.finish, 6), graph.schedule()["critical_path"]
+
+
+def rebuild(graph: ProjectGraph) -> ProjectGraph:
+    tasks = [
+        (graph.ids[s], TaskStatus.COMPLETED if graph.done[s] else TaskStatus.TODO,
+         None if math.isinf(graph.deadline[s]) else from_days(graph.deadline[s]), graph.duration[s] or None)
+        for s in range(len(graph.ids)) if graph.alive[s]
+    ]
+    edges = [(edge_id, graph.ids[u], graph.ids[v]) for (u, v), edge_id in graph.edge_ids.items()]
+    return ProjectGraph.build(graph.project_id, tasks, edges, graph.anchor)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_incremental_changes_match_a_fresh_build(seed):
+    rng = random.Random(seed)
+    graph = ProjectGraph.build(1, [], [], ANCHOR)
+    next_task, next_edge = 1, 1
+    for _ in range(200):
+        ids = list(graph.slot_of)
+        roll = rng.random()
+        if roll < 0.25 or len(ids) < 3:
+            deadline = from_days(ANCHOR + rng.randint(1, 40)) if rng.random() < 0.3 else None
+            graph.upsert_task(next_task, TaskStatus.TODO, deadline, rng.choice([None, 0.5, 2, 3]))
+            next_task += 1
+        elif roll < 0.6:
+            before, after = rng.sample(ids, 2)
+            try:
+                graph.add_edge(next_edge, before, after)
+                next_edge += 1
+            except DependencyCycleError:
+                pass
+        elif roll < 0.7 and graph.edge_ids:
+            graph.remove_edge(rng.choice(list(graph.edge_ids.values())))
+        elif roll < 0.85:
+            deadline = from_days(ANCHOR + rng.randint(-3, 30)) if rng.random() < 0.5 else None
+            status = rng.choice([TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED])
+            graph.upsert_task(rng.choice(ids), status, deadline, rng.choice([None, 1, 4]))
+        else:
+            graph.remove_task(rng.choice(ids))
+
+        assert snapshot(graph) == snapshot(rebuild(graph))
+        assert all(graph.ord[u] < graph.ord[v] for u, v in graph.edge_ids)
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+import pytest
+from forecast_engine import DeliveryForecaster
+from conftest import create_project, create_task
+
+NOW = datetime(2030, 1, 1)
+
+
+def forecast(remaining: int, completed_recently: int, days_left: float = None) -> dict:
+    end_date = NOW + timedelta(days=days_left) if days_left is not None else None
+    project = {"project_id": 1, "remaining": remaining, "completed_recently": completed_recently, "end_date": end_date}
+    return DeliveryForecaster(simulations=2000).forecast([project], now=NOW)[0]
+
+
+def test_project_without_open_tasks_is_done():
+    result = forecast(0, 4, days_left=-3)
+
+    assert (result["on_time_probability"], result["prediction"]) == (1.0, "On Track 🚀")
+    assert result["p50_finish"] == result["p90_finish"] == NOW
+
+
+def test_project_without_throughput_gets_its_own_label():
+    result = forecast(5, 0)
+
+    assert result["prediction"] == "No Recent Progress ⏸️"
+    assert result["daily_throughput"] == 0.0
+    assert result["p90_finish"] > NOW + timedelta(days=100)
+
+
+@pytest.mark.parametrize("completed_recently, days_left, prediction", [
+    (56, 30, "On Track 🚀"),
+    (28, 28, "Slight Delay ⚠️"),
+    (5, 10, "Critical 🚨"),
+])
+def test_labels_follow_the_on_time_probability(completed_recently, days_left, prediction):
+    assert forecast(10, completed_recently, days_left)["prediction"] == prediction
+
+
+def test_forecast_is_vectorized_and_deterministic():
+    projects = [
+        {"project_id": pid, "remaining": remaining, "completed_recently": 20, "end_date": NOW + timedelta(days=20)}
+        for pid, remaining in ((1, 5), (2, 40))
+    ]
+
+    first, second = DeliveryForecaster().forecast(projects, now=NOW), DeliveryForecaster().forecast(projects, now=NOW)
+
+    assert first == second
+    assert first[0]["on_time_probability"] > first[1]["on_time_probability"]
+    assert first[0]["p50_finish"] < first[0]["p90_finish"] < first[1]["p90_finish"]
+
+
+def test_analytics_of_a_finished_project_past_its_end_date(client):
+    from routes.auth import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'pm@example.com', 'role': 'manager'})}"}
+    project = client.post("/api/projects/", json={
+        "name": "Apollo", "client_name": "Acme", "start_date": (datetime.utcnow() - timedelta(days=30)).isoformat(),
+        "end_date": (datetime.utcnow() - timedelta(days=1)).isoformat(),
+    }).json()
+    create_task(client, project["id"], status="completed")
+
+    analytics = client.get(f"/projects/{project['id']}/analytics", headers=headers).json()
+
+    assert analytics["prediction"] == "On Track 🚀"
+    assert analytics["forecast"]["on_time_probability"] == 1.0
@@ -0,0 +1,42 @@
+from app.models import Project
+from app.services.health_service import HealthRecomputer
+from app.services.job_queue import job_queue
+from conftest import create_project, create_task, days_from_now
+
+
+def test_clients_cannot_write_health_score(client):
+    project = create_project(client)
+
+    response = client.put(f"/api/projects/{project['id']}", json={"health_score": 99.0, "name": "Apollo II"})
+
+    assert response.status_code == 200
+    assert response.json()["health_score"] == project["health_score"]
+    assert "health_score" not in client.get("/openapi.json").json()["components"]["schemas"]["ProjectUpdate"]["properties"]
+
+
+def test_workers_starting_together_queue_one_full_rescore(client, db):
+    project = create_project(client)
+    create_task(client, project["id"], "Done", status="completed")
+    create_task(client, project["id"], "Late", deadline=days_from_now(-1))
+    workers = [HealthRecomputer(), HealthRecomputer()]
+    try:
+        for worker in workers:
+            worker.start()
+        jobs = client.get("/api/jobs/", params={"kind": "recompute_health"}).json()
+        assert [job["status"] for job in jobs] == ["queued"]
+
+        assert job_queue.run_next()
+        assert not job_queue.run_next()
+    finally:
+        for worker in workers:
+            worker.stop()
+
+    assert db.get(Project, project["id"]).health_score == 45.0
+
+
+def test_new_projects_start_healthy(client):
+    project = create_project(client)
+
+    # Before the recomputer has run
+    assert project["health_score"] == 100.0
+    assert client.get(f"/api/projects/{project['id']}").json()["health_score"] == 100.0
@@ -0,0 +1,166 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Job, JobStatus
+from app.services.job_handlers import import_tasks
+from app.services.job_queue import JobQueue, PermanentJobError, job_queue
+from conftest import create_project
+
+
+def job_row(job_id: int) -> Job:
+    with SessionLocal() as db:
+        return db.get(Job, job_id)
+
+
+@pytest.fixture
+def queue(client, monkeypatch):
+    """A queue with its own handlers and lease owner, on the test database"""
+    monkeypatch.setattr(settings, "job_retry_backoff", 0.0)
+    queue = JobQueue()
+    queue.worker_id = "test:1"
+    queue.calls = []
+
+    @queue.handler("echo")
+    def echo(payload):
+        queue.calls.append(payload)
+        return {"echo": payload.get("n")}
+
+    @queue.handler("flaky")
+    def flaky(payload):
+        queue.calls.append(payload)
+        if len(queue.calls) < payload["succeed_on"]:
+            raise RuntimeError("try again")
+        return {"attempt": len(queue.calls)}
+
+    @queue.handler("invalid")
+    def invalid(payload):
+        raise PermanentJobError("bad payload")
+
+    return queue
+
+
+def test_dedup_key_returns_the_active_job(queue):
+    first, created = queue.enqueue("echo", {"n": 1}, dedup_key="echo:all")
+    again, created_again = queue.enqueue("echo", {"n": 2}, dedup_key="echo:all")
+    assert (created, created_again, again.id) == (True, False, first.id)
+
+    assert queue.run_next()
+    after, created_after = queue.enqueue("echo", {"n": 3}, dedup_key="echo:all")
+    assert created_after and after.id != first.id
+
+
+def test_jobs_run_by_priority_then_age(queue):
+    for n, priority in ((1, 0), (2, 5), (3, 0)):
+        queue.enqueue("echo", {"n": n}, priority=priority)
+
+    while queue.run_next():
+        pass
+
+    assert [call["n"] for call in queue.calls] == [2, 1, 3]
+
+
+def test_failed_job_is_retried_until_it_succeeds(queue):
+    job, _ = queue.enqueue("flaky", {"succeed_on": 3}, max_attempts=3)
+
+    for _ in range(3):
+        assert queue.run_next()
+
+    row = job_row(job.id)
+    assert (row.status, row.attempts, row.error) == (JobStatus.SUCCEEDED, 3, None)
+    assert not queue.run_next()
+
+
+def test_retry_waits_for_the_backoff(queue, monkeypatch):
+    monkeypatch.setattr(settings, "job_retry_backoff", 60.0)
+    job, _ = queue.enqueue("flaky", {"succeed_on": 2})
+
+    assert queue.run_next()
+    row = job_row(job.id)
+    assert (row.status, row.error) == (JobStatus.QUEUED, "RuntimeError: try again")
+    assert row.run_after > datetime.utcnow() + timedelta(seconds=50)
+    assert not queue.run_next()
+
+
+def test_job_fails_after_max_attempts_or_permanent_error(queue):
+    flaky, _ = queue.enqueue("flaky", {"succeed_on": 10}, max_attempts=2)
+    invalid, _ = queue.enqueue("invalid", {})
+
+    while queue.run_next():
+        pass
+
+    assert (job_row(flaky.id).status, job_row(flaky.id).attempts) == (JobStatus.FAILED, 2)
+    assert (job_row(invalid.id).status, job_row(invalid.id).attempts) == (JobStatus.FAILED, 1)
+
+
+def test_expired_lease_is_requeued_and_run_elsewhere(queue, monkeypatch):
+    job, _ = queue.enqueue("echo", {"n": 1})
+    assert queue.claim()["id"] == job.id  # this "process" dies before finishing
+
+    survivor = JobQueue()
+    survivor.worker_id = "test:2"
+    survivor._handlers = queue._handlers
+    assert survivor.requeue_expired() == 0
+
+    monkeypatch.setattr(settings, "job_lease_seconds", 0.0)
+    with SessionLocal() as db:
+        db.execute(update(Job).where(Job.id == job.id).values(locked_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.commit()
+    assert survivor.requeue_expired() == 1
+    assert survivor.run_next()
+
+    row = job_row(job.id)
+    assert (row.status, row.attempts, row.locked_by) == (JobStatus.SUCCEEDED, 2, "test:2")
+    # The first owner's late result no longer applies
+    queue._update(job.id, status=JobStatus.FAILED)
+    assert job_row(job.id).status == JobStatus.SUCCEEDED
+
+
+def test_heartbeat_refreshes_running_leases(queue):
+    job, _ = queue.enqueue("echo", {"n": 1})
+    queue.claim()
+    queue._running.add(job.id)
+    stale = datetime.utcnow() - timedelta(minutes=10)
+    with SessionLocal() as db:
+        db.execute(update(Job).where(Job.id == job.id).values(locked_at=stale))
+        db.commit()
+
+    queue.heartbeat()
+
+    assert job_row(job.id).locked_at > stale + timedelta(minutes=9)
+
+
+def test_only_queued_jobs_can_be_cancelled(client, queue):
+    waiting, _ = queue.enqueue("echo", {"n": 1})
+    done, _ = queue.enqueue("echo", {"n": 2}, priority=1)
+    queue.run_next()
+
+    assert client.delete(f"/api/jobs/{waiting.id}").json()["status"] == "cancelled"
+    assert client.delete(f"/api/jobs/{done.id}").status_code == 409
+    assert not queue.run_next()
+
+
+def test_import_retried_after_a_crash_inserts_nothing(client, monkeypatch):
+    project = create_project(client)
+    job_id = client.post("/api/tasks/import", json={"tasks": [
+        {"title": "Set up CI", "project_id": project["id"]},
+        {"title": "Orphan", "project_id": 999},
+    ]}).json()["job_id"]
+
+    # The first attempt commits its tasks, then its process dies before the job is marked done
+    assert job_queue.claim()["id"] == job_id
+    job_queue._local.job_id = job_id
+    try:
+        first = import_tasks(json.loads(job_row(job_id).payload))
+    finally:
+        job_queue._local.job_id = None
+    monkeypatch.setattr(settings, "job_lease_seconds", 0.0)
+    assert job_queue.requeue_expired() == 1
+    assert job_queue.run_next()
+
+    row = job_row(job_id)
+    assert (row.status, row.attempts) == (JobStatus.SUCCEEDED, 2)
+    assert client.get(f"/api/jobs/{job_id}").json()["result"] == first
+    assert [task["title"] for task in client.get("/api/tasks/").json()] == ["Set up CI"]
@@ -0,0 +1,72 @@
+from sqlalchemy import text
+from app.services.deadline_scheduler import deadline_scheduler
+from conftest import create_project, create_task, days_from_now
+
+
+def overdue_tasks(client, project_id: int) -> int:
+    return client.get(f"/api/projects/{project_id}").json()["overdue_tasks"]
+
+
+def changes(client, since: int = 0) -> list:
+    return client.get("/api/changes/", params={"since": since}).json()["changes"]
+
+
+def test_counter_follows_task_writes(client):
+    apollo, gemini = create_project(client), create_project(client, "Gemini")
+    task = create_task(client, apollo["id"], deadline=days_from_now(-1))
+    create_task(client, apollo["id"], "Not due yet", deadline=days_from_now(5))
+    assert overdue_tasks(client, apollo["id"]) == 1
+
+    client.put(f"/api/tasks/{task['id']}", json={"status": "completed"})
+    assert overdue_tasks(client, apollo["id"]) == 0
+
+    client.put(f"/api/tasks/{task['id']}", json={"status": "in_progress"})
+    assert overdue_tasks(client, apollo["id"]) == 1
+
+    client.put(f"/api/tasks/{task['id']}", json={"project_id": gemini["id"]})
+    assert (overdue_tasks(client, apollo["id"]), overdue_tasks(client, gemini["id"])) == (0, 1)
+
+    client.put(f"/api/tasks/{task['id']}", json={"deadline": days_from_now(3).isoformat()})
+    assert overdue_tasks(client, gemini["id"]) == 0
+
+    client.put(f"/api/tasks/{task['id']}", json={"deadline": days_from_now(-2).isoformat()})
+    client.delete(f"/api/tasks/{task['id']}")
+    assert overdue_tasks(client, gemini["id"]) == 0
+
+
+def test_counter_change_is_logged_and_changes_project_etag(client):
+    project = create_project(client)
+    etag = client.get("/api/projects/").headers["ETag"]
+    since = changes(client)[-1]["seq"]
+
+    task = create_task(client, project["id"], deadline=days_from_now(-1))
+
+    assert client.get("/api/projects/", headers={"If-None-Match": etag}).status_code == 200
+    logged = [(c["table"], c["row_id"], (c["payload"] or {}).get("overdue_tasks")) for c in changes(client, since)]
+    assert ("projects", project["id"], 1) in logged
+    # Flagging the new task does not count as an edit
+    assert task["updated_at"] is None
+    assert client.get(f"/api/tasks/{task['id']}").json()["updated_at"] is None
+    assert client.get(f"/api/projects/{project['id']}").json()["updated_at"] is None
+
+
+def test_expire_flags_due_tasks_and_logs_them(client, db):
+    project = create_project(client)
+    task = create_task(client, project["id"], deadline=days_from_now(1))
+    # The deadline passes without any write to the task
+    db.execute(text("UPDATE tasks SET deadline = :deadline WHERE id = :id"),
+               {"deadline": days_from_now(-1), "id": task["id"]})
+    db.commit()
+    projects_etag = client.get("/api/projects/").headers["ETag"]
+    tasks_etag = client.get("/api/tasks/").headers["ETag"]
+    since = changes(client)[-1]["seq"]
+
+    assert deadline_scheduler.expire([task["id"]]) == {"tasks": 1, "projects": 1}
+    assert deadline_scheduler.expire([task["id"]]) == {"tasks": 0, "projects": 0}
+
+    assert overdue_tasks(client, project["id"]) == 1
+    assert client.get("/api/projects/", headers={"If-None-Match": projects_etag}).status_code == 200
+    assert client.get("/api/tasks/", headers={"If-None-Match": tasks_etag}).status_code == 200
+    logged = {(c["table"], c["row_id"]) for c in changes(client, since)}
+    assert logged == {("tasks", task["id"]), ("projects", project["id"])}
+    assert client.get(f"/api/tasks/{task['id']}").json()["updated_at"] is None
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from app.models import TaskStatus
+from app.services.reassignment_service import ReassignmentEngine
+from conftest import create_project, create_task, create_user, record_hours
+
+engine = ReassignmentEngine()
+SOON = datetime(2030, 1, 1)
+
+
+def test_overloaded_developer_is_relieved_down_to_target_load():
+    developers = [(1, "Diana", 60.0, 6), (2, "Bob", 20.0, 1)]
+    tasks = [(100 + i, f"Task {i}", 1, TaskStatus.TODO, SOON + timedelta(days=i), None) for i in range(6)]
+
+    [suggestion] = engine.plan(developers, tasks)
+
+    # 10 hours per task: two moves take Diana from 150% to 100%
+    assert suggestion["current_load"] == 150.0
+    assert suggestion["projected_load"] == 100.0
+    moves = suggestion["suggested_reassignments"]
+    assert [move["to_developer_id"] for move in moves] == [2, 2]
+    # Latest deadlines move first
+    assert [move["task_id"] for move in moves] == [105, 104]
+
+
+def test_untouched_work_moves_before_in_progress_work():
+    developers = [(1, "Diana", 60.0, 3), (2, "Bob", 0.0, 0)]
+    tasks = [
+        (1, "Started", 1, TaskStatus.IN_PROGRESS, None, None),
+        (2, "Blocked", 1, TaskStatus.BLOCKED, None, None),
+        (3, "Not started", 1, TaskStatus.TODO, SOON, None),
+    ]
+
+    [suggestion] = engine.plan(developers, tasks)
+
+    assert [move["task_id"] for move in suggestion["suggested_reassignments"]] == [3]
+
+
+def test_moves_spread_across_receivers_by_spare_capacity():
+    developers = [(1, "Diana", 80.0, 8), (2, "Bob", 30.0, 1), (3, "Alice", 25.0, 1)]
+    tasks = [(i, f"Task {i}", 1, TaskStatus.TODO, None, None) for i in range(8)]
+
+    [suggestion] = engine.plan(developers, tasks)
+
+    # Alice (15 spare hours) takes the first 10-hour task, then Bob (10 spare);
+    # after that nobody can take another one
+    receivers = [move["to_developer_id"] for move in suggestion["suggested_reassignments"]]
+    assert receivers == [3, 2]
+    assert suggestion["projected_load"] == 150.0
+
+
+def test_nothing_to_do_without_overload_or_spare_capacity():
+    assert engine.plan([(1, "Diana", 40.0, 4), (2, "Bob", 20.0, 1)], []) == []
+    assert engine.plan([(1, "Diana", 60.0, 4), (2, "Bob", 45.0, 1)],
+                       [(1, "Task", 1, TaskStatus.TODO, None, None)]) == []
+
+
+def test_task_hours_follow_the_estimates():
+    developers = [(1, "Diana", 60.0, 3), (2, "Bob", 10.0, 1)]
+    tasks = [
+        (1, "Big", 1, TaskStatus.TODO, None, 4.0),
+        (2, "Unestimated", 1, TaskStatus.TODO, SOON, None),
+        (3, "Small", 1, TaskStatus.IN_PROGRESS, None, 1.0),
+    ]
+
+    [suggestion] = engine.plan(developers, tasks)
+
+    # 60 hours over 6 estimated days: the 4-day task is 40 hours, more than Bob's
+    # 30 spare hours, so the 1-day tasks move instead
+    moves = suggestion["suggested_reassignments"]
+    assert [(move["task_id"], move["estimated_hours"]) for move in moves] == [(2, 10.0), (3, 10.0)]
+    assert suggestion["projected_load"] == 100.0
+
+
+def test_reassignments_endpoint_returns_typed_moves_and_projected_load(client):
+    diana, bob = create_user(client, "Diana Prince"), create_user(client, "Bob Johnson")
+    project = create_project(client)
+    tasks = [create_task(client, project["id"], f"Task {i}", assigned_to=diana["id"]) for i in range(4)]
+    create_task(client, project["id"], "Done", assigned_to=diana["id"], status="completed")
+    record_hours(client, diana, 60.0)
+    record_hours(client, bob, 10.0)
+
+    response = client.get("/api/reassignments")
+
+    assert response.status_code == 200
+    [suggestion] = response.json()
+    assert suggestion["developer"] == "Diana Prince"
+    assert suggestion["projected_load"] < suggestion["current_load"]
+    move = suggestion["suggested_reassignments"][0]
+    assert move["task_id"] in {task["id"] for task in tasks}
+    assert move["from"] == "Diana Prince" and move["from_developer_id"] == diana["id"]
+    assert move["to"] == "Bob Johnson" and move["to_developer_id"] == bob["id"]
+    assert move["estimated_hours"] == 15.0
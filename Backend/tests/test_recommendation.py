@@ -0,0 +1,70 @@
+import pytest
+from app.services.change_feed import apply_changes
+from app.services.recommendation_service import AssigneeRecommender, assignee_recommender
+from conftest import create_project, create_task, create_user
+
+
+def matches(title: str) -> set:
+    return set(assignee_recommender.similarities(title))
+
+
+@pytest.fixture
+def team(client, db):
+    ada, bob = create_user(client, "Ada"), create_user(client, "Bob")
+    project = create_project(client)
+    login = create_task(client, project["id"], "Fix login redirect bug", status="completed", assigned_to=ada["id"])
+    assignee_recommender.bootstrap(db)
+    return {"ada": ada["id"], "bob": bob["id"], "project": project, "login": login}
+
+
+def test_profiles_follow_completions(client, team):
+    assert matches("login redirect") == {team["ada"]}
+    invoices = create_task(client, team["project"]["id"], "Export billing invoices", assigned_to=team["bob"])
+    assert matches("billing invoices") == set()
+
+    client.put(f"/api/tasks/{invoices['id']}", json={"status": "completed"})
+    assert matches("billing invoices") == {team["bob"]}
+
+    client.put(f"/api/tasks/{invoices['id']}", json={"status": "in_progress"})
+    assert matches("billing invoices") == set()
+
+
+def test_reassigned_and_deleted_tasks_move_out_of_profiles(client, team):
+    client.put(f"/api/tasks/{team['login']['id']}", json={"assigned_to": team["bob"]})
+    assert matches("login redirect") == {team["bob"]}
+
+    client.delete(f"/api/tasks/{team['login']['id']}")
+    assert matches("login redirect") == set()
+
+
+def test_changes_from_other_processes_update_profiles(team):
+    payload = {"id": 99, "title": "Export billing invoices", "status": "completed", "assigned_to": team["bob"]}
+
+    apply_changes([{"seq": 1, "table": "tasks", "row_id": 99, "op": "insert", "payload": payload}])
+    assert matches("billing invoices") == {team["bob"]}
+
+    apply_changes([{"seq": 2, "table": "tasks", "row_id": 99, "op": "delete", "payload": None}])
+    assert matches("billing invoices") == set()
+
+
+def test_incremental_profiles_match_a_fresh_build(client, db, team):
+    project_id = team["project"]["id"]
+    for title in ("Export billing invoices", "Billing page layout", "Login rate limit"):
+        task = create_task(client, project_id, title, status="completed", assigned_to=team["bob"])
+    client.put(f"/api/tasks/{task['id']}", json={"status": "todo"})
+    client.put(f"/api/tasks/{team['login']['id']}", json={"title": "Fix login session bug"})
+
+    fresh = AssigneeRecommender()
+    fresh.bootstrap(db)
+    with assignee_recommender._lock:
+        assignee_recommender._refresh()
+
+    for title in ("billing invoices", "login session", "login rate limit"):
+        assert assignee_recommender.similarities(title) == pytest.approx(fresh.similarities(title))
+
+
+def test_recommend_endpoint_prefers_matching_history(client, team):
+    response = client.get("/api/tasks/recommend-assignee", params={"title": "Login redirect loops"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()[0]["developer_id"] == team["ada"]
@@ -0,0 +1,58 @@
+from sqlalchemy import text
+from conftest import create_project, create_task
+
+
+def test_search_on_database_created_by_init_db(client):
+    project = create_project(client, "Checkout Revamp", "Globex")
+    create_task(client, project["id"], "Implement payment authentication")
+    create_task(client, project["id"], "Write release notes")
+
+    response = client.get("/api/search/", params={"q": "auth pay"})
+
+    assert response.status_code == 200
+    assert [hit["title"] for hit in response.json()["tasks"]] == ["Implement payment authentication"]
+
+
+def test_search_finds_projects_by_client_name(client):
+    project = create_project(client, "Checkout Revamp", "Globex")
+
+    response = client.get("/api/search/", params={"q": "globex", "kind": "projects"})
+
+    assert [hit["id"] for hit in response.json()["projects"]] == [project["id"]]
+
+
+def test_search_index_follows_updates_and_deletes(client):
+    project = create_project(client)
+    task = create_task(client, project["id"], "Draft onboarding emails")
+
+    client.put(f"/api/tasks/{task['id']}", json={"title": "Draft welcome emails"})
+    assert client.get("/api/search/", params={"q": "onboarding"}).json()["tasks"] == []
+    assert len(client.get("/api/search/", params={"q": "welcome"}).json()["tasks"]) == 1
+
+    client.delete(f"/api/tasks/{task['id']}")
+    assert client.get("/api/search/", params={"q": "welcome"}).json()["tasks"] == []
+
+
+def test_init_db_backfills_index_of_existing_database(client):
+    import database
+
+    project = create_project(client)
+    create_task(client, project["id"], "Migrate invoices")
+    # A database from before the index: no FTS tables or triggers
+    with database.engine.begin() as connection:
+        for (name, kind) in connection.execute(text(
+            "SELECT name, type FROM sqlite_master WHERE name LIKE '%_fts%' AND type IN ('table', 'trigger')"
+        )).all():
+            if kind == "trigger":
+                connection.execute(text(f"DROP TRIGGER {name}"))
+        connection.execute(text("DROP TABLE tasks_fts"))
+        connection.execute(text("DROP TABLE projects_fts"))
+
+    database.init_db()
+
+    hits = client.get("/api/search/", params={"q": "invoices"}).json()["tasks"]
+    assert [hit["title"] for hit in hits] == ["Migrate invoices"]
+
+
+def test_search_rejects_query_without_words(client):
+    assert client.get("/api/search/", params={"q": "  !! "}).status_code == 400
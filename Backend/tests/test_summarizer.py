@@ -0,0 +1,85 @@
+import io
+import pytest
+from ai_engine import ai_engine
+from app.services import nlp_service as nlp_module
+from app.services.nlp_service import nlp_service
+
+NOTES = (
+    "The billing service moves to the new cluster on Monday. "
+    "Lunch was good. "
+    "Billing alerts must page the on-call engineer for the billing service. "
+    "We talked about the weather. "
+    "The cluster migration needs a rollback plan for billing."
+)
+
+
+@pytest.mark.parametrize("max_sentences", [1, 2, 3])
+def test_dashboard_and_api_summarizers_agree(max_sentences):
+    assert ai_engine.summarize_text(NOTES, max_sentences) == nlp_service.summarize_text(NOTES, max_sentences)
+
+
+def test_summary_keeps_the_highest_scoring_sentences_in_order():
+    summary = nlp_service.summarize_text(NOTES, 2)
+
+    assert summary == (
+        "The billing service moves to the new cluster on Monday. "
+        "Billing alerts must page the on-call engineer for the billing service."
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 16, 1024])
+def test_stream_matches_in_memory_summary_across_chunk_boundaries(chunk_size):
+    summary, length = nlp_service.summarize_stream(io.StringIO(NOTES), 2, chunk_size=chunk_size)
+
+    assert (summary, length) == (nlp_service.summarize_text(NOTES, 2), len(NOTES))
+
+
+def test_stream_cuts_text_without_sentence_punctuation(monkeypatch):
+    monkeypatch.setattr(nlp_module, "MAX_SENTENCE_LENGTH", 10)
+
+    pieces = list(nlp_service._iter_sentences(io.StringIO("x" * 35), chunk_size=4))
+
+    assert pieces == ["x" * 10] * 3 + ["x" * 5]
+
+
+def test_batch_summaries_use_tfidf_across_documents(client):
+    response = client.post("/api/summary/batch", json={
+        "documents": [
+            {"id": "e-commerce", "text": "Checkout is done. Payment tests fail on refunds. Demo is Friday."},
+            {"id": "mobile", "text": "Release build is green. Store review pending. Icons updated."},
+            {"id": "short", "text": "Nothing to add."},
+            {"text": ""},
+        ],
+        "max_sentences": 1,
+        "digest_sentences": 2,
+    })
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert [item["summary"] for item in result["summaries"]] == [
+        "Payment tests fail on refunds.", "Release build is green.", "Nothing to add.", "",
+    ]
+    assert [item["id"] for item in result["summaries"]] == ["e-commerce", "mobile", "short", None]
+    assert result["digest"] == "Payment tests fail on refunds. Release build is green."
+
+
+def test_digest_breaks_score_ties_towards_earlier_sentences():
+    # Sentences score 2 (two content words), 1 (one) or 0 (stop words only)
+    pattern = [1, 1, 2, 0, 2, 0, 1, 1, 2, 0, 2, 2, 2, 0, 2, 2, 0, 1, 1, 0,
+               1, 1, 2, 0, 2, 2, 1, 1, 2, 0, 0, 1, 2, 1, 1, 2, 1, 2, 0, 1]
+    sentences = [" ".join(f"word{i}x{n}" for n in range(score)) + "." if score else "It is."
+                 for i, score in enumerate(pattern)]
+
+    _, digest = nlp_service.summarize_batch([" ".join(sentences)], max_sentences=1, digest_sentences=5)
+
+    # Score 2 first; among the fifteen tied at 2, the five earliest
+    assert digest == " ".join(sentences[i] for i in (2, 4, 8, 10, 11))
+
+
+def test_summary_file_upload(client):
+    text = "Deploy the billing service on Monday. " * 3 + "The release includes the new invoices page."
+    response = client.post("/api/summary/file", params={"max_sentences": 1},
+                           files={"file": ("notes.txt", text.encode(), "text/plain")})
+
+    assert response.status_code == 200
+    assert response.json()["original_length"] == len(text)
@@ -0,0 +1,88 @@
+import threading
+from app.services import summary_cache as summary_cache_module
+from app.services.summary_cache import SummaryCache
+
+TEXT = "The billing service moves to the new cluster on Monday. " * 20
+
+
+def cache(max_bytes: int = 1000, path: str = "") -> SummaryCache:
+    return SummaryCache(max_bytes=max_bytes, min_chars=100, path=path)
+
+
+def entry(n: int, summary_bytes: int = 60) -> tuple:
+    """A distinct key and a summary that costs 40 + summary_bytes"""
+    return f"{n:040x}", "x" * summary_bytes
+
+
+def test_least_recently_used_entries_are_evicted_over_budget():
+    summaries = cache(max_bytes=300)
+    for n in range(3):
+        summaries.put(*entry(n))
+    summaries.get(entry(0)[0])  # 0 is now the most recently used
+
+    summaries.put(*entry(3))
+
+    assert summaries.get(entry(1)[0]) is None
+    assert all(summaries.get(entry(n)[0]) for n in (0, 2, 3))
+    stats = summaries.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (3, 300, 1)
+
+
+def test_entry_larger_than_the_budget_is_not_stored():
+    summaries = cache(max_bytes=100)
+
+    summaries.put(*entry(0, summary_bytes=61))
+
+    assert summaries.stats()["entries"] == 0
+
+
+def test_keys_depend_on_text_and_max_sentences_and_short_texts_bypass():
+    summaries = cache()
+
+    assert summaries.key_for(TEXT, 3) == summaries.key_for(TEXT, 3)
+    assert summaries.key_for(TEXT, 3) != summaries.key_for(TEXT, 2)
+    assert summaries.key_for("Too short to cache.", 3) is None
+    assert summaries.stats()["bypassed"] == 1
+
+
+def test_bypass_counter_is_exact_across_threads():
+    summaries = cache()
+
+    def bypass():
+        for _ in range(1000):
+            summaries.key_for("short", 3)
+
+    threads = [threading.Thread(target=bypass) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert summaries.stats()["bypassed"] == 8000
+
+
+def test_persisted_entries_survive_a_restart_and_stay_within_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(summary_cache_module, "_PRUNE_EVERY", 4)
+    path = str(tmp_path / "summaries.db")
+    first = cache(max_bytes=300, path=path)
+    for n in range(4):
+        first.put(*entry(n))
+
+    restarted = cache(max_bytes=300, path=path)
+
+    assert restarted.get(entry(3)[0]) == entry(3)[1]
+    assert restarted.get(entry(0)[0]) is None  # pruned with the fourth write
+    assert (restarted.hits, restarted.misses) == (1, 1)
+
+
+def test_summary_endpoint_answers_repeats_from_the_cache(client, monkeypatch):
+    from app.routers import ai
+
+    summaries = cache(max_bytes=1 << 20)
+    monkeypatch.setattr(ai, "summary_cache", summaries)
+
+    first = client.post("/api/summary", json={"text": TEXT, "max_sentences": 1}).json()
+    second = client.post("/api/summary", json={"text": TEXT, "max_sentences": 1}).json()
+
+    assert first == second
+    assert (summaries.hits, summaries.misses) == (1, 1)
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import text
+from app.models import Task
+from app.services.task_filters import TaskFilters
+from conftest import create_project, create_task, create_user, days_from_now
+
+
+def titles(client, **params) -> list:
+    response = client.get("/api/tasks/", params=params)
+    assert response.status_code == 200, response.text
+    return [task["title"] for task in response.json()]
+
+
+@pytest.fixture
+def board(client):
+    ada = create_user(client, "Ada")
+    apollo, gemini = create_project(client), create_project(client, "Gemini")
+    create_task(client, apollo["id"], "late", deadline=days_from_now(-2), assigned_to=ada["id"])
+    create_task(client, apollo["id"], "soon", deadline=days_from_now(3), status="in_progress")
+    create_task(client, apollo["id"], "done", deadline=days_from_now(-5), status="completed", assigned_to=ada["id"])
+    create_task(client, gemini["id"], "someday")
+    create_task(client, gemini["id"], "later", deadline=days_from_now(20))
+    return {"ada": ada, "apollo": apollo, "gemini": gemini}
+
+
+def test_filters(client, board):
+    assert titles(client, project_id=board["gemini"]["id"]) == ["someday", "later"]
+    assert titles(client, status=["in_progress", "completed"]) == ["soon", "done"]
+    assert titles(client, assigned_to=board["ada"]["id"]) == ["late", "done"]
+    assert titles(client, overdue="true") == ["late"]
+    assert titles(client, overdue="false") == ["soon", "done", "someday", "later"]
+    assert titles(client, deadline_from=days_from_now(0).isoformat(), deadline_to=days_from_now(30).isoformat()) == [
+        "soon", "later"
+    ]
+    assert titles(client, project_id=board["apollo"]["id"], status="completed", assigned_to=board["ada"]["id"]) == [
+        "done"
+    ]
+
+
+def test_updated_since(client, board):
+    since = days_from_now(0).isoformat()
+    soon = next(task for task in client.get("/api/tasks/").json() if task["title"] == "soon")
+
+    client.put(f"/api/tasks/{soon['id']}", json={"title": "soon!"})
+
+    assert titles(client, updated_since=since) == ["soon!"]
+
+
+def test_sorts(client, board):
+    assert titles(client, sort="deadline") == ["done", "late", "soon", "later", "someday"]
+    assert titles(client, sort="-deadline") == ["later", "soon", "late", "done", "someday"]
+    assert titles(client, sort="-id") == ["later", "someday", "done", "soon", "late"]
+    assert titles(client, sort="deadline", skip=1, limit=2) == ["late", "soon"]
+
+
+def test_bad_parameters_are_400(client):
+    assert client.get("/api/tasks/", params={"sort": "title"}).status_code == 400
+    response = client.get("/api/tasks/", params={
+        "deadline_from": days_from_now(2).isoformat(), "deadline_to": days_from_now(1).isoformat(),
+    })
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("filters, index", [
+    (TaskFilters(project_id=1, status=["todo"]), "ix_tasks_project_status_deadline"),
+    (TaskFilters(assigned_to=1, status=None), "ix_tasks_assignee_status_deadline"),
+    (TaskFilters(overdue=True, status=None), "ix_tasks_overdue"),
+])
+def test_filters_use_their_index(db, filters, index):
+    query = filters.apply(db.query(Task.id))
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+
+    plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+    assert index in plan
+
+
+def test_init_db_can_run_again(client):
+    import database
+
+    project = create_project(client)
+    create_task(client, project["id"], "kept")
+
+    database.init_db()
+
+    assert titles(client) == ["kept"]
@@ -0,0 +1,109 @@
+import os
+import pickle
+import time
+import numpy as np
+import pytest
+from app.config import settings
+from app.services import training_service, worker_pool
+from app.services.training_service import HealthModelTrainer, publish_model
+
+
+def slow_fit(X, y, holdout):
+    time.sleep(1.0)
+
+
+@pytest.fixture
+def model_path(tmp_path, monkeypatch):
+    path = tmp_path / "models" / "health_model.pkl"
+    monkeypatch.setattr(settings, "health_model_path", str(path))
+    return path
+
+
+@pytest.fixture
+def dataset(monkeypatch):
+    """Enough labelled rows to fit, without building them through the API"""
+    X = np.arange(60, dtype=float).reshape(20, 3)
+    y = np.array(["Good", "Poor"] * 10)
+    monkeypatch.setattr(training_service, "load_training_set", lambda db: (X, y))
+
+
+def fake_fit(monkeypatch, candidate: float, baseline: float) -> list:
+    calls = []
+
+    async def run_in_pool(func, *args, timeout=None):
+        calls.append((func, timeout))
+        return {"model": {"name": "candidate"}, "candidate_accuracy": candidate, "baseline_accuracy": baseline,
+                "train_size": 16, "test_size": 4, "fit_seconds": 0.5}
+
+    monkeypatch.setattr(worker_pool, "run_in_pool", run_in_pool)
+    return calls
+
+
+def test_publish_replaces_the_model_without_leaving_temp_files(model_path):
+    publish_model({"version": 1})
+    publish_model({"version": 2})
+
+    assert os.listdir(model_path.parent) == [model_path.name]
+    with open(model_path, "rb") as f:
+        assert pickle.load(f) == {"version": 2}
+
+
+def test_failed_publish_keeps_the_live_model(model_path):
+    publish_model({"version": 1})
+
+    with pytest.raises(Exception):
+        publish_model(lambda: None)  # not picklable
+
+    assert os.listdir(model_path.parent) == [model_path.name]
+    with open(model_path, "rb") as f:
+        assert pickle.load(f) == {"version": 1}
+
+
+def test_retrain_skips_small_datasets(db, model_path):
+    report = HealthModelTrainer().retrain(db)
+
+    assert (report["status"], report["dataset_size"]) == ("skipped", 0)
+    assert not model_path.exists()
+
+
+@pytest.mark.parametrize("candidate, status", [(0.9, "published"), (0.7, "rejected")])
+def test_retrain_publishes_only_without_accuracy_loss(db, model_path, dataset, monkeypatch, candidate, status):
+    calls = fake_fit(monkeypatch, candidate, baseline=0.8)
+
+    report = HealthModelTrainer().retrain(db)
+
+    assert report["status"] == status
+    assert calls == [(training_service.fit_health_model, settings.retrain_timeout)]
+    assert model_path.exists() == (status == "published")
+
+
+def test_retrain_respects_the_pool_queue_limit(db, model_path, dataset, monkeypatch):
+    monkeypatch.setattr(settings, "worker_pool_size", 1)
+    monkeypatch.setattr(settings, "worker_pool_max_queue", 0)
+    monkeypatch.setattr(worker_pool, "_in_flight", 1)
+    try:
+        report = HealthModelTrainer().retrain(db)
+    finally:
+        worker_pool.shutdown_pool()
+
+    assert report["status"] == "failed"
+    assert not model_path.exists()
+
+
+def test_retrain_times_out(db, model_path, dataset, monkeypatch):
+    monkeypatch.setattr(settings, "worker_pool_size", 1)
+    monkeypatch.setattr(settings, "worker_pool_start_method", "fork")
+    monkeypatch.setattr(settings, "retrain_timeout", 0.2)
+    monkeypatch.setattr(worker_pool, "_init_worker", lambda: None)
+    monkeypatch.setattr(training_service, "fit_health_model", slow_fit)
+    trainer = HealthModelTrainer()
+    try:
+        started = time.perf_counter()
+        report = trainer.retrain(db)
+        assert time.perf_counter() - started < 1.0
+    finally:
+        worker_pool.shutdown_pool()
+
+    assert report["status"] == "failed"
+    assert trainer.last_report is report
+    assert not model_path.exists()
@@ -0,0 +1,112 @@
+import pytest
+from app.services.whatif_service import whatif_simulator
+from conftest import create_project, create_task, create_user, days_from_now, record_hours
+
+
+def what_if(client, **scenario):
+    return client.post("/api/workload/what-if", json=scenario)
+
+
+@pytest.fixture
+def team(client):
+    ada, bob, eve = create_user(client, "Ada"), create_user(client, "Bob"), create_user(client, "Eve")
+    record_hours(client, ada, 30)
+    record_hours(client, ada, 50)  # the latest record counts
+    record_hours(client, bob, 10)
+    project = create_project(client)
+    late = create_task(client, project["id"], "Late", deadline=days_from_now(-1), assigned_to=ada["id"])
+    other = create_task(client, project["id"], "Other", assigned_to=ada["id"])
+    create_task(client, project["id"], "Bob's", assigned_to=bob["id"])
+    done = create_task(client, project["id"], "Done", status="completed", assigned_to=bob["id"])
+    return {"ada": ada, "bob": bob, "eve": eve, "project": project, "late": late, "other": other, "done": done}
+
+
+def test_moving_a_task_moves_its_hours(client, team):
+    response = what_if(client, moves=[{"task_ids": [team["late"]["id"]], "to_developer_id": team["bob"]["id"]}])
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["tasks_moved"], result["developers"]) == (1, 2)
+    assert (result["overloaded_before"], result["overloaded_after"]) == (1, 0)
+    developers = {d["developer_id"]: d for d in result["changed_developers"]}
+    ada, bob = developers[team["ada"]["id"]], developers[team["bob"]["id"]]
+    assert (ada["hours_before"], ada["hours_after"], ada["load_after"]) == (50.0, 25.0, 62.5)
+    assert (ada["open_tasks_before"], ada["open_tasks_after"]) == (2, 1)
+    assert (bob["hours_before"], bob["hours_after"], bob["overloaded_after"]) == (10.0, 35.0, False)
+    assert result["changed_projects"] == []
+
+
+def test_moved_hours_follow_the_estimates(client):
+    ada, bob = create_user(client, "Ada"), create_user(client, "Bob")
+    record_hours(client, ada, 40)
+    record_hours(client, bob, 0)
+    project = create_project(client)
+    big = create_task(client, project["id"], "Big", estimated_days=3, assigned_to=ada["id"])
+    create_task(client, project["id"], "Small", assigned_to=ada["id"])
+
+    result = what_if(client, moves=[{"task_ids": [big["id"]], "to_developer_id": bob["id"]}]).json()
+
+    # 40 hours over 4 estimated days (the unestimated task counts as one)
+    developers = {d["developer_id"]: d for d in result["changed_developers"]}
+    assert (developers[ada["id"]]["hours_after"], developers[bob["id"]]["hours_after"]) == (10.0, 30.0)
+
+
+def test_moving_all_tasks_of_a_developer(client, team):
+    result = what_if(client, moves=[{"from_developer_id": team["ada"]["id"], "to_developer_id": None}]).json()
+
+    assert result["tasks_moved"] == 2
+    ada = next(d for d in result["changed_developers"] if d["developer_id"] == team["ada"]["id"])
+    assert (ada["open_tasks_after"], ada["hours_after"]) == (0, 0.0)
+
+
+def test_deadline_shift_updates_overdue_and_health(client, team):
+    project_id = team["project"]["id"]
+
+    later = what_if(client, deadline_shifts=[{"project_id": project_id, "days": 3}]).json()
+    sooner = what_if(client, deadline_shifts=[{"project_id": project_id, "days": -0.5}]).json()
+
+    # 1 of 4 tasks done (25 points), minus 5 per overdue task
+    assert later["changed_projects"] == [{
+        "project_id": project_id, "overdue_before": 1, "overdue_after": 0, "health_before": 20.0, "health_after": 25.0,
+    }]
+    assert later["tasks_shifted"] == 1
+    assert sooner["changed_projects"] == []
+
+
+def test_scenarios_write_nothing(client, team):
+    what_if(client, moves=[{"from_developer_id": team["ada"]["id"], "to_developer_id": team["bob"]["id"]}],
+            deadline_shifts=[{"project_id": team["project"]["id"], "days": 10}])
+
+    task = client.get(f"/api/tasks/{team['late']['id']}").json()
+    assert (task["assigned_to"], task["deadline"]) == (team["ada"]["id"], team["late"]["deadline"])
+    assert client.get(f"/api/projects/{team['project']['id']}").json()["overdue_tasks"] == 1
+
+
+def test_snapshot_is_reused_until_a_write(client, db, team):
+    first = whatif_simulator.snapshot(db)
+    assert whatif_simulator.snapshot(db) is first
+
+    client.put(f"/api/tasks/{team['other']['id']}", json={"assigned_to": team["bob"]["id"]})
+
+    assert whatif_simulator.snapshot(db) is not first
+    moved = what_if(client, moves=[{"task_ids": [team["other"]["id"]], "to_developer_id": team["ada"]["id"]}]).json()
+    ada = next(d for d in moved["changed_developers"] if d["developer_id"] == team["ada"]["id"])
+    assert ada["open_tasks_before"] == 1
+
+
+@pytest.mark.parametrize("scenario, status", [
+    ({"moves": [{"task_ids": ["done"], "to_developer_id": "bob"}]}, 400),
+    ({"moves": [{"task_ids": ["late"], "from_developer_id": "ada", "to_developer_id": "bob"}]}, 400),
+    ({"moves": [{"to_developer_id": "bob"}]}, 400),
+    ({"moves": [{"task_ids": ["late"], "to_developer_id": "eve"}]}, 400),
+    ({"deadline_shifts": [{"project_id": 999, "days": 1}]}, 404),
+])
+def test_invalid_scenarios(client, team, scenario, status):
+    def resolve(value):
+        return team[value]["id"] if isinstance(value, str) else value
+
+    for move in scenario.get("moves", []):
+        move.update({key: resolve(value) for key, value in move.items() if key != "task_ids"})
+        move["task_ids"] = [resolve(value) for value in move.get("task_ids", [])]
+
+    assert what_if(client, **scenario).status_code == status
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import time
+import pytest
+from fastapi import HTTPException
+from app.config import settings
+from app.services import worker_pool
+
+
+def nap(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def crash() -> None:
+    os._exit(1)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A one-process fork pool without the model-loading initializer"""
+    monkeypatch.setattr(settings, "worker_pool_size", 1)
+    monkeypatch.setattr(settings, "worker_pool_max_queue", 0)
+    monkeypatch.setattr(settings, "worker_pool_timeout", 5.0)
+    monkeypatch.setattr(settings, "worker_pool_start_method", "fork")
+    monkeypatch.setattr(worker_pool, "_init_worker", lambda: None)
+    worker_pool.shutdown_pool()
+    yield
+    worker_pool.shutdown_pool()
+
+
+def wait_until_idle(timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while worker_pool.in_flight() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_runs_call_in_pool(pool):
+    assert asyncio.run(worker_pool.run_in_pool(nap, 0)) == 0
+    wait_until_idle()
+    assert worker_pool.in_flight() == 0
+
+
+def test_timed_out_call_keeps_its_slot_until_it_finishes(pool, monkeypatch):
+    monkeypatch.setattr(settings, "worker_pool_timeout", 0.2)
+
+    with pytest.raises(HTTPException) as timed_out:
+        asyncio.run(worker_pool.run_in_pool(nap, 1.0))
+    assert timed_out.value.status_code == 504
+
+    # Still running in the child, so the only slot is taken
+    assert worker_pool.in_flight() == 1
+    with pytest.raises(HTTPException) as busy:
+        asyncio.run(worker_pool.run_in_pool(nap, 0))
+    assert busy.value.status_code == 503
+
+    wait_until_idle()
+    assert worker_pool.in_flight() == 0
+    assert asyncio.run(worker_pool.run_in_pool(nap, 0)) == 0
+
+
+def test_pool_is_replaced_after_a_child_dies(pool):
+    with pytest.raises(HTTPException) as broken:
+        asyncio.run(worker_pool.run_in_pool(crash))
+    assert broken.value.status_code == 503
+
+    assert asyncio.run(worker_pool.run_in_pool(nap, 0)) == 0
+    wait_until_idle()
+    assert worker_pool.in_flight() == 0
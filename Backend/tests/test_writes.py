@@ -0,0 +1,67 @@
+import pytest
+from fastapi import HTTPException
+from app.models import Task
+from app.services.writes import commit_write
+from conftest import create_project, create_task, create_user, record_hours
+
+
+@pytest.mark.parametrize("kind", ["tasks", "projects", "users", "metrics"])
+def test_stale_version_is_rejected(client, kind):
+    user = create_user(client, "Ada")
+    project = create_project(client)
+    row, body = {
+        "tasks": (create_task(client, project["id"]), {"title": "Renamed"}),
+        "projects": (project, {"name": "Apollo II"}),
+        "users": (user, {"name": "Ada L."}),
+        "metrics": (record_hours(client, user, 10), {"hours_worked": 12}),
+    }[kind]
+    path = f"/api/{kind}/{row['id']}"
+
+    first = client.put(path, json={**body, "version": row["version"]})
+    assert first.status_code == 200
+    assert first.json()["version"] == row["version"] + 1
+
+    stale = client.put(path, json={**body, "version": row["version"]})
+    assert stale.status_code == 409
+    assert client.put(path, json={**body, "version": first.json()["version"]}).status_code == 200
+
+
+def test_concurrent_update_is_rejected(client, db):
+    project = create_project(client)
+    task = create_task(client, project["id"])
+    loaded = db.get(Task, task["id"])
+
+    client.put(f"/api/tasks/{task['id']}", json={"title": "Changed elsewhere"})
+    loaded.title = "Changed here"
+    loaded.version = loaded.version + 1
+
+    with pytest.raises(HTTPException) as raised:
+        commit_write(db)
+    assert raised.value.status_code == 409
+    assert client.get(f"/api/tasks/{task['id']}").json()["title"] == "Changed elsewhere"
+
+
+def test_missing_references_are_404(client):
+    project = create_project(client)
+    task = create_task(client, project["id"])
+
+    missing_project = client.post("/api/tasks/", json={"title": "Orphan", "project_id": 999})
+    missing_user = client.post("/api/tasks/", json={"title": "Orphan", "project_id": project["id"], "assigned_to": 999})
+    moved = client.put(f"/api/tasks/{task['id']}", json={"project_id": 999})
+    metric = client.post("/api/metrics/", json={"developer_id": 999, "developer_name": "Nobody"})
+    dependency = client.post(f"/api/tasks/{task['id']}/dependencies", json={"depends_on_id": 999})
+
+    assert (missing_project.status_code, missing_project.json()["detail"]) == (404, "Project not found")
+    assert (missing_user.status_code, missing_user.json()["detail"]) == (404, "Assigned user not found")
+    assert (moved.status_code, moved.json()["detail"]) == (404, "Project not found")
+    assert (metric.status_code, metric.json()["detail"]) == (404, "Developer not found")
+    assert dependency.status_code == 404
+    assert client.get(f"/api/tasks/{task['id']}").json()["project_id"] == project["id"]
+
+
+def test_duplicate_email_is_400(client):
+    user = create_user(client, "Ada")
+
+    response = client.post("/api/users/", json={"name": "Ada", "role": "developer", "email": user["email"]})
+
+    assert (response.status_code, response.json()["detail"]) == (400, "Email already registered")